@@ -1,18 +1,42 @@
-import yaml
+import argparse
 
-from automudae.agent import AutoMudaeAgent
-from automudae.config import Config
+from automudae.startup import StartupProfile
 
 
 def main() -> None:
-    config = Config.from_file()
+    parser = argparse.ArgumentParser(prog="automudae")
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument(
+        "--dump-schema",
+        action="store_true",
+        help="rewrite config/schema.yaml even if it is up to date",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="log the time to config load, connection, ready and first roll",
+    )
+    args = parser.parse_args()
+    startup_profile = StartupProfile(args.profile_startup)
 
-    config_schema = yaml.dump(Config.model_json_schema())
-    with open("config/schema.yaml", "w", encoding="utf-8") as f:
-        f.write(config_schema)
+    # Imported here so the startup profile accounts for them
+    # pylint: disable=C0415
+    from automudae.config import Config
+    from automudae.log import setup_logging
 
-    agent = AutoMudaeAgent(config)
-    agent.run(token=agent.config.discord.token, root_logger=True)
+    config = Config.from_file(args.config)
+    Config.write_schema(force=args.dump_schema)
+    startup_profile.mark("config")
+
+    listener = setup_logging(config.log.format)
+    try:
+        from automudae.agent import AutoMudaeAgent
+
+        startup_profile.mark("imports")
+        agent = AutoMudaeAgent(config, startup_profile, config_path=args.config)
+        agent.run(token=agent.config.discord.token, log_handler=None)
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
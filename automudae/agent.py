@@ -1,204 +1,711 @@
-# pylint: disable=R0902,R0911,R0912,R0915,R0903
+# pylint: disable=C0302,R0902,R0903,R0904,R0911,R0912,R0914,R0915
 import asyncio
 import logging
 from datetime import datetime, time, timezone
+from functools import partial
+from typing import Any, Callable, Coroutine
 
 import discord
-from aiolimiter import AsyncLimiter
 from discord.ext import tasks
 
 from automudae.config import Config
+from automudae.health import ConnectionHealth
 from automudae.helper import discord_message_to_str
+from automudae.log import log_context
+from automudae.metrics import METRICS, MetricsServer
+from automudae.mudae.classifier import MudaeMessageClassifier, MudaeMessageKind
+from automudae.mudae.helper.click import ClickExecutor
+from automudae.mudae.helper.member import MemberCache
+from automudae.mudae.helper.trace import TraceWriter
+from automudae.mudae.roll.cache import MudaeRollCache
+from automudae.mudae.roll.command import MudaeRollCommand
+from automudae.mudae.roll.criteria import ClaimCriteriaEngine
+from automudae.mudae.roll.deadline import ClickLatencyEstimator, MudaeDeadlineScheduler
+from automudae.mudae.roll.helper import MudaeRollCommandIndex
+from automudae.mudae.roll.kakera import KakeraCandidate, KakeraReactionPlanner
+from automudae.mudae.roll.queue import MUDAE_ROLL_EXPIRY_SEC, MudaeRollQueue
 from automudae.mudae.roll.result import (
     MudaeClaimableRollResult,
     MudaeKakeraRollResult,
     MudaeRollResult,
 )
+from automudae.mudae.roll.stopping import ClaimThresholdTable
+from automudae.mudae.roll.store import MudaeRollStore
 from automudae.mudae.timer import MudaeTimerStatus
+from automudae.ratelimit import AdaptiveRateLimiter, RateLimitPriority
+from automudae.reload import CompiledConfig, ConfigWatcher
+from automudae.snapshot import (
+    SNAPSHOT_INTERVAL_SEC,
+    AgentSnapshot,
+    AgentSnapshotFile,
+    MudaeChannelSnapshot,
+)
+from automudae.startup import StartupProfile
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+SUPERVISOR_RESTART_DELAY_SEC = 5.0
+
+
+def get_roll_reset_times(reset_minute_offset: int) -> list[time]:
+    return [
+        time(hour=hour, minute=reset_minute_offset, second=5, tzinfo=timezone.utc)
+        for hour in range(24)
+    ]
+
 
 class AutoMudaeAgentState:
-    def __init__(self) -> None:
+    """Timers, queue and best picks of a single Mudae channel"""
+
+    def __init__(self, channel: discord.TextChannel) -> None:
+        self.channel = channel
+        self.hourly_roll_loop: tasks.Loop | None = None
+
         self.best_claim_roll: MudaeClaimableRollResult | None = None
-        self.kakera_best_pick: MudaeKakeraRollResult | None = None
+        self.kakera_picks: list[KakeraCandidate] = []
 
         self.timer_status = MudaeTimerStatus()
         self.rolls_executed = 0
         self.rolls_handled = 0
 
-        self.roll_queue: asyncio.Queue[
-            MudaeClaimableRollResult | MudaeKakeraRollResult
-        ] = asyncio.Queue()
+        self.roll_queue = MudaeRollQueue()
+
+    def snapshot(self) -> MudaeChannelSnapshot:
+        return MudaeChannelSnapshot(
+            timer_status=self.timer_status.snapshot(),
+            rolls_executed=self.rolls_executed,
+            rolls_handled=self.rolls_handled,
+            best_claim_roll_id=(
+                self.best_claim_roll.message_id if self.best_claim_roll else None
+            ),
+            kakera_pick_ids=[
+                candidate.roll.message_id for candidate in self.kakera_picks
+            ],
+        )
 
 
 class AutoMudaeAgent(discord.Client):
 
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        startup_profile: StartupProfile | None = None,
+        config_path: str | None = None,
+    ) -> None:
         super().__init__()
 
         self.config = config
-
-        self.mudae_channel: discord.TextChannel | None = None
-        self.react_rate_limiter = AsyncLimiter(1, 0.25)
-        self.command_rate_limiter = AsyncLimiter(1, 1)
-        self.tasks: list[asyncio.Task[None]] = []
-        self.state = AutoMudaeAgentState()
+        self.startup_profile = startup_profile or StartupProfile()
+
+        self.rate_limiter = AdaptiveRateLimiter(self.http)
+        self.tasks: dict[str, asyncio.Task[None]] = {}
+        self.states: dict[int, AutoMudaeAgentState] = {}
+        self.roll_command_index = MudaeRollCommandIndex()
+        self.member_cache = MemberCache()
+        self.claim_criteria = ClaimCriteriaEngine(config.mudae.claim)
+        self.claim_thresholds: ClaimThresholdTable | None = None
+        self.kakera_planner = KakeraReactionPlanner(config.mudae.kakeraReact)
+        self.click_latency = ClickLatencyEstimator()
+        self.click_executor = ClickExecutor()
+        self.deadlines = MudaeDeadlineScheduler(self.click_latency)
+        self.message_classifier = MudaeMessageClassifier(config.discord.mudaeBotId)
+        self.roll_cache = MudaeRollCache()
+        self.trace_writer = TraceWriter(config.trace.file)
+        self.roll_store = MudaeRollStore(config.store.file)
+        self.snapshot_file = AgentSnapshotFile(config.snapshot.file)
+        self.connection_health = ConnectionHealth(self)
+        self.config_watcher = ConfigWatcher(config_path, config, self.apply_config)
+        self.metrics_server = MetricsServer(config.metrics.host, config.metrics.port)
 
         logger.info("AutoMudae Agent Initialization Complete")
 
     async def on_ready(self) -> None:
+        """Runs after every gateway (re)connect, starts only what is not running"""
+
+        # Messages may have been missed while disconnected
+        self.roll_command_index.reset()
+
+        if self.claim_thresholds is None:
+            await self.load_claim_thresholds()
+
+        snapshot = self.snapshot_file.load() if not self.states else None
+
+        timer_syncs = []
+        now = datetime.now(tz=timezone.utc)
+        for channel_id in self.config.discord.channelIds:
+            mudae_channel = self.resolve_channel(channel_id)
+            if mudae_channel is None:
+                continue
+
+            if (state := self.states.get(channel_id)) is None:
+                self.member_cache.warm(mudae_channel.guild)
+                state = AutoMudaeAgentState(mudae_channel)
+                self.states[channel_id] = state
+                if snapshot and (channel_snapshot := snapshot.channels.get(channel_id)):
+                    await self.restore_channel(state, channel_snapshot)
+            else:
+                # The gateway rebuilt its cache, keep the loops on the new channel
+                state.channel = mudae_channel
+
+            if state.timer_status.needs_sync(now) or (
+                state.rolls_executed > state.rolls_handled
+            ):
+                timer_syncs.append(self.send_timer_status_message(state))
+            elif (
+                state.timer_status.rolls_reset_at is not None
+                and state.timer_status.rolls_reset_at <= now
+            ):
+                timer_syncs.append(self.reset_rolls(state))
+            else:
+                state.timer_status.update_roll_is_available()
+
+            self.start_channel(state)
+
+        self.supervise("connection_health", self.connection_health.run)
+        if self.config.snapshot.file is not None:
+            self.supervise("snapshot", self.snapshot_loop)
+        if self.config_watcher.path is not None:
+            self.supervise("config_watcher", self.config_watcher.run)
+        if self.metrics_server.port is not None:
+            self.supervise("metrics", self.metrics_server.run)
+
+        await asyncio.gather(*timer_syncs)
 
-        mudae_channel = self.get_channel(self.config.discord.channelId)
+        logger.info("AutoMudae Agent is Ready (%d channels)", len(self.states))
+        self.startup_profile.mark("ready")
+
+    def resolve_channel(self, channel_id: int) -> discord.TextChannel | None:
+        mudae_channel = self.get_channel(channel_id)
         if not mudae_channel:
-            return
+            logger.error("Channel %s not found", channel_id)
+            return None
         if not isinstance(mudae_channel, discord.TextChannel):
-            logger.error("Channel is not a Text Channel")
+            logger.error("Channel %s is not a Text Channel", channel_id)
+            return None
+        return mudae_channel
+
+    async def load_claim_thresholds(self) -> None:
+        optimal_stopping = self.config.mudae.claim.optimalStopping
+        if not optimal_stopping.enabled:
             return
-        self.mudae_channel = mudae_channel
+        if self.config.store.file is None:
+            logger.error("Optimal stopping needs the roll store, set store.file")
+            return
+        self.claim_thresholds = await asyncio.to_thread(
+            ClaimThresholdTable.from_store,
+            self.config.store.file,
+            optimal_stopping.historyDays,
+            optimal_stopping.minSamples,
+        )
 
+    def apply_config(self, compiled: CompiledConfig) -> None:
+        """Swap in a reloaded config, in between two roll evaluations"""
+        optimal_stopping = self.config.mudae.claim.optimalStopping
         reset_minute_offset = self.config.mudae.roll.rollResetMinuteOffset
-        hourly_roll_loop = tasks.loop(
-            time=[
-                time(
-                    hour=hour, minute=reset_minute_offset, second=5, tzinfo=timezone.utc
-                )
-                for hour in range(24)
-            ]
+        self.config = compiled.config
+        self.claim_criteria = compiled.claim_criteria
+        self.kakera_planner = compiled.kakera_planner
+        if compiled.config.mudae.claim.optimalStopping != optimal_stopping:
+            self.claim_thresholds = None
+            self.supervise("claim_thresholds", self.load_claim_thresholds)
+
+        new_offset = compiled.config.mudae.roll.rollResetMinuteOffset
+        if new_offset != reset_minute_offset:
+            logger.info("Roll reset minute offset changed to %d", new_offset)
+            for state in self.states.values():
+                if (loop := state.hourly_roll_loop) is None:
+                    continue
+                loop.change_interval(time=get_roll_reset_times(new_offset))
+                # A loop that did not iterate yet still sleeps until the old time
+                if loop.is_running() and loop.current_loop == 0:
+                    loop.restart(state)
+
+    def start_channel(self, state: AutoMudaeAgentState) -> None:
+        """Start the channel loops that are not already running"""
+        if state.hourly_roll_loop is None:
+            state.hourly_roll_loop = tasks.loop(
+                time=get_roll_reset_times(self.config.mudae.roll.rollResetMinuteOffset)
+            )(self.reset_rolls)
+        if not state.hourly_roll_loop.is_running():
+            state.hourly_roll_loop.start(state)
+
+        channel_id = state.channel.id
+        self.supervise(
+            f"execute_rolls_loop:{channel_id}",
+            lambda: self.execute_rolls_loop(state),
+        )
+        self.supervise(
+            f"handle_rolls_loop:{channel_id}",
+            lambda: self.handle_rolls_loop(state),
         )
 
-        self.tasks = [
-            hourly_roll_loop(self.send_timer_status_message).start(),
-            asyncio.create_task(self.execute_rolls_loop()),
-            asyncio.create_task(self.handle_rolls_loop()),
-            asyncio.create_task(self.refresh_loop()),
-        ]
+    def supervise(
+        self, name: str, run: Callable[[], Coroutine[Any, Any, None]]
+    ) -> None:
+        """Run the named task exactly once, restarting it if it dies"""
+        if (task := self.tasks.get(name)) is not None and not task.done():
+            return
+
+        def on_done(task: asyncio.Task[None]) -> None:
+            if task.cancelled() or task.exception() is None:
+                return
+            logger.error(
+                "Task %s died, restarting in %.0fs",
+                name,
+                SUPERVISOR_RESTART_DELAY_SEC,
+                exc_info=task.exception(),
+            )
+            asyncio.get_running_loop().call_later(
+                SUPERVISOR_RESTART_DELAY_SEC, self.supervise, name, run
+            )
+
+        self.tasks[name] = asyncio.create_task(run(), name=name)
+        self.tasks[name].add_done_callback(on_done)
+
+    def snapshot(self) -> AgentSnapshot:
+        return AgentSnapshot(
+            channels={
+                channel_id: state.snapshot()
+                for channel_id, state in self.states.items()
+            }
+        )
+
+    async def snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(SNAPSHOT_INTERVAL_SEC)
+            self.snapshot_file.save(self.snapshot())
+
+    async def restore_channel(
+        self, state: AutoMudaeAgentState, snapshot: MudaeChannelSnapshot
+    ) -> None:
+        """Resume timers, counters and the best picks that can still be clicked"""
+        state.timer_status.restore(snapshot.timer_status)
+        state.rolls_executed = snapshot.rolls_executed
+        state.rolls_handled = snapshot.rolls_handled
+
+        for message_id in (snapshot.best_claim_roll_id, *snapshot.kakera_pick_ids):
+            if message_id is None:
+                continue
+            held_for = datetime.now(tz=timezone.utc) - discord.utils.snowflake_time(
+                message_id
+            )
+            if held_for.total_seconds() >= state.roll_queue.expiry:
+                continue
+            try:
+                message = await state.channel.fetch_message(message_id)
+                if message_id == snapshot.best_claim_roll_id:
+                    state.best_claim_roll = await MudaeClaimableRollResult.create(
+                        message, self.roll_command_index, self.member_cache
+                    )
+                    continue
+                kakera_roll = await MudaeKakeraRollResult.create(
+                    message, self.roll_command_index
+                )
+            except discord.HTTPException:
+                logger.exception("Could not fetch held roll %s", message_id)
+                continue
+            except ValueError as error:
+                # The roll command was deleted or is out of the history window
+                logger.warning("Could not restore held roll %s: %s", message_id, error)
+                continue
+            if (
+                kakera_roll is not None
+                and (
+                    candidate := self.kakera_planner.candidate(
+                        kakera_roll,
+                        state.timer_status.kakera_power,
+                        state.timer_status.kakera_react_cost,
+                    )
+                )
+                is not None
+            ):
+                state.kakera_picks.append(candidate)
+
+        self.schedule_held_picks(state)
+        logger.info("#%s Resumed %s", state.channel.name, state.timer_status)
 
-        await self.send_timer_status_message()
+    async def on_disconnect(self) -> None:
+        self.connection_health.on_disconnect()
 
-        logger.info("AutoMudae Agent is Ready")
+    async def on_connect(self) -> None:
+        self.startup_profile.mark("connect")
+        self.connection_health.on_connect()
+
+    async def on_resumed(self) -> None:
+        self.connection_health.on_connect()
 
     async def on_message(self, message: discord.Message) -> None:
 
         if not self.user:
             return
 
-        if message.channel.id != self.config.discord.channelId:
+        if (state := self.states.get(message.channel.id)) is None:
             return
 
-        logger.debug(discord_message_to_str(message))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(discord_message_to_str(message))
 
-        if (
-            claimable_roll := await MudaeClaimableRollResult.create(message)
-        ) is not None:
-            await self.state.roll_queue.put(claimable_roll)
+        self.roll_command_index.observe(message)
+        kind = self.message_classifier.classify(message, self.user)
+
+        if kind is MudaeMessageKind.NOISE:
+            return
+
+        self.connection_health.on_activity()
+
+        if kind is MudaeMessageKind.ROLL_COMMAND:
+            if (roll_command := MudaeRollCommand.create(message)) is not None:
+                self.roll_command_index.add(roll_command)
             return
 
-        if (kakera_roll := await MudaeKakeraRollResult.create(message)) is not None:
-            await self.state.roll_queue.put(kakera_roll)
+        if kind in (MudaeMessageKind.CLAIMABLE_ROLL, MudaeMessageKind.KAKERA_ROLL):
+            await self.handle_roll_message(state, message, kind)
             return
 
         if (
             timer_status := await MudaeTimerStatus.create(message, self.user)
         ) is not None:
-            await self.state.timer_status.update(timer_status)
-            self.state.rolls_handled = 0
-            self.state.rolls_executed = 0
-            logger.info(self.state.timer_status)
+            await state.timer_status.update(timer_status)
+            state.rolls_handled = 0
+            state.rolls_executed = 0
+            logger.info("#%s %s", state.channel.name, state.timer_status)
             return
 
-    async def send_timer_status_message(self) -> None:
-        assert self.mudae_channel
-        async with self.command_rate_limiter:
-            await self.mudae_channel.send("$tu")
+        if (
+            rolls_limited := MudaeTimerStatus.parse_rolls_limited(message, self.user)
+        ) is not None:
+            await state.timer_status.limit_rolls(*rolls_limited, message.created_at)
+            state.rolls_handled = 0
+            state.rolls_executed = 0
+            logger.info("#%s Rolls limited: %s", state.channel.name, rolls_limited)
 
-    async def execute_rolls_loop(self) -> None:
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        if not self.user:
+            return
+
+        if (state := self.states.get(payload.channel_id)) is None:
+            return
+
+        message = payload.message
+        if (
+            datetime.now(tz=timezone.utc) - message.created_at
+        ).total_seconds() >= state.roll_queue.expiry:
+            return
+
+        kind = self.message_classifier.classify(message, self.user)
+        if kind in (MudaeMessageKind.CLAIMABLE_ROLL, MudaeMessageKind.KAKERA_ROLL):
+            await self.handle_roll_message(state, message, kind)
+
+    async def handle_roll_message(
+        self,
+        state: AutoMudaeAgentState,
+        message: discord.Message,
+        kind: MudaeMessageKind,
+    ) -> None:
+        """Parse a new or edited roll message, emitting only what it did not yet"""
+        parsed = self.roll_cache.entry(message.id)
+        async with parsed.lock:
+            rolls: list[MudaeRollResult] = []
+
+            if kind is MudaeMessageKind.CLAIMABLE_ROLL:
+                if parsed.claimable is None:
+                    claimable_roll = await MudaeClaimableRollResult.create(
+                        message,
+                        self.roll_command_index,
+                        self.member_cache,
+                        owner=parsed.owner,
+                    )
+                else:
+                    claimable_roll = await parsed.claimable.with_wished_by(
+                        message, self.member_cache
+                    )
+                if claimable_roll is not None:
+                    parsed.claimable = claimable_roll
+                    rolls.append(claimable_roll)
+
+            if message.components and (
+                kakera_roll := await MudaeKakeraRollResult.create(
+                    message,
+                    self.roll_command_index,
+                    owner=parsed.owner,
+                    exclude=parsed.kakera_buttons,
+                )
+            ):
+                parsed.kakera_buttons |= set(kakera_roll.button_names)
+                rolls.append(kakera_roll)
+
+            for roll in rolls:
+                parsed.owner = roll.owner
+                roll.update = parsed.emitted > 0
+                parsed.emitted += 1
+                if roll.update:
+                    self.roll_cache.updates += 1
+                    logger.info("#%s Roll edited: %s", state.channel.name, roll)
+                await self.enqueue_roll(state, roll)
+
+    async def send_timer_status_message(self, state: AutoMudaeAgentState) -> None:
+        async with self.rate_limiter.command(state.channel):
+            await state.channel.send("$tu")
+
+    async def reset_rolls(self, state: AutoMudaeAgentState) -> None:
+        """Hourly roll reset, applied locally while the timer model is in sync"""
+        if await state.timer_status.advance(datetime.now(tz=timezone.utc)):
+            state.rolls_handled = 0
+            state.rolls_executed = 0
+            logger.info("#%s %s", state.channel.name, state.timer_status)
+            return
+        await self.send_timer_status_message(state)
+
+    async def execute_rolls_loop(self, state: AutoMudaeAgentState) -> None:
         while True:
-            async with self.command_rate_limiter:
-                await self.state.timer_status.wait_for_rolls()
-                async with self.state.timer_status.debug_lock("execute_rolls_loop"):
-                    if not self.mudae_channel:
+            await state.timer_status.wait_for_rolls()
+            async with self.rate_limiter.command(state.channel):
+                async with state.timer_status.debug_lock("execute_rolls_loop"):
+                    if (
+                        state.rolls_handled >= state.timer_status.rolls_available
+                        and state.rolls_executed >= state.timer_status.rolls_available
+                        and not state.timer_status.needs_sync(
+                            datetime.now(tz=timezone.utc)
+                        )
+                    ):
+                        # Every roll was sent and answered, the next roll reset is
+                        # applied locally without a $tu
+                        state.timer_status.exhaust_rolls()
+                        state.rolls_handled = 0
+                        state.rolls_executed = 0
                         continue
 
                     if (
-                        self.state.rolls_handled
-                        >= self.state.timer_status.rolls_available
-                        or self.state.rolls_executed
-                        >= 1.25 * self.state.timer_status.rolls_available
+                        state.rolls_handled >= state.timer_status.rolls_available
+                        or state.rolls_executed
+                        >= 1.25 * state.timer_status.rolls_available
                     ):
-                        await self.send_timer_status_message()
+                        await state.channel.send("$tu")
                         continue
 
                     if (
                         self.config.mudae.roll.doNotRollWhenCannotClaim
-                        and not self.state.timer_status.can_claim
+                        and not state.timer_status.can_claim
                     ):
                         continue
 
                     if (
                         self.config.mudae.roll.doNotRollWhenCannotKakeraReact
-                        and not self.state.timer_status.can_kakera_react
+                        and not state.timer_status.can_kakera_react
                     ):
                         continue
 
-                    await self.mudae_channel.send(self.config.mudae.roll.command)
-                    self.state.rolls_executed += 1
+                    await state.channel.send(self.config.mudae.roll.command)
+                    state.rolls_executed += 1
+                    METRICS.rolls_executed.inc(str(state.channel.id))
+                    self.startup_profile.mark("first_roll")
 
-    async def handle_rolls_loop(self) -> None:
+    async def handle_rolls_loop(self, state: AutoMudaeAgentState) -> None:
         while True:
-            result = await self.state.roll_queue.get()
-            async with self.state.timer_status.debug_lock("handle_rolls_loop"):
-
-                if self.user and result.owner.id == self.user.id:
-                    self.state.rolls_handled += 1
-
-                if isinstance(result, MudaeClaimableRollResult):
-                    await self.handle_claim(result)
+            result = await state.roll_queue.get()
+            METRICS.roll_queue_depth.set(
+                state.roll_queue.qsize(), str(state.channel.id)
+            )
+            if result.trace is not None:
+                result.trace.dequeue()
+            held_rolls = (
+                state.best_claim_roll,
+                *(candidate.roll for candidate in state.kakera_picks),
+            )
+            async with state.timer_status.debug_lock("handle_rolls_loop", result.trace):
+
+                # Edits of a roll already counted do not use a roll
+                if self.user and result.owner.id == self.user.id and not result.update:
+                    state.rolls_handled += 1
+                    METRICS.rolls_handled.inc(str(state.channel.id))
+
+                if state.roll_queue.is_expired(result):
+                    state.roll_queue.drop(result)
+                    if result.trace is not None:
+                        result.trace.finish("drop")
+                elif isinstance(result, MudaeClaimableRollResult):
+                    await self.handle_claim(state, result)
                 else:
-                    await self.handle_kakera_react(result)
+                    await self.handle_kakera_react(state, result)
 
-                await self.handle_finalizer()
+                await self.handle_finalizer(state)
 
                 if self.user and result.owner.id == self.user.id:
                     logger.info(
-                        "ROLL PROCESSING COMPLETE: %d rolls remaining",
-                        self.state.timer_status.rolls_available
-                        - self.state.rolls_handled,
+                        "ROLL PROCESSING COMPLETE (#%s): %d rolls remaining, %s",
+                        state.channel.name,
+                        state.timer_status.rolls_available - state.rolls_handled,
+                        state.roll_queue,
                     )
 
-    async def handle_claim(self, roll: MudaeClaimableRollResult) -> None:
+            self.record_rolls(state, result, *held_rolls)
+            self.schedule_held_picks(state)
+            log_context.set(None)
+
+    def schedule_held_picks(self, state: AutoMudaeAgentState) -> None:
+        """Commit the held best picks before they expire, even with rolls pending"""
+        for kind, roll in (
+            ("claim", state.best_claim_roll),
+            # The oldest pick expires first, the plan is revisited then
+            ("kakera", state.kakera_picks[0].roll if state.kakera_picks else None),
+        ):
+            key = f"{kind}:{state.channel.id}"
+            if roll is None:
+                self.deadlines.release(key)
+                continue
+            self.deadlines.schedule(
+                key,
+                roll,
+                state.roll_queue.deadline(roll),
+                partial(self.commit_held_pick, state, roll),
+            )
+
+    async def commit_held_pick(
+        self, state: AutoMudaeAgentState, roll: MudaeRollResult
+    ) -> None:
+        async with state.timer_status.debug_lock("commit_held_pick", roll.trace):
+            if roll is state.best_claim_roll:
+                assert isinstance(roll, MudaeClaimableRollResult)
+                logger.info(
+                    "DEADLINE: Committing best roll before it expires, %d rolls pending",
+                    state.timer_status.rolls_available - state.rolls_handled,
+                )
+                await self.handle_claim(state, roll, force=True)
+                state.best_claim_roll = None
+            elif any(candidate.roll is roll for candidate in state.kakera_picks):
+                assert isinstance(roll, MudaeKakeraRollResult)
+                logger.info(
+                    "DEADLINE: Committing oldest kakera pick before it expires, %d rolls pending",
+                    state.timer_status.rolls_available - state.rolls_handled,
+                )
+                await self.commit_kakera_picks(state, expiring=roll)
+                self.schedule_held_picks(state)
+                log_context.set(None)
+                return
+            else:
+                return
+        self.record_rolls(state, roll)
+        log_context.set(None)
+
+    async def enqueue_roll(
+        self, state: AutoMudaeAgentState, roll: MudaeRollResult
+    ) -> None:
+        if roll.trace is not None:
+            roll.trace.enqueue()
+        await state.roll_queue.put(roll, fast=self.is_fast_lane(roll))
+        METRICS.roll_queue_depth.set(state.roll_queue.qsize(), str(state.channel.id))
+
+    def is_fast_lane(self, roll: MudaeRollResult) -> bool:
+        """Snipe and wished candidates, and free kakeraP reacts, skip the line"""
+        if isinstance(roll, MudaeKakeraRollResult):
+            return "kakeraP" in roll.button_names
+        if roll.wished_by is not None:
+            return True
+        return self.user is not None and (
+            roll.evaluate(self.claim_criteria, self.user).snipe
+        )
+
+    def record_rolls(
+        self, state: AutoMudaeAgentState, *rolls: MudaeRollResult | None
+    ) -> None:
+        """Store rolls that are done, i.e. not held as a best pick, once with their traces"""
+        held_rolls = (
+            state.best_claim_roll,
+            *(candidate.roll for candidate in state.kakera_picks),
+        )
+        for roll in rolls:
+            if (
+                roll is None
+                or roll.recorded
+                or any(roll is held_roll for held_roll in held_rolls)
+            ):
+                continue
+            roll.recorded = True
+            self.roll_store.add(roll)
+            roll.handle.release()
+            if roll.trace is not None:
+                self.trace_writer.write(roll.trace)
+
+    async def claim(self, roll: MudaeClaimableRollResult, reason: str) -> None:
+        if await self.click(roll, "claim"):
+            METRICS.claims.inc("claimed", reason)
+        else:
+            METRICS.claims.inc("missed", "click_failed")
+
+    async def kakera_react(self, roll: MudaeKakeraRollResult) -> bool:
+        reacted = await self.click(roll, "kakera_react")
+        METRICS.kakera_reacts.inc("reacted" if reacted else "failed")
+        return reacted
+
+    async def click(self, roll: MudaeRollResult, action: str) -> bool:
+        """Perform every click of the roll concurrently, before it expires"""
+        hedge_after: float | None = None
+        if isinstance(roll, MudaeClaimableRollResult) and roll.wished_by is None:
+            slot = partial(
+                self.rate_limiter.reaction, roll.handle.target, RateLimitPriority.CLAIM
+            )
+            # Only a reaction is idempotent, a button may already have been pressed
+            hedge_after = self.click_latency.hedge_after
+        else:
+            slot = partial(self.rate_limiter.interaction, RateLimitPriority.CLAIM)
+
+        results = await self.click_executor.run(
+            roll.clicks(),
+            slot,
+            roll.created_at.timestamp() + MUDAE_ROLL_EXPIRY_SEC,
+            hedge_after,
+        )
+        for result in results:
+            if result.error is None:
+                self.click_latency.observe(result.latency)
+            logger.info("CLICK: %s", result)
+        METRICS.reaction_time.observe(self.get_reaction_time(roll), action)
+
+        if roll.trace is not None and results:
+            waited = max(result.waited for result in results)
+            roll.trace.add("limiter", waited)
+            roll.trace.add("click", max(result.latency for result in results) - waited)
+            roll.trace.finish(action)
+        return bool(results) and all(result.error is None for result in results)
+
+    async def handle_claim(
+        self,
+        state: AutoMudaeAgentState,
+        roll: MudaeClaimableRollResult,
+        force: bool = False,
+    ) -> None:
+        self.set_log_context(state, roll)
         logger.info(roll)
 
         if not self.user:
             logger.error("CLAIM FAILED: Not logged in - cannot identify user")
             return
 
-        if not self.mudae_channel:
-            logger.error("CLAIM FAILED: Mudae channel not configured")
-            return
+        # One engine for the whole evaluation, even if the config is reloaded
+        claim_criteria = self.claim_criteria
 
-        if not self.state.timer_status.can_claim:
+        if not state.timer_status.can_claim:
             logger.info("CLAIM SKIPPED: Timer cooldown active - cannot claim yet")
+            if self.passes_claim_criteria(roll, claim_criteria):
+                METRICS.claims.inc("missed", "cooldown")
             return
 
         current_time = datetime.now(tz=timezone.utc)
-        roll_time_elapsed = current_time - roll.message.created_at
+        roll_time_elapsed = current_time - roll.created_at
         if roll_time_elapsed.total_seconds() >= 30:
             logger.info(
                 "CLAIM SKIPPED: Roll too old (%.1fs > 30s timeout)",
                 roll_time_elapsed.total_seconds(),
             )
+            if self.passes_claim_criteria(roll, claim_criteria):
+                METRICS.claims.inc("missed", "expired")
             return
 
         # Check snipe criteria and exceptions
-        meets_snipe_criteria = roll.is_qualified(
-            self.config.mudae.claim.snipe, self.user
-        )
-        meets_snipe_exception = roll.is_qualified(
-            self.config.mudae.claim.snipe.exception, self.user
-        )
+        verdict = roll.evaluate(claim_criteria, self.user)
+        meets_snipe_criteria = verdict.snipe
+        meets_snipe_exception = verdict.snipe_exception
 
         logger.info(
             "SNIPE EVALUATION: Meets criteria: %s, Meets exception: %s",
@@ -208,9 +715,8 @@ class AutoMudaeAgent(discord.Client):
 
         if meets_snipe_criteria and not meets_snipe_exception:
             logger.info("CLAIMING: Roll meets snipe criteria - immediate claim")
-            async with self.react_rate_limiter:
-                await roll.claim()
-            self.state.timer_status.can_claim = False
+            await self.claim(roll, "snipe")
+            state.timer_status.can_claim = False
             return
 
         if meets_snipe_exception:
@@ -232,18 +738,10 @@ class AutoMudaeAgent(discord.Client):
         logger.info("PROCESSING: Roll is mine, evaluating for best claim selection")
 
         # Check claim exceptions early - before considering this roll as a potential best roll
-        meets_early_claim_criteria = roll.is_qualified(
-            self.config.mudae.claim.earlyClaim, self.user
-        )
-        meets_late_claim_criteria = roll.is_qualified(
-            self.config.mudae.claim.lateClaim, self.user
-        )
-        meets_early_claim_exception = roll.is_qualified(
-            self.config.mudae.claim.earlyClaim.exception, self.user
-        )
-        meets_late_claim_exception = roll.is_qualified(
-            self.config.mudae.claim.lateClaim.exception, self.user
-        )
+        meets_early_claim_criteria = verdict.early_claim
+        meets_late_claim_criteria = verdict.late_claim
+        meets_early_claim_exception = verdict.early_claim_exception
+        meets_late_claim_exception = verdict.late_claim_exception
 
         # Determine if this roll would be claimable (not blocked by exceptions)
         would_claim_early = (
@@ -257,77 +755,101 @@ class AutoMudaeAgent(discord.Client):
                 "BEST ROLL REJECTED: Roll would be blocked by exceptions - not considering as best roll candidate"
             )
             # Still need to check if we should claim the current best roll if this was our last roll
-            if self.state.timer_status.rolls_available <= self.state.rolls_handled:
+            if state.timer_status.rolls_available <= state.rolls_handled:
                 logger.info(
                     "PROCESSING: Last roll reached, evaluating current best roll for claiming"
                 )
-                await self._evaluate_and_claim_best_roll()
+                await self._evaluate_and_claim_best_roll(state, claim_criteria)
             return
 
         # Update best claim roll logic - only for rolls that could potentially be claimed
-        if self.state.best_claim_roll is None:
+        if state.best_claim_roll is None:
             logger.info(
                 "BEST ROLL UPDATED: No previous best roll - setting this as best"
             )
-            self.state.best_claim_roll = roll
+            state.best_claim_roll = roll
         elif roll.wished_by is not None:
             logger.info(
                 "BEST ROLL UPDATED: Roll is wished by %s - prioritizing over previous best",
                 roll.wished_by,
             )
-            self.state.best_claim_roll = roll
+            state.best_claim_roll = roll
         elif (
-            self.state.best_claim_roll.kakera_value <= roll.kakera_value
-            and self.state.best_claim_roll.wished_by is None
+            state.best_claim_roll.kakera_value <= roll.kakera_value
+            and state.best_claim_roll.wished_by is None
         ):
             logger.info(
                 "BEST ROLL UPDATED: Higher kakera value (%s >= %s) and no wishes on previous best",
                 roll.kakera_value,
-                self.state.best_claim_roll.kakera_value,
+                state.best_claim_roll.kakera_value,
             )
-            self.state.best_claim_roll = roll
+            state.best_claim_roll = roll
         else:
             logger.info(
                 "BEST ROLL UNCHANGED: Current roll (kakera: %s, wished: %s) doesn't beat existing best (kakera: %s, wished: %s)",
                 roll.kakera_value,
                 roll.wished_by is not None,
-                self.state.best_claim_roll.kakera_value,
-                self.state.best_claim_roll.wished_by is not None,
+                state.best_claim_roll.kakera_value,
+                state.best_claim_roll.wished_by is not None,
             )
 
-        # Wait for more rolls if available
-        if self.state.timer_status.rolls_available > self.state.rolls_handled:
+        # Claim right away if the best roll beats the expected value of rolling on
+        best_claim_roll = state.best_claim_roll
+        threshold = self.get_claim_threshold(state)
+        if threshold is not None and best_claim_roll.kakera_value >= threshold:
+            logger.info(
+                "CLAIMING: Best roll beats the expected value of continuing (%s >= %.1f)",
+                best_claim_roll.kakera_value,
+                threshold,
+            )
+            await self.claim(best_claim_roll, "stopping")
+            state.timer_status.can_claim = False
+            state.best_claim_roll = None
+            return
+
+        # Wait for more rolls if available, unless the best roll is about to expire
+        if not force and state.timer_status.rolls_available > state.rolls_handled:
             logger.info(
                 "CLAIM DEFERRED: Waiting for %s more rolls before claiming best",
-                self.state.timer_status.rolls_available - self.state.rolls_handled,
+                state.timer_status.rolls_available - state.rolls_handled,
             )
             return
 
         # Evaluate the best roll for claiming
-        await self._evaluate_and_claim_best_roll()
+        await self._evaluate_and_claim_best_roll(state, claim_criteria)
 
-    async def _evaluate_and_claim_best_roll(self) -> None:
+    def passes_claim_criteria(
+        self, roll: MudaeClaimableRollResult, claim_criteria: ClaimCriteriaEngine
+    ) -> bool:
+        """Whether the roll would be sniped, or is ours and claimable early or late"""
+        assert self.user
+        verdict = roll.evaluate(claim_criteria, self.user)
+        if verdict.snipe and not verdict.snipe_exception:
+            return True
+        return roll.owner.id == self.user.id and (
+            (verdict.early_claim and not verdict.early_claim_exception)
+            or (verdict.late_claim and not verdict.late_claim_exception)
+        )
+
+    async def _evaluate_and_claim_best_roll(
+        self,
+        state: AutoMudaeAgentState,
+        claim_criteria: ClaimCriteriaEngine,
+    ) -> None:
         """Helper method to evaluate and potentially claim the current best roll"""
 
         assert self.user
 
-        if not self.state.best_claim_roll:
+        if not state.best_claim_roll:
             logger.info("CLAIM EVALUATION: No best roll to evaluate")
             return
 
-        # Re-evaluate the best roll's claim criteria and exceptions
-        meets_early_claim_criteria = self.state.best_claim_roll.is_qualified(
-            self.config.mudae.claim.earlyClaim, self.user
-        )
-        meets_late_claim_criteria = self.state.best_claim_roll.is_qualified(
-            self.config.mudae.claim.lateClaim, self.user
-        )
-        meets_early_claim_exception = self.state.best_claim_roll.is_qualified(
-            self.config.mudae.claim.earlyClaim.exception, self.user
-        )
-        meets_late_claim_exception = self.state.best_claim_roll.is_qualified(
-            self.config.mudae.claim.lateClaim.exception, self.user
-        )
+        # Re-use the best roll's cached claim criteria and exceptions
+        verdict = state.best_claim_roll.evaluate(claim_criteria, self.user)
+        meets_early_claim_criteria = verdict.early_claim
+        meets_late_claim_criteria = verdict.late_claim
+        meets_early_claim_exception = verdict.early_claim_exception
+        meets_late_claim_exception = verdict.late_claim_exception
 
         logger.info(
             "CLAIM EVALUATION: Early criteria: %s, Early exception: %s, Late criteria: %s, Late exception: %s, Next hour is reset: %s",
@@ -335,7 +857,7 @@ class AutoMudaeAgent(discord.Client):
             meets_early_claim_exception,
             meets_late_claim_criteria,
             meets_late_claim_exception,
-            self.state.timer_status.next_hour_is_reset,
+            state.timer_status.next_hour_is_reset,
         )
 
         # Determine if we should claim based on criteria and exceptions
@@ -345,65 +867,88 @@ class AutoMudaeAgent(discord.Client):
         should_claim_late = (
             meets_late_claim_criteria
             and not meets_late_claim_exception
-            and self.state.timer_status.next_hour_is_reset
+            and state.timer_status.next_hour_is_reset
+        )
+        threshold = self.get_claim_threshold(state)
+        should_claim_stopping = (
+            threshold is not None
+            and state.best_claim_roll.kakera_value >= threshold
+            and (
+                (meets_early_claim_criteria and not meets_early_claim_exception)
+                or (meets_late_claim_criteria and not meets_late_claim_exception)
+            )
         )
 
-        if should_claim_early or should_claim_late:
+        if should_claim_early or should_claim_late or should_claim_stopping:
             if should_claim_early:
+                reason = "early"
                 logger.info(
                     "CLAIMING: Best roll meets early claim criteria and doesn't meet exception"
                 )
             elif should_claim_late:
+                reason = "late"
                 logger.info(
                     "CLAIMING: Best roll meets late claim criteria, doesn't meet exception, and next hour is reset"
                 )
+            else:
+                reason = "stopping"
+                logger.info(
+                    "CLAIMING: Best roll beats the expected value of waiting for the next rolls (%s >= %.1f)",
+                    state.best_claim_roll.kakera_value,
+                    threshold,
+                )
 
-            async with self.react_rate_limiter:
-                await self.state.best_claim_roll.claim()
-            self.state.timer_status.can_claim = False
+            await self.claim(state.best_claim_roll, reason)
+            state.timer_status.can_claim = False
         else:
             # Detailed rejection logging
             if meets_early_claim_criteria and meets_early_claim_exception:
+                reason = "early_exception"
                 logger.info(
                     "CLAIM REJECTED: Roll meets early criteria but also meets early claim exception"
                 )
             elif meets_late_claim_criteria and meets_late_claim_exception:
+                reason = "late_exception"
                 logger.info(
                     "CLAIM REJECTED: Roll meets late criteria but also meets late claim exception"
                 )
             elif (
-                meets_late_claim_criteria
-                and not self.state.timer_status.next_hour_is_reset
+                meets_late_claim_criteria and not state.timer_status.next_hour_is_reset
             ):
+                reason = "not_reset"
                 logger.info(
                     "CLAIM REJECTED: Roll meets late criteria but next hour is not reset"
                 )
             elif not meets_early_claim_criteria and not meets_late_claim_criteria:
+                reason = "criteria"
                 logger.info(
                     "CLAIM REJECTED: Roll doesn't meet early or late claim criteria"
                 )
             else:
+                reason = "unknown"
                 logger.info(
                     "CLAIM REJECTED: Unknown rejection reason - criteria evaluation may need review"
                 )
+            METRICS.claims.inc("rejected", reason)
 
         logger.info("PROCESSING COMPLETE: Resetting best claim roll")
-        self.state.best_claim_roll = None
+        state.best_claim_roll = None
 
-    async def handle_kakera_react(self, roll: MudaeKakeraRollResult) -> None:
+    async def handle_kakera_react(
+        self,
+        state: AutoMudaeAgentState,
+        roll: MudaeKakeraRollResult,
+    ) -> None:
 
+        self.set_log_context(state, roll)
         logger.info(roll)
 
         if not self.user:
             logger.error("KAKERA REACT FAILED: Not logged in - cannot identify user")
             return
 
-        if not self.mudae_channel:
-            logger.error("KAKERA REACT FAILED: Mudae channel not configured")
-            return
-
         current_time = datetime.now(tz=timezone.utc)
-        roll_time_elapsed = current_time - roll.message.created_at
+        roll_time_elapsed = current_time - roll.created_at
         if roll_time_elapsed.total_seconds() >= 30:
             logger.info(
                 "KAKERA REACT SKIPPED: Roll too old (%.1fs > 30s timeout)",
@@ -420,116 +965,144 @@ class AutoMudaeAgent(discord.Client):
             )
             return
 
-        kakera_buttons = [
-            button.emoji.name for button in roll.buttons if button.emoji is not None
-        ]
+        kakera_buttons = list(roll.button_names)
         logger.info("KAKERA BUTTONS FOUND: %s", kakera_buttons)
 
-        if "kakeraP" in kakera_buttons:
-            time_to_claim = self.get_reaction_time(roll)
+        candidate = self.kakera_planner.candidate(
+            roll,
+            state.timer_status.kakera_power,
+            state.timer_status.kakera_react_cost,
+        )
+        if candidate is None:
+            return
+
+        if candidate.cost == 0:
             logger.info(
-                "KAKERA REACTING: kakeraP found - immediate reaction (reaction time: %.2fs)",
-                time_to_claim,
+                "KAKERA REACTING: %s costs no power - immediate reaction (reaction time: %.2fs)",
+                kakera_buttons,
+                self.get_reaction_time(roll),
             )
-            async with self.react_rate_limiter:
-                await roll.kakera_react()
+            await self.kakera_react(roll)
             return
 
-        kakera_power_requirements = (
-            self.config.mudae.kakeraReact.doNotReactToKakeraTypeIfKakeraPowerLessThan
+        logger.info(
+            "KAKERA PICK HELD: %s (value: %s, cost: %s%%), %d picks held",
+            kakera_buttons,
+            candidate.value,
+            candidate.cost,
+            len(state.kakera_picks) + 1,
         )
-        for kakera_type, minimum_power in kakera_power_requirements.items():
-            if (
-                kakera_type in kakera_buttons
-                and self.state.timer_status.kakera_power < minimum_power
-            ):
-                logger.info(
-                    "KAKERA REACT SKIPPED: %s requires %s power but only have %s",
-                    kakera_type,
-                    minimum_power,
-                    self.state.timer_status.kakera_power,
-                )
-                return
-
-        logger.info("PROCESSING: Evaluating for best kakera pick selection")
+        state.kakera_picks.append(candidate)
 
-        if self.state.kakera_best_pick is None:
+        if state.timer_status.rolls_available > state.rolls_handled:
+            remaining_rolls = state.timer_status.rolls_available - state.rolls_handled
             logger.info(
-                "BEST KAKERA UPDATED: No previous best pick - setting this as best (value: %s)",
-                roll.kakera_value,
+                "KAKERA REACT DEFERRED: Waiting for %s more rolls before reacting to the best picks",
+                remaining_rolls,
             )
-            self.state.kakera_best_pick = roll
-        elif self.state.kakera_best_pick.kakera_value <= roll.kakera_value:
+            return
+
+        await self.commit_kakera_picks(state)
+
+    async def commit_kakera_picks(
+        self,
+        state: AutoMudaeAgentState,
+        expiring: MudaeKakeraRollResult | None = None,
+    ) -> None:
+        """React to the held picks that fit in the kakera power left.
+
+        Once the burst is over every planned pick is clicked. A pick that is about
+        to expire is clicked if it is part of the plan and dropped otherwise, the
+        other picks stay held.
+        """
+        if not state.timer_status.can_kakera_react:
             logger.info(
-                "BEST KAKERA UPDATED: Higher value (%s >= %s) - replacing previous best",
-                roll.kakera_value,
-                self.state.kakera_best_pick.kakera_value,
+                "KAKERA REACT BLOCKED: Timer cooldown active - cannot react yet"
             )
-            self.state.kakera_best_pick = roll
+            plan = []
         else:
-            logger.info(
-                "BEST KAKERA UNCHANGED: Current roll value (%s) doesn't beat existing best (%s)",
-                roll.kakera_value,
-                self.state.kakera_best_pick.kakera_value,
-            )
-
-        for button_name in kakera_buttons:
-            if button_name in self.config.mudae.kakeraReact.doNotReactToKakeraTypes:
-                logger.info(
-                    "KAKERA REACT BLOCKED: %s is in blocked kakera types list",
-                    button_name,
-                )
-                return
-
-        if self.state.timer_status.rolls_available > self.state.rolls_handled:
-            remaining_rolls = (
-                self.state.timer_status.rolls_available - self.state.rolls_handled
+            plan = self.kakera_planner.plan(
+                state.kakera_picks, state.timer_status.kakera_power
             )
             logger.info(
-                "KAKERA REACT DEFERRED: Waiting for %s more rolls before reacting to best",
-                remaining_rolls,
+                "KAKERA PLAN: %d of %d picks for %s kakera with %s%% power",
+                len(plan),
+                len(state.kakera_picks),
+                sum(candidate.value for candidate in plan),
+                state.timer_status.kakera_power,
             )
-            return
 
-        if not self.state.timer_status.can_kakera_react:
+        if expiring is not None:
+            plan = [candidate for candidate in plan if candidate.roll is expiring]
+            committed = [
+                candidate
+                for candidate in state.kakera_picks
+                if candidate.roll is expiring
+            ]
+        else:
+            committed = state.kakera_picks
+
+        for candidate in plan:
+            self.set_log_context(state, candidate.roll)
             logger.info(
-                "KAKERA REACT BLOCKED: Timer cooldown active - cannot react yet"
+                "KAKERA REACTING: Planned pick worth %s for %s%% power (reaction time: %.2fs)",
+                candidate.value,
+                candidate.cost,
+                self.get_reaction_time(candidate.roll),
             )
-            return
+            if await self.kakera_react(candidate.roll):
+                state.timer_status.spend_kakera_power(candidate.cost)
 
-        time_to_claim = self.get_reaction_time(roll)
-        logger.info(
-            "KAKERA REACTING: Best pick selected with buttons %s (reaction time: %.2fs)",
-            kakera_buttons,
-            time_to_claim,
-        )
-        async with self.react_rate_limiter:
-            await roll.kakera_react()
-            self.state.timer_status.can_kakera_react = False
-
-        self.state.kakera_best_pick = None
+        state.kakera_picks = [
+            candidate for candidate in state.kakera_picks if candidate not in committed
+        ]
+        self.record_rolls(state, *(candidate.roll for candidate in committed))
 
-    async def handle_finalizer(self) -> None:
-        if self.state.timer_status.rolls_available > self.state.rolls_handled:
+    async def handle_finalizer(self, state: AutoMudaeAgentState) -> None:
+        if state.timer_status.rolls_available > state.rolls_handled:
             logger.debug("> Rolls Not 0 Yet")
             return
 
-        if self.state.best_claim_roll is not None:
-            await self.handle_claim(self.state.best_claim_roll)
-            self.state.best_claim_roll = None
+        if state.best_claim_roll is not None:
+            await self.handle_claim(state, state.best_claim_roll)
+            state.best_claim_roll = None
             return
 
-        if self.state.kakera_best_pick is not None:
-            await self.handle_kakera_react(self.state.kakera_best_pick)
-            self.state.kakera_best_pick = None
+        if state.kakera_picks:
+            await self.commit_kakera_picks(state)
             return
 
-    def get_reaction_time(self, roll: MudaeRollResult) -> float:
-        return (datetime.now(tz=timezone.utc) - roll.message.created_at).total_seconds()
+    async def close(self) -> None:
+        self.deadlines.cancel()
+        self.snapshot_file.save(self.snapshot())
+        self.trace_writer.close()
+        self.roll_store.close()
+        await super().close()
+
+    def set_log_context(
+        self, state: AutoMudaeAgentState, roll: MudaeRollResult
+    ) -> None:
+        context: dict[str, object] = {
+            "channel": state.channel.id,
+            "message_id": roll.message_id,
+            "owner": roll.owner.id,
+            "kakera": roll.kakera_value,
+        }
+        if isinstance(roll, MudaeClaimableRollResult):
+            context["character"] = roll.character
+            context["series"] = roll.series
+        log_context.set(context)
+
+    def get_claim_threshold(self, state: AutoMudaeAgentState) -> float | None:
+        """Expected kakera of continuing to roll, None without a threshold table"""
+        if self.claim_thresholds is None:
+            return None
+        timer_status = state.timer_status
+        return self.claim_thresholds.threshold(
+            max(0, timer_status.rolls_available - state.rolls_handled),
+            timer_status.hours_until_claim_reset,
+            timer_status.rolls_available,
+        )
 
-    async def refresh_loop(self) -> None:
-        while True:
-            await asyncio.gather(
-                *[connection.refresh() for connection in self.connections]
-            )
-            await asyncio.sleep(1)
+    def get_reaction_time(self, roll: MudaeRollResult) -> float:
+        return (datetime.now(tz=timezone.utc) - roll.created_at).total_seconds()
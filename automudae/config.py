@@ -1,10 +1,15 @@
 # pylint: disable=R0903
+import hashlib
 import logging
+import re
 import sys
+from pathlib import Path
 from typing import Literal
 
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from automudae.mudae.roll.pattern import NAME_REGEX_PREFIX, compile_name_regex
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +21,38 @@ class Criteria(BaseModel):
     series: list[str] = Field(default_factory=list[str])
     minKakera: int = sys.maxsize
 
+    @field_validator("character", "series")
+    @classmethod
+    def check_regexes(cls, patterns: list[str]) -> list[str]:
+        for pattern in patterns:
+            if not pattern.startswith(NAME_REGEX_PREFIX):
+                continue
+            try:
+                compile_name_regex(pattern[len(NAME_REGEX_PREFIX) :])
+            except re.error as error:
+                raise ValueError(f"Invalid pattern {pattern!r}: {error}") from error
+        return patterns
+
 
 class ClaimCriteria(Criteria):
     exception: Criteria = Field(default_factory=Criteria)
 
 
+class OptimalStoppingConfig(BaseModel):
+
+    enabled: bool = False
+    historyDays: float = 30
+    minSamples: int = 200
+
+
 class ClaimConfig(BaseModel):
 
     snipe: ClaimCriteria = Field(default_factory=ClaimCriteria)
     earlyClaim: ClaimCriteria = Field(default_factory=ClaimCriteria)
     lateClaim: ClaimCriteria = Field(default_factory=ClaimCriteria)
+    optimalStopping: OptimalStoppingConfig = Field(
+        default_factory=OptimalStoppingConfig
+    )
 
 
 class RollConfig(BaseModel):
@@ -42,6 +69,7 @@ class KakeraReactConfig(BaseModel):
     doNotReactToKakeraTypeIfKakeraPowerLessThan: dict[str, int] = Field(
         default_factory=dict[str, int]
     )
+    kakeraPowerCost: dict[str, int] = Field(default_factory=lambda: {"kakeraP": 0})
 
 
 class MudaeConfig(BaseModel):
@@ -54,24 +82,62 @@ class MudaeConfig(BaseModel):
 class DiscordConfig(BaseModel):
 
     token: str
-    channelId: int
+    channelId: int | None = None
+    channelIds: list[int] = Field(default_factory=list[int])
     mudaeBotId: int
 
+    @model_validator(mode="after")
+    def merge_channel_ids(self) -> "DiscordConfig":
+        if self.channelId is not None and self.channelId not in self.channelIds:
+            self.channelIds.insert(0, self.channelId)
+        if not self.channelIds:
+            raise ValueError("Either channelId or channelIds is required")
+        return self
+
     def __repr__(self) -> str:
-        return (
-            f"DiscordConfig(token='****', channelId=****, mudaeBotId={self.mudaeBotId})"
-        )
+        return f"DiscordConfig(token='****', channelIds=****, mudaeBotId={self.mudaeBotId})"
 
     def __str__(self) -> str:
         return self.__repr__()
 
 
+class TraceConfig(BaseModel):
+
+    file: str | None = None
+
+
+class StoreConfig(BaseModel):
+
+    file: str | None = None
+
+
+class SnapshotConfig(BaseModel):
+
+    file: str | None = None
+
+
+class MetricsConfig(BaseModel):
+
+    host: str = "127.0.0.1"
+    port: int | None = None
+
+
+class LogConfig(BaseModel):
+
+    format: Literal["text", "json"] = "text"
+
+
 class Config(BaseModel):
 
     name: str
     version: Literal[1]
     discord: DiscordConfig
     mudae: MudaeConfig
+    trace: TraceConfig = Field(default_factory=TraceConfig)
+    store: StoreConfig = Field(default_factory=StoreConfig)
+    snapshot: SnapshotConfig = Field(default_factory=SnapshotConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    log: LogConfig = Field(default_factory=LogConfig)
 
     class Config:
         extra = "forbid"
@@ -80,5 +146,24 @@ class Config(BaseModel):
     def from_file(cls, path: str = "config/config.yaml"):
         logger.info("Loading Config from %s", path)
         with open(path, "r", encoding="utf-8") as f:
-            yaml_data = yaml.safe_load(f)
+            # The libyaml loader when PyYAML was built with it, several times faster
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            yaml_data = yaml.load(f, Loader=loader)
             return Config(**yaml_data)
+
+    @classmethod
+    def write_schema(cls, path: str = "config/schema.yaml", force: bool = False):
+        """Write the JSON schema, unless it was generated from this very module"""
+        digest = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+        header = f"# sha256: {digest}\n"
+        if not force:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    if f.readline() == header:
+                        return
+            except FileNotFoundError:
+                pass
+
+        logger.info("Writing Config Schema to %s", path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(header + yaml.dump(cls.model_json_schema()))
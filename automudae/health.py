@@ -0,0 +1,119 @@
+# pylint: disable=R0902
+import asyncio
+import logging
+import math
+import time
+
+import discord
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+HEALTH_MIN_INTERVAL_SEC = 5.0
+HEALTH_MAX_INTERVAL_SEC = 300.0
+HEALTH_LATENCY_THRESHOLD_SEC = 2.0
+
+
+class ConnectionHealth:
+    """Refreshes the account connections only when the gateway looks unhealthy.
+
+    The watchdog checks heartbeat latency and the time since the last heartbeat
+    ACK. While healthy, the check interval doubles up to ``max_interval``, and
+    channel activity resets it to ``min_interval``. A disconnect marks the
+    connections stale, and the following resume or connect triggers a refresh
+    right away.
+    """
+
+    def __init__(
+        self,
+        client: discord.Client,
+        min_interval: float = HEALTH_MIN_INTERVAL_SEC,
+        max_interval: float = HEALTH_MAX_INTERVAL_SEC,
+        latency_threshold: float = HEALTH_LATENCY_THRESHOLD_SEC,
+    ) -> None:
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.latency_threshold = latency_threshold
+
+        self.interval = min_interval
+        self.wakeup = asyncio.Event()
+        self.stale = False
+
+        self.checks = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.disconnects = 0
+        self.reconnects = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"interval={self.interval:.0f}s, "
+            f"checks={self.checks}, "
+            f"refreshes={self.refreshes}, "
+            f"refresh_failures={self.refresh_failures}, "
+            f"disconnects={self.disconnects}, "
+            f"reconnects={self.reconnects})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def on_activity(self) -> None:
+        self.interval = self.min_interval
+
+    def on_disconnect(self) -> None:
+        self.disconnects += 1
+        self.stale = True
+
+    def on_connect(self) -> None:
+        self.reconnects += 1
+        self.wakeup.set()
+
+    def heartbeat_gap(self) -> float:
+        """Seconds the next heartbeat ACK is overdue, 0 if it is not"""
+        ws = self.client.ws
+        keep_alive = ws._keep_alive if ws is not None else None  # pylint: disable=W0212
+        if keep_alive is None or keep_alive.interval is None:
+            return 0.0
+        since_ack = time.perf_counter() - keep_alive._last_ack  # pylint: disable=W0212
+        return max(0.0, since_ack - keep_alive.interval)
+
+    def unhealthy_reason(self) -> str | None:
+        if self.stale:
+            return "reconnected"
+        latency = self.client.latency
+        if math.isfinite(latency) and latency > self.latency_threshold:
+            return f"heartbeat latency {latency:.2f}s"
+        if (gap := self.heartbeat_gap()) > self.latency_threshold:
+            return f"heartbeat ACK overdue by {gap:.2f}s"
+        return None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            self.checks += 1
+
+            if (reason := self.unhealthy_reason()) is None:
+                self.interval = min(self.interval * 2, self.max_interval)
+                continue
+
+            self.stale = False
+            self.interval = self.min_interval
+            await self.refresh(reason)
+
+    async def refresh(self, reason: str) -> None:
+        self.refreshes += 1
+        results = await asyncio.gather(
+            *[connection.refresh() for connection in self.client.connections],
+            return_exceptions=True,
+        )
+        self.refresh_failures += sum(
+            isinstance(result, Exception) for result in results
+        )
+        logger.info("Refreshed connections (%s): %s", reason, self)
@@ -0,0 +1,90 @@
+import json
+import logging
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Literal
+
+LOG_TEXT_FORMAT = "[{asctime}] [{levelname:<8}] {name}: {message}"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Arguments that cannot change before the listener thread formats them
+LOG_LAZY_ARG_TYPES = (str, int, float, bytes, type(None))
+# Fields of the roll being decided on, attached to every record logged meanwhile
+log_context: ContextVar[dict[str, Any] | None] = ContextVar("log_context", default=None)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Hands records to the listener thread, formatting them only if needed.
+
+    ``QueueHandler.prepare`` formats the message in the logging thread. Here a
+    record whose message is a string and whose arguments are all immutable
+    primitives is formatted in the listener thread instead. Any other object, like
+    a roll, a timer status or a queue, would be formatted after the event loop
+    changed it, so those records are formatted right away.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.context = log_context.get()
+        if not isinstance(record.msg, str) or (
+            record.args
+            and not (
+                isinstance(record.args, tuple)
+                and all(isinstance(arg, LOG_LAZY_ARG_TYPES) for arg in record.args)
+            )
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the decision context as fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        entry: dict[str, Any] = {
+            "at": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": message,
+        }
+        decision, separator, _ = message.partition(":")
+        if separator and decision.isupper():
+            entry["decision"] = decision
+        if (context := getattr(record, "context", None)) is not None:
+            entry.update(context)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(
+    log_format: Literal["text", "json"] = "text",
+    level: int = logging.INFO,
+    handler: logging.Handler | None = None,
+) -> QueueListener:
+    """Route every record through a queue to ``handler``, stdout by default"""
+    if handler is None:
+        handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(
+            logging.Formatter(LOG_TEXT_FORMAT, LOG_DATE_FORMAT, style="{")
+        )
+
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(LazyQueueHandler(records))
+    root.setLevel(level)
+
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
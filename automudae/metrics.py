@@ -0,0 +1,243 @@
+# pylint: disable=R0902
+import asyncio
+import bisect
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+METRICS_LATENCY_BUCKETS = [
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+]
+METRICS_REQUEST_TIMEOUT_SEC = 5.0
+
+MetricLabels = tuple[str, ...]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: list[str], values: MetricLabels, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricCounter:
+    """A monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: list[str]) -> None:
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values: dict[MetricLabels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{format_labels(self.labels, labels)} {format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class MetricGauge(MetricCounter):
+    """A value that goes up and down, per label set"""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+
+class MetricHistogram:
+    """Observations counted in cumulative buckets, per label set"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: list[str],
+        buckets: list[float] | None = None,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets or METRICS_LATENCY_BUCKETS
+        # Per label set: a count per bucket plus +Inf, then the sum
+        self.values: dict[MetricLabels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if (counts := self.values.get(labels)) is None:
+            counts = self.values[labels] = [0.0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, counts in sorted(self.values.items()):
+            cumulative = 0.0
+            for bound, count in zip([*self.buckets, math.inf], counts):
+                cumulative += count
+                bucket_labels = format_labels(
+                    self.labels, labels, f'le="{format_value(bound)}"'
+                )
+                lines.append(
+                    f"{self.name}_bucket{bucket_labels} {format_value(cumulative)}"
+                )
+            label_text = format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{label_text} {format_value(cumulative)}")
+        return lines
+
+
+class AgentMetrics:
+    """Counters and histograms of the agent, rendered in the Prometheus text format.
+
+    Recording is a dict update, so it is always on; the metrics are only served
+    when ``metrics.port`` is configured.
+    """
+
+    def __init__(self) -> None:
+        self.rolls_executed = MetricCounter(
+            "automudae_rolls_executed_total", "Roll commands sent", ["channel"]
+        )
+        self.rolls_handled = MetricCounter(
+            "automudae_rolls_handled_total", "Own rolls handled", ["channel"]
+        )
+        self.claims = MetricCounter(
+            "automudae_claims_total",
+            "Claims made or rejected, and rolls passing the criteria missed, by reason",
+            ["result", "reason"],
+        )
+        self.kakera_reacts = MetricCounter(
+            "automudae_kakera_reacts_total", "Kakera reactions", ["result"]
+        )
+        self.roll_queue_depth = MetricGauge(
+            "automudae_roll_queue_depth", "Rolls waiting to be handled", ["channel"]
+        )
+        self.lock_hold = MetricHistogram(
+            "automudae_lock_hold_seconds", "Time a timer lock was held", ["lock"]
+        )
+        self.limiter_wait = MetricHistogram(
+            "automudae_limiter_wait_seconds",
+            "Time waited for a rate limiter slot",
+            ["route"],
+        )
+        self.reaction_time = MetricHistogram(
+            "automudae_reaction_seconds",
+            "Time from the roll message to the end of its click",
+            ["action"],
+        )
+
+    def render(self) -> str:
+        lines = []
+        for metric in (
+            self.rolls_executed,
+            self.rolls_handled,
+            self.claims,
+            self.kakera_reacts,
+            self.roll_queue_depth,
+            self.lock_hold,
+            self.limiter_wait,
+            self.reaction_time,
+        ):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = AgentMetrics()
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` over plain HTTP/1.0, one request per connection"""
+
+    def __init__(
+        self, host: str, port: int | None, metrics: AgentMetrics = METRICS
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self.server: asyncio.Server | None = None
+        self.requests = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"host={self.host}, "
+            f"port={self.port}, "
+            f"requests={self.requests})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    async def run(self) -> None:
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        host, port, *_ = self.server.sockets[0].getsockname()
+        logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), METRICS_REQUEST_TIMEOUT_SEC
+            )
+            method, path, *_ = request.split(b"\r\n", 1)[0].decode().split(" ")
+            self.requests += 1
+            if method == "GET" and path.split("?", 1)[0] == "/metrics":
+                status = "200 OK"
+                body = self.metrics.render().encode()
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+            head = (
+                f"HTTP/1.0 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode() + body)
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            asyncio.TimeoutError,
+            ConnectionError,
+            ValueError,
+        ):
+            # Incomplete, oversized or malformed requests are dropped unanswered
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,75 @@
+import logging
+from enum import Enum, auto
+from typing import get_args
+
+import discord
+
+from automudae.mudae.roll import MudaeRollCommandType
+from automudae.mudae.roll.result import (
+    CLAIMABLE_ROLL_MARKER,
+    KAKERA_TYPES,
+    WISHED_ROLL_MARKER,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ROLL_COMMANDS = frozenset(get_args(MudaeRollCommandType))
+
+
+class MudaeMessageKind(Enum):
+    NOISE = auto()
+    ROLL_COMMAND = auto()
+    CLAIMABLE_ROLL = auto()
+    KAKERA_ROLL = auto()
+    TIMER_STATUS = auto()
+
+
+class MudaeMessageClassifier:
+    """Routes a channel message to the single parser that can handle it.
+
+    Only cheap attribute checks are done here: the author, whether the message
+    has an embed or components, and a content prefix. Anything that is not from
+    Mudae and is not a roll command is noise and never reaches a parser.
+    """
+
+    def __init__(self, mudae_bot_id: int) -> None:
+        self.mudae_bot_id = mudae_bot_id
+
+    def classify(
+        self, message: discord.Message, current_user: discord.ClientUser
+    ) -> MudaeMessageKind:
+        if message.author.id != self.mudae_bot_id:
+            if message.content in ROLL_COMMANDS:
+                return MudaeMessageKind.ROLL_COMMAND
+            return MudaeMessageKind.NOISE
+
+        if message.embeds:
+            description = message.embeds[0].description
+            if description and (
+                CLAIMABLE_ROLL_MARKER in description
+                or WISHED_ROLL_MARKER in message.content
+            ):
+                return MudaeMessageKind.CLAIMABLE_ROLL
+
+        if message.components and self.has_kakera_button(message):
+            return MudaeMessageKind.KAKERA_ROLL
+
+        if not message.embeds and current_user.name in message.content:
+            return MudaeMessageKind.TIMER_STATUS
+
+        return MudaeMessageKind.NOISE
+
+    @staticmethod
+    def has_kakera_button(message: discord.Message) -> bool:
+        for component in message.components:
+            if not isinstance(component, discord.ActionRow):
+                continue
+            for child in component.children:
+                if (
+                    isinstance(child, discord.Button)
+                    and child.emoji
+                    and child.emoji.name in KAKERA_TYPES
+                ):
+                    return True
+        return False
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CLICK_RETRY_BASE_SEC = 0.2
+CLICK_RETRY_MAX_SEC = 2.0
+# Only failures that show the request was never handled: a click is not idempotent,
+# after a read timeout or a 5xx it may have gone through
+CLICK_TRANSIENT_ERRORS = (
+    discord.RateLimited,
+    aiohttp.ClientConnectorError,
+)
+
+Click = Callable[[], Awaitable[Any]]
+ClickSlot = Callable[[], AbstractAsyncContextManager[None]]
+
+
+@dataclass
+class ClickResult:
+    name: str
+    waited: float
+    latency: float
+    attempts: int
+    hedged: bool
+    error: BaseException | None = None
+
+    def __repr__(self) -> str:
+        outcome = "ok" if self.error is None else f"failed ({self.error!r})"
+        return (
+            f"{self.name}: {outcome} in {self.latency * 1e3:.0f}ms "
+            f"({self.waited * 1e3:.0f}ms waiting), "
+            f"{self.attempts} attempts{', hedged' if self.hedged else ''}"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+class ClickHandle:
+    """Performs the clicks of a roll message, without retaining the message.
+
+    A reaction only needs the channel and the message id. Buttons are clicked
+    through the message they belong to, so they are kept until ``release``, once
+    the roll was decided.
+    """
+
+    __slots__ = ("target", "buttons")
+
+    def __init__(self, message: discord.Message, buttons: list[discord.Button]) -> None:
+        self.target: discord.PartialMessage = message.channel.get_partial_message(  # type: ignore[union-attr]
+            message.id
+        )
+        self.buttons = buttons
+
+    def react(self, emoji: str) -> Click:
+        return partial(self.target.add_reaction, emoji)
+
+    def button_clicks(self) -> list[tuple[str, Click]]:
+        return [
+            (button.emoji.name if button.emoji else "button", button.click)
+            for button in self.buttons
+        ]
+
+    def release(self) -> None:
+        self.buttons = []
+
+
+class ClickAttempt:
+    """A single request for a click, timed from the slot request"""
+
+    def __init__(self, click: Click, slot: ClickSlot) -> None:
+        self.click = click
+        self.slot = slot
+        self.waited = 0.0
+
+    async def run(self) -> None:
+        start = time.perf_counter()
+        async with self.slot():
+            self.waited = time.perf_counter() - start
+            await self.click()
+
+
+class ClickExecutor:
+    """Performs the clicks of a roll concurrently, each in its own limiter slot.
+
+    A click still pending after ``hedge_after`` seconds is sent once more, and the
+    first of the two responses wins. Only idempotent clicks, i.e. reactions, may be
+    hedged; ``hedge_after`` is None for buttons, whose interaction may already
+    have been handled. A click that was refused before it reached Discord, by a
+    failed connection or a 429, is retried with full jitter exponential backoff
+    until the roll's deadline; any other failure is final.
+    """
+
+    def __init__(self) -> None:
+        self.clicks = 0
+        self.hedges = 0
+        self.retries = 0
+        self.failures = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"clicks={self.clicks}, "
+            f"hedges={self.hedges}, "
+            f"retries={self.retries}, "
+            f"failures={self.failures})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    async def run(
+        self,
+        clicks: list[tuple[str, Click]],
+        slot: ClickSlot,
+        deadline: float,
+        hedge_after: float | None,
+    ) -> list[ClickResult]:
+        """Click everything before ``deadline``, a UNIX timestamp"""
+        return list(
+            await asyncio.gather(
+                *(
+                    self.click(name, click, slot, deadline, hedge_after)
+                    for name, click in clicks
+                )
+            )
+        )
+
+    async def click(
+        self,
+        name: str,
+        click: Click,
+        slot: ClickSlot,
+        deadline: float,
+        hedge_after: float | None,
+    ) -> ClickResult:
+        self.clicks += 1
+        start = time.perf_counter()
+        result = ClickResult(name, 0.0, 0.0, 0, False)
+        while True:
+            result.attempts += 1
+            try:
+                attempt = await self.hedged(click, slot, hedge_after, result)
+                result.waited += attempt.waited
+                break
+            except CLICK_TRANSIENT_ERRORS as error:
+                delay = random.uniform(
+                    0,
+                    min(CLICK_RETRY_MAX_SEC, CLICK_RETRY_BASE_SEC * 2**result.attempts),
+                )
+                if time.time() + delay >= deadline:
+                    result.error = error
+                    break
+                self.retries += 1
+                logger.info(
+                    "Click %s failed (%r), retrying in %.2fs", name, error, delay
+                )
+                await asyncio.sleep(delay)
+            except (discord.HTTPException, aiohttp.ClientError, OSError) as error:
+                result.error = error
+                break
+
+        result.latency = time.perf_counter() - start
+        if result.error is not None:
+            self.failures += 1
+        return result
+
+    async def hedged(
+        self,
+        click: Click,
+        slot: ClickSlot,
+        hedge_after: float | None,
+        result: ClickResult,
+    ) -> ClickAttempt:
+        """The first attempt to succeed, hedged once if slow to respond"""
+        attempts = {asyncio.ensure_future(self.attempt(ClickAttempt(click, slot)))}
+        done, pending = await asyncio.wait(attempts, timeout=hedge_after)
+        if not done and hedge_after is not None and not result.hedged:
+            result.hedged = True
+            self.hedges += 1
+            pending.add(asyncio.ensure_future(self.attempt(ClickAttempt(click, slot))))
+
+        error: BaseException | None = None
+        try:
+            while True:
+                for task in done:
+                    if (error := task.exception()) is None:
+                        return task.result()
+                if not pending:
+                    assert error is not None
+                    raise error
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def attempt(attempt: ClickAttempt) -> ClickAttempt:
+        await attempt.run()
+        return attempt
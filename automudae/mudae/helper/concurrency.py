@@ -1,21 +1,34 @@
 import asyncio
 import logging
+import time
+
+from automudae.metrics import METRICS
+from automudae.mudae.helper.trace import RollTrace
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
 class LockDebugger:
-    def __init__(self, lock: asyncio.Lock, name: str) -> None:
+    def __init__(
+        self, lock: asyncio.Lock, name: str, trace: RollTrace | None = None
+    ) -> None:
         self.lock = lock
         self.name = name
+        self.trace = trace
+        self.acquired_at = 0.0
 
     async def __aenter__(self) -> None:
+        start = time.perf_counter()
         await self.lock.acquire()
+        self.acquired_at = time.perf_counter()
+        if self.trace is not None:
+            self.trace.add("lock", self.acquired_at - start)
         logger.debug("Obtained Lock (%s)", self.name)
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
         self.lock.release()
+        METRICS.lock_hold.observe(time.perf_counter() - self.acquired_at, self.name)
         logger.debug("Released Lock (%s)", self.name)
 
 
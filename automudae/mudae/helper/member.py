@@ -0,0 +1,89 @@
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MEMBER_CACHE_SIZE = 512
+MEMBER_CACHE_TTL_SEC = 6 * 60 * 60
+
+CachedMember = discord.Member | discord.User | discord.user.BaseUser
+
+
+class MemberCache:
+    """TTL and LRU bounded cache of guild members for ``wished_by`` resolution.
+
+    Lookups are answered from, in order: this cache, the users mentioned in the
+    message, the gateway member cache, and only then ``fetch_member`` over REST.
+    """
+
+    def __init__(
+        self, maxsize: int = MEMBER_CACHE_SIZE, ttl: float = MEMBER_CACHE_TTL_SEC
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.members: OrderedDict[tuple[int, int], tuple[float, CachedMember]] = (
+            OrderedDict()
+        )
+
+        self.hits = 0
+        self.gateway_hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"size={len(self.members)}, "
+            f"hits={self.hits}, "
+            f"gateway_hits={self.gateway_hits}, "
+            f"misses={self.misses})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def put(self, guild_id: int, member: CachedMember) -> None:
+        key = (guild_id, member.id)
+        self.members[key] = (time.monotonic() + self.ttl, member)
+        self.members.move_to_end(key)
+        while len(self.members) > self.maxsize:
+            self.members.popitem(last=False)
+
+    def get(self, guild_id: int, member_id: int) -> CachedMember | None:
+        key = (guild_id, member_id)
+        if (entry := self.members.get(key)) is None:
+            return None
+        expires_at, member = entry
+        if expires_at < time.monotonic():
+            del self.members[key]
+            return None
+        self.members.move_to_end(key)
+        return member
+
+    def warm(self, guild: discord.Guild) -> None:
+        for member in guild.members[: self.maxsize]:
+            self.put(guild.id, member)
+        logger.debug("Member cache warmed from %s: %s", guild.id, self)
+
+    async def resolve(self, message: discord.Message, member_id: int) -> CachedMember:
+        assert message.guild
+        guild_id = message.guild.id
+
+        if (member := self.get(guild_id, member_id)) is not None:
+            self.hits += 1
+            return member
+
+        member = next((user for user in message.mentions if user.id == member_id), None)
+        if member is None:
+            member = message.guild.get_member(member_id)
+        if member is not None:
+            self.gateway_hits += 1
+        else:
+            self.misses += 1
+            member = await message.guild.fetch_member(member_id)
+
+        self.put(guild_id, member)
+        return member
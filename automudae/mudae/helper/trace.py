@@ -0,0 +1,157 @@
+import json
+import logging
+import math
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, TextIO
+
+import discord
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+TRACE_FLUSH_INTERVAL_SEC = 1.0
+TRACE_STAGES = [
+    "receipt",
+    "parse",
+    "owner",
+    "queue",
+    "lock",
+    "limiter",
+    "click",
+    "total",
+]
+
+
+class RollTrace:
+    """Timed spans of a single roll, from message receipt to the click.
+
+    Durations are kept in seconds, keyed by stage. A stage recorded more than once,
+    e.g. waiting on the lock for a deferred claim, accumulates.
+    """
+
+    __slots__ = (
+        "message_id",
+        "created_at",
+        "kind",
+        "action",
+        "spans",
+        "queued_at",
+        "written",
+    )
+
+    def __init__(self, message: discord.Message, kind: str) -> None:
+        self.message_id = message.id
+        self.created_at = message.created_at
+        self.kind = kind
+        self.action: str | None = None
+        self.spans: dict[str, float] = {
+            "receipt": (datetime.now(tz=timezone.utc) - self.created_at).total_seconds()
+        }
+        self.queued_at = 0.0
+        self.written = False
+
+    def enqueue(self) -> None:
+        self.queued_at = time.perf_counter()
+
+    def dequeue(self) -> None:
+        self.since("queue", self.queued_at)
+
+    def finish(self, action: str) -> None:
+        """Record the action taken and the total time since the roll was created"""
+        self.action = action
+        self.spans["total"] = (
+            datetime.now(tz=timezone.utc) - self.created_at
+        ).total_seconds()
+
+    def add(self, stage: str, duration: float) -> None:
+        self.spans[stage] = self.spans.get(stage, 0.0) + duration
+
+    def since(self, stage: str, start: float) -> None:
+        self.add(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.since(stage, start)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "id": self.message_id,
+                "at": round(self.created_at.timestamp(), 3),
+                "kind": self.kind,
+                "action": self.action,
+                "spans": {
+                    stage: round(duration * 1e3, 3)
+                    for stage, duration in self.spans.items()
+                },
+            },
+            separators=(",", ":"),
+        )
+
+
+class TraceWriter:
+    """Appends finished roll traces to a JSON lines file"""
+
+    def __init__(self, path: str | None) -> None:
+        self.path = path
+        self.file: TextIO | None = None
+        self.last_flush = time.monotonic()
+        if path is not None:
+            self.file = open(  # pylint: disable=R1732
+                path, "a", encoding="utf-8", buffering=1 << 16
+            )
+            logger.info("Writing roll traces to %s", path)
+
+    def write(self, trace: RollTrace) -> None:
+        if self.file is None or trace.written:
+            return
+        trace.written = True
+        self.file.write(trace.to_json() + "\n")
+        if time.monotonic() - self.last_flush >= TRACE_FLUSH_INTERVAL_SEC:
+            self.file.flush()
+            self.last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(path: str) -> str:
+    stages: dict[tuple[str, str], list[float]] = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            group = f"{record['kind']}:{record['action'] or 'none'}"
+            for stage, duration in record["spans"].items():
+                stages[(group, stage)].append(duration)
+
+    lines = [f"{'group':<24} {'stage':<10} {'n':>6} {'p50 ms':>9} {'p99 ms':>9}"]
+    for group in sorted({group for group, _ in stages}):
+        for stage in TRACE_STAGES:
+            if (durations := stages.get((group, stage))) is None:
+                continue
+            lines.append(
+                f"{group:<24} {stage:<10} {len(durations):>6} "
+                f"{percentile(durations, 50):>9.2f} {percentile(durations, 99):>9.2f}"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(summarize(sys.argv[1] if len(sys.argv) > 1 else "config/traces.jsonl"))
@@ -1,9 +1,13 @@
-# pylint: disable=R0903
+# pylint: disable=R0902,R0903
 import logging
-from typing import Literal
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal, TypedDict
 
 import discord
-from pydantic import BaseModel
+
+from automudae.mudae.helper.click import ClickHandle
+from automudae.mudae.helper.trace import RollTrace
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -15,9 +19,45 @@ MudaeRollOwner = (
 MudaeRollCommandType = Literal["$wg", "$wa", "$w", "$wx"]
 
 
-class MudaeRoll(BaseModel):
-    owner: MudaeRollOwner
-    message: discord.Message
+class MudaeRollFields(TypedDict):
+    message_id: int
+    channel_id: int
+    created_at: datetime
+    handle: ClickHandle
+    button_names: tuple[str, ...]
+    custom_ids: tuple[str, ...]
+
+
+def get_roll_fields(
+    message: discord.Message, buttons: list[discord.Button]
+) -> MudaeRollFields:
+    """The fields of a roll on ``message``, clicked with ``buttons``"""
+    return MudaeRollFields(
+        message_id=message.id,
+        channel_id=message.channel.id,
+        created_at=message.created_at,
+        handle=ClickHandle(message, buttons),
+        button_names=tuple(button.emoji.name for button in buttons if button.emoji),
+        custom_ids=tuple(button.custom_id or "" for button in buttons),
+    )
 
-    class Config:
-        arbitrary_types_allowed = True
+
+@dataclass(slots=True, kw_only=True, eq=False)
+class MudaeRoll:
+    """What the decisions need of a roll message, which itself is not kept.
+
+    Rolls compare by identity. ``handle`` performs the clicks.
+    """
+
+    owner: MudaeRollOwner
+    message_id: int
+    channel_id: int
+    created_at: datetime
+    handle: ClickHandle
+    button_names: tuple[str, ...] = ()
+    custom_ids: tuple[str, ...] = ()
+    trace: RollTrace | None = None
+    # A roll of the same message was emitted before, this one is from an edit
+    update: bool = False
+    # Already in the roll store, a roll is stored once it is done with
+    recorded: bool = False
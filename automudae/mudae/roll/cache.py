@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from automudae.mudae.roll import MudaeRollOwner
+from automudae.mudae.roll.result import MudaeClaimableRollResult
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ROLL_CACHE_SIZE = 256
+
+
+@dataclass
+class MudaeParsedMessage:
+    """What was parsed out of a roll message so far, and emitted into the queue"""
+
+    owner: MudaeRollOwner | None = None
+    claimable: MudaeClaimableRollResult | None = None
+    kakera_buttons: frozenset[str] = frozenset()
+    emitted: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class MudaeRollCache:
+    """LRU bounded cache of parsed roll messages, keyed by message id.
+
+    When Mudae edits a roll, e.g. to ping a wish or attach kakera buttons once a
+    character is claimed, only the parts that changed are parsed again, and each
+    part is emitted once however many edits repeat it.
+    """
+
+    def __init__(self, maxsize: int = ROLL_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.messages: OrderedDict[int, MudaeParsedMessage] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"size={len(self.messages)}, "
+            f"hits={self.hits}, "
+            f"misses={self.misses}, "
+            f"updates={self.updates})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def entry(self, message_id: int) -> MudaeParsedMessage:
+        if (parsed := self.messages.get(message_id)) is not None:
+            self.hits += 1
+            self.messages.move_to_end(message_id)
+            return parsed
+
+        self.misses += 1
+        parsed = self.messages[message_id] = MudaeParsedMessage()
+        while len(self.messages) > self.maxsize:
+            self.messages.popitem(last=False)
+        return parsed
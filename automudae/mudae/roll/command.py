@@ -1,19 +1,28 @@
 # pylint: disable=R0903
 import logging
+from datetime import datetime
 from typing import get_args
 
 import discord
+from pydantic import BaseModel
 
-from automudae.mudae.roll import MudaeRoll, MudaeRollCommandType
+from automudae.mudae.roll import MudaeRollCommandType, MudaeRollOwner
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-class MudaeRollCommand(MudaeRoll):
+class MudaeRollCommand(BaseModel):
+    """A roll command in the bounded command index, without its message"""
 
+    owner: MudaeRollOwner
+    channel_id: int
+    created_at: datetime
     command: MudaeRollCommandType
 
+    class Config:
+        arbitrary_types_allowed = True
+
     def __repr__(self) -> str:
 
         return (
@@ -34,5 +43,6 @@ class MudaeRollCommand(MudaeRoll):
         return MudaeRollCommand(
             command=message.content,  # type: ignore
             owner=message.author,
-            message=message,
+            channel_id=message.channel.id,
+            created_at=message.created_at,
         )
@@ -0,0 +1,80 @@
+import logging
+from typing import NamedTuple
+
+from automudae.config import ClaimConfig, Criteria
+from automudae.mudae.roll.pattern import NamePatternMatcher
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ClaimVerdict(NamedTuple):
+    snipe: bool
+    snipe_exception: bool
+    early_claim: bool
+    early_claim_exception: bool
+    late_claim: bool
+    late_claim_exception: bool
+
+
+def get_claim_rules(claim_config: ClaimConfig) -> list[Criteria]:
+    """Claim rules in ``ClaimVerdict`` field order"""
+    return [
+        claim_config.snipe,
+        claim_config.snipe.exception,
+        claim_config.earlyClaim,
+        claim_config.earlyClaim.exception,
+        claim_config.lateClaim,
+        claim_config.lateClaim.exception,
+    ]
+
+
+class ClaimCriteriaEngine:
+    """Evaluates every claim rule of a ``ClaimConfig`` in a single lookup.
+
+    Each rule owns one bit of a mask. Character and series patterns are compiled
+    into one ``NamePatternMatcher`` each, so evaluating a roll costs two matches
+    regardless of how long the wishlists are.
+    """
+
+    def __init__(self, claim_config: ClaimConfig) -> None:
+        rules = get_claim_rules(claim_config)
+
+        self.characters = NamePatternMatcher()
+        self.series = NamePatternMatcher()
+        self.wish_mask = 0
+        self.kakera_thresholds: list[tuple[int, int]] = []
+
+        for bit, criteria in enumerate(rules):
+            rule_mask = 1 << bit
+            for character in criteria.character:
+                self.characters.add(character, rule_mask)
+            for series in criteria.series:
+                self.series.add(series, rule_mask)
+            if criteria.wish:
+                self.wish_mask |= rule_mask
+            self.kakera_thresholds.append((criteria.minKakera, rule_mask))
+        self.characters.build()
+        self.series.build()
+
+        self.verdicts = [
+            ClaimVerdict(*(bool(mask & (1 << bit)) for bit in range(len(rules))))
+            for mask in range(1 << len(rules))
+        ]
+
+        logger.debug(
+            "Claim criteria compiled: characters %s, series %s",
+            self.characters,
+            self.series,
+        )
+
+    def evaluate(
+        self, character: str, series: str, kakera_value: int, wished_by_me: bool
+    ) -> ClaimVerdict:
+        mask = self.characters.match(character) | self.series.match(series)
+        if wished_by_me:
+            mask |= self.wish_mask
+        for min_kakera, rule_mask in self.kakera_thresholds:
+            if kakera_value >= min_kakera:
+                mask |= rule_mask
+        return self.verdicts[mask]
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Coroutine
+
+from automudae.mudae.roll.result import MudaeRollResult
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CLICK_LATENCY_INITIAL_SEC = 1.0
+CLICK_LATENCY_MIN_MARGIN_SEC = 0.25
+CLICK_LATENCY_GAIN = 1 / 8
+CLICK_LATENCY_DEVIATION_GAIN = 1 / 4
+
+
+class ClickLatencyEstimator:
+    """Smoothed click latency, from requesting the limiter slot to the response.
+
+    Like a TCP retransmission timer, the margin is the smoothed latency plus four
+    times its smoothed deviation, so a slow click still lands before the deadline.
+    A click slower than the smoothed latency plus two deviations is hedged.
+    """
+
+    def __init__(self) -> None:
+        self.smoothed: float | None = None
+        self.deviation = 0.0
+        self.samples = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"samples={self.samples}, "
+            f"margin={self.margin * 1e3:.0f}ms)"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    @property
+    def margin(self) -> float:
+        if self.smoothed is None:
+            return CLICK_LATENCY_INITIAL_SEC
+        return max(CLICK_LATENCY_MIN_MARGIN_SEC, self.smoothed + 4 * self.deviation)
+
+    @property
+    def hedge_after(self) -> float:
+        if self.smoothed is None:
+            return CLICK_LATENCY_INITIAL_SEC
+        return max(CLICK_LATENCY_MIN_MARGIN_SEC, self.smoothed + 2 * self.deviation)
+
+    def observe(self, latency: float) -> None:
+        self.samples += 1
+        if self.smoothed is None:
+            self.smoothed = latency
+            self.deviation = latency / 2
+            return
+        self.deviation += CLICK_LATENCY_DEVIATION_GAIN * (
+            abs(latency - self.smoothed) - self.deviation
+        )
+        self.smoothed += CLICK_LATENCY_GAIN * (latency - self.smoothed)
+
+
+class MudaeDeadlineScheduler:
+    """Commits each held best pick before it expires, whether or not rolls remain.
+
+    A deferred pick is scheduled at its expiry minus the click latency margin; a
+    newer pick under the same key replaces it, and releasing the key cancels it.
+    """
+
+    def __init__(self, latency: ClickLatencyEstimator) -> None:
+        self.latency = latency
+        self.timers: dict[str, tuple[MudaeRollResult, asyncio.TimerHandle]] = {}
+        self.pending: set[asyncio.Task[None]] = set()
+
+        self.commits = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"scheduled={sorted(self.timers)}, "
+            f"commits={self.commits}, "
+            f"latency={self.latency})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def schedule(
+        self,
+        key: str,
+        pick: MudaeRollResult,
+        deadline: float,
+        commit: Callable[[], Coroutine[Any, Any, None]],
+    ) -> None:
+        """Run ``commit`` a margin before ``deadline``, a UNIX timestamp"""
+        if (scheduled := self.timers.get(key)) is not None:
+            if scheduled[0] is pick:
+                return
+            scheduled[1].cancel()
+
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, deadline - self.latency.margin - time.time())
+        self.timers[key] = (pick, loop.call_later(delay, self.fire, key, commit))
+        logger.debug("Deadline for %s in %.2fs", key, delay)
+
+    def release(self, key: str) -> None:
+        if (scheduled := self.timers.pop(key, None)) is not None:
+            scheduled[1].cancel()
+
+    def fire(self, key: str, commit: Callable[[], Coroutine[Any, Any, None]]) -> None:
+        self.timers.pop(key, None)
+        self.commits += 1
+        task = asyncio.create_task(commit())
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    def cancel(self) -> None:
+        for key in list(self.timers):
+            self.release(key)
+        for task in self.pending:
+            task.cancel()
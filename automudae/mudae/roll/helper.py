@@ -1,19 +1,96 @@
 import logging
-from datetime import timedelta
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
 
 import discord
 
+from automudae.mudae.roll import MudaeRollOwner
 from automudae.mudae.roll.command import MudaeRollCommand
 
 logger = logging.getLogger(__name__)
 
 MUDAE_ROLL_TIMEOUT_SECONDS = 0.25
+MUDAE_ROLL_MAX_MULTIPLIER = 7  # up to 1.75 seconds
+MUDAE_ROLL_COMMAND_INDEX_SIZE = 64
 
 
-async def get_roll_command_from_roll_message(msg: discord.Message) -> MudaeRollCommand:
+class MudaeRollCommandIndex:
+    """Per-channel, time-sorted index of recently observed roll commands.
+
+    Every message seen in a channel is fed through ``observe`` and roll commands
+    through ``add``. Commands are kept sorted by ``created_at`` so the owner of a
+    roll can be resolved with a bisect instead of scanning the channel history
+    over REST.
+    """
+
+    def __init__(self, maxlen: int = MUDAE_ROLL_COMMAND_INDEX_SIZE) -> None:
+        self.maxlen = maxlen
+        self.commands: dict[int, list[MudaeRollCommand]] = {}
+        self.timestamps: dict[int, list[datetime]] = {}
+        self.covered_since: dict[int, datetime] = {}
+
+    def reset(self) -> None:
+        """Forget coverage, e.g. after a reconnect where messages may be missed."""
+        self.commands.clear()
+        self.timestamps.clear()
+        self.covered_since.clear()
+
+    def observe(self, message: discord.Message) -> None:
+        self.covered_since.setdefault(message.channel.id, message.created_at)
+
+    def add(self, roll_command: MudaeRollCommand) -> None:
+        channel_id = roll_command.channel_id
+        self.covered_since.setdefault(channel_id, roll_command.created_at)
+
+        commands = self.commands.setdefault(channel_id, [])
+        timestamps = self.timestamps.setdefault(channel_id, [])
+        position = bisect_right(timestamps, roll_command.created_at)
+        timestamps.insert(position, roll_command.created_at)
+        commands.insert(position, roll_command)
+
+        if len(commands) > self.maxlen:
+            # Anything older than the evicted command is no longer covered
+            self.covered_since[channel_id] = max(
+                self.covered_since[channel_id], timestamps[0]
+            )
+            del commands[0]
+            del timestamps[0]
+
+    def find(self, msg: discord.Message, window: timedelta) -> MudaeRollCommand | None:
+        timestamps = self.timestamps.get(msg.channel.id)
+        if not timestamps:
+            return None
+
+        position = bisect_left(timestamps, msg.created_at)
+        if position == 0:
+            return None
+        if timestamps[position - 1] < msg.created_at - window:
+            return None
+        return self.commands[msg.channel.id][position - 1]
+
+    def covers(self, msg: discord.Message, window: timedelta) -> bool:
+        covered_since = self.covered_since.get(msg.channel.id)
+        return covered_since is not None and covered_since <= msg.created_at - window
+
+
+async def get_roll_command_from_roll_message(
+    msg: discord.Message, index: MudaeRollCommandIndex | None = None
+) -> MudaeRollCommand:
+    max_window = timedelta(
+        seconds=MUDAE_ROLL_TIMEOUT_SECONDS * MUDAE_ROLL_MAX_MULTIPLIER
+    )
+
+    if index is not None:
+        if (roll_command := index.find(msg, max_window)) is not None:
+            return roll_command
+        if index.covers(msg, max_window):
+            raise ValueError(
+                f"Owner not found! No command in the past {max_window.total_seconds()} seconds"
+            )
+        logger.info("Command index does not cover roll, falling back to history")
+
     possible_owners: list[MudaeRollCommand] = []
-    max_multiplier = 7  # up to 1.75 seconds
-    for multiplier in range(1, max_multiplier + 1):
+    for multiplier in range(1, MUDAE_ROLL_MAX_MULTIPLIER + 1):
         history = msg.channel.history(
             before=msg.created_at,
             after=msg.created_at
@@ -30,9 +107,17 @@ async def get_roll_command_from_roll_message(msg: discord.Message) -> MudaeRollC
         break
 
     if len(possible_owners) == 0:
-        total_seconds_searched = MUDAE_ROLL_TIMEOUT_SECONDS * max_multiplier
         raise ValueError(
-            f"Owner not found! Tried to search the past {total_seconds_searched} seconds"
+            f"Owner not found! Tried to search the past {max_window.total_seconds()} seconds"
         )
 
     return possible_owners[-1]
+
+
+async def get_roll_owner(
+    msg: discord.Message, index: MudaeRollCommandIndex | None = None
+) -> MudaeRollOwner:
+    if msg.interaction:
+        return msg.interaction.user
+    roll_command = await get_roll_command_from_roll_message(msg, index)
+    return roll_command.owner
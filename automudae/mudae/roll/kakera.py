@@ -0,0 +1,93 @@
+import logging
+from dataclasses import dataclass
+
+from automudae.config import KakeraReactConfig
+from automudae.mudae.roll.result import KAKERA_TYPES, MudaeKakeraRollResult
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@dataclass
+class KakeraCandidate:
+    roll: MudaeKakeraRollResult
+    value: int
+    cost: int
+
+
+class KakeraReactionPlanner:
+    """Chooses the kakera rolls of a burst to react to within the power left.
+
+    Each roll is worth its expected kakera (``KAKERA_TYPES``) and costs the power
+    of its buttons: ``kakeraPowerCost`` per type, else the cost $tu reported. The
+    plan is a 0/1 knapsack over power, filled one roll at a time, so a burst of
+    ``n`` rolls costs ``n * power`` table cells and no search. Reactions are
+    ordered by expiry, the oldest roll first.
+    """
+
+    def __init__(self, config: KakeraReactConfig) -> None:
+        self.config = config
+
+        self.plans = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(plans={self.plans})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def candidate(
+        self, roll: MudaeKakeraRollResult, power: int, default_cost: int
+    ) -> KakeraCandidate | None:
+        """The roll's value and power cost, None if the config rules it out"""
+        for name in roll.button_names:
+            if name in self.config.doNotReactToKakeraTypes:
+                logger.info("KAKERA REACT BLOCKED: %s is in blocked kakera types", name)
+                return None
+            minimum_power = self.config.doNotReactToKakeraTypeIfKakeraPowerLessThan.get(
+                name, 0
+            )
+            if power < minimum_power:
+                logger.info(
+                    "KAKERA REACT SKIPPED: %s requires %s power but only have %s",
+                    name,
+                    minimum_power,
+                    power,
+                )
+                return None
+        return KakeraCandidate(
+            roll=roll,
+            value=sum(KAKERA_TYPES[name] for name in roll.button_names),
+            cost=sum(
+                self.config.kakeraPowerCost.get(name, default_cost)
+                for name in roll.button_names
+            ),
+        )
+
+    def plan(
+        self, candidates: list[KakeraCandidate], power: int
+    ) -> list[KakeraCandidate]:
+        """The most valuable candidates that fit in ``power``, oldest first"""
+        self.plans += 1
+        power = max(0, power)
+
+        # best[c]: most kakera for c power; taken[i][c]: candidate i is in best[c]
+        best = [0] * (power + 1)
+        taken: list[bytearray] = []
+        for candidate in candidates:
+            row = bytearray(power + 1)
+            for budget in range(power, candidate.cost - 1, -1):
+                value = best[budget - candidate.cost] + candidate.value
+                if value > best[budget]:
+                    best[budget] = value
+                    row[budget] = 1
+            taken.append(row)
+
+        chosen = []
+        budget = power
+        for index in range(len(candidates) - 1, -1, -1):
+            if taken[index][budget]:
+                chosen.append(candidates[index])
+                budget -= candidates[index].cost
+        chosen.sort(key=lambda candidate: candidate.roll.created_at)
+        return chosen
@@ -0,0 +1,160 @@
+# pylint: disable=R0902
+import re
+import unicodedata
+from collections import deque
+from enum import Enum
+
+NAME_REGEX_PREFIX = "re:"
+NAME_WILDCARD = "*"
+
+
+class NamePatternKind(Enum):
+    EXACT = "exact"
+    PREFIX = "prefix"
+    SUFFIX = "suffix"
+    SUBSTRING = "substring"
+    REGEX = "regex"
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def parse_name_pattern(pattern: str) -> tuple[NamePatternKind, str]:
+    """The kind of a character or series pattern, and what to match.
+
+    ``re:<regex>`` is a regex searched in the normalized name, ``<name>*`` a
+    prefix, ``*<name>`` a suffix, ``*<name>*`` a substring, and anything else
+    the exact name. Except for regexes, names are normalized.
+    """
+    if pattern.startswith(NAME_REGEX_PREFIX):
+        return NamePatternKind.REGEX, pattern[len(NAME_REGEX_PREFIX) :]
+
+    leading = pattern.startswith(NAME_WILDCARD)
+    trailing = pattern.endswith(NAME_WILDCARD) and len(pattern) > 1
+    name = normalize_name(pattern.strip(NAME_WILDCARD))
+    if not name:
+        return NamePatternKind.EXACT, name
+    if leading and trailing:
+        return NamePatternKind.SUBSTRING, name
+    if leading:
+        return NamePatternKind.SUFFIX, name
+    if trailing:
+        return NamePatternKind.PREFIX, name
+    return NamePatternKind.EXACT, name
+
+
+def compile_name_regex(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class NamePatternMatcher:
+    """Matches a name against many masked patterns in a single pass.
+
+    Exact names are a dict lookup. Prefixes, suffixes and substrings share one
+    Aho-Corasick automaton, walked once over the normalized name, so the cost of
+    a match depends on the name length and not on the number of patterns. Regexes
+    with the same mask are joined into one alternation.
+    """
+
+    def __init__(self) -> None:
+        self.exact: dict[str, int] = {}
+        self.regexes: dict[int, list[str]] = {}
+
+        # The automaton, one entry per trie node, the root is node 0
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.depth: list[int] = [0]
+        self.prefix_masks: list[int] = [0]
+        self.suffix_masks: list[int] = [0]
+        self.substring_masks: list[int] = [0]
+
+        self.combined_regexes: list[tuple[int, re.Pattern[str]]] = []
+        self.patterns = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"patterns={self.patterns}, "
+            f"exact={len(self.exact)}, "
+            f"nodes={len(self.goto)}, "
+            f"regexes={sum(len(regexes) for regexes in self.regexes.values())})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def add(self, pattern: str, mask: int) -> None:
+        """Add a pattern, ``build`` must be called before matching"""
+        self.patterns += 1
+        kind, value = parse_name_pattern(pattern)
+        if kind is NamePatternKind.EXACT:
+            self.exact[value] = self.exact.get(value, 0) | mask
+            return
+        if kind is NamePatternKind.REGEX:
+            self.regexes.setdefault(mask, []).append(value)
+            return
+
+        node = 0
+        for char in value:
+            if (child := self.goto[node].get(char)) is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.depth.append(self.depth[node] + 1)
+                self.prefix_masks.append(0)
+                self.suffix_masks.append(0)
+                self.substring_masks.append(0)
+            node = child
+
+        if kind is NamePatternKind.PREFIX:
+            self.prefix_masks[node] |= mask
+        elif kind is NamePatternKind.SUFFIX:
+            self.suffix_masks[node] |= mask
+        else:
+            self.substring_masks[node] |= mask
+
+    def build(self) -> None:
+        """Link the automaton breadth first and join the regexes"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fail = self.fail[node]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(char, 0)
+                # A node also ends every pattern its failure link ends
+                self.suffix_masks[child] |= self.suffix_masks[self.fail[child]]
+                self.substring_masks[child] |= self.substring_masks[self.fail[child]]
+                queue.append(child)
+
+        self.combined_regexes = [
+            (mask, compile_name_regex("|".join(f"(?:{regex})" for regex in regexes)))
+            for mask, regexes in self.regexes.items()
+        ]
+
+    def match(self, name: str) -> int:
+        """The mask of every pattern the name matches"""
+        name = normalize_name(name)
+        mask = self.exact.get(name, 0)
+
+        if len(self.goto) > 1:
+            goto = self.goto
+            fail = self.fail
+            node = 0
+            for position, char in enumerate(name, start=1):
+                while node and char not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(char, 0)
+                mask |= self.substring_masks[node]
+                # Still on the path from the root, the name starts with this node
+                if self.depth[node] == position:
+                    mask |= self.prefix_masks[node]
+            mask |= self.suffix_masks[node]
+
+        for regex_mask, regex in self.combined_regexes:
+            if regex_mask & ~mask and regex.search(name):
+                mask |= regex_mask
+        return mask
@@ -0,0 +1,104 @@
+# pylint: disable=R0902
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+
+from automudae.mudae.roll.result import MudaeRollResult
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MUDAE_ROLL_EXPIRY_SEC = 30
+
+FAST_LANE = 0
+NORMAL_LANE = 1
+
+
+@dataclass(order=True)
+class MudaeRollQueueItem:
+    lane: int
+    deadline: float
+    sequence: int
+    enqueued_at: float = field(compare=False)
+    roll: MudaeRollResult = field(compare=False)
+
+
+class MudaeRollQueue:
+    """Deadline-ordered queue of parsed rolls.
+
+    Rolls in the fast lane (snipe and wished candidates) are always served first.
+    Within a lane, the roll closest to its 30-second expiry goes first.
+    """
+
+    def __init__(self, expiry: float = MUDAE_ROLL_EXPIRY_SEC) -> None:
+        self.expiry = expiry
+        self.heap: list[MudaeRollQueueItem] = []
+        self.sequence = itertools.count()
+        self.not_empty = asyncio.Event()
+
+        self.dropped = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def __repr__(self) -> str:
+        wait_avg = self.wait_total / self.wait_count if self.wait_count else 0.0
+        return (
+            f"{self.__class__.__name__}("
+            f"size={len(self.heap)}, "
+            f"dropped={self.dropped}, "
+            f"wait_avg={wait_avg * 1e3:.1f}ms, "
+            f"wait_max={self.wait_max * 1e3:.1f}ms)"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def qsize(self) -> int:
+        return len(self.heap)
+
+    def empty(self) -> bool:
+        return not self.heap
+
+    def deadline(self, roll: MudaeRollResult) -> float:
+        return roll.created_at.timestamp() + self.expiry
+
+    def is_expired(self, roll: MudaeRollResult) -> bool:
+        return self.deadline(roll) <= time.time()
+
+    def put_nowait(self, roll: MudaeRollResult, fast: bool = False) -> None:
+        item = MudaeRollQueueItem(
+            lane=FAST_LANE if fast else NORMAL_LANE,
+            deadline=self.deadline(roll),
+            sequence=next(self.sequence),
+            enqueued_at=time.perf_counter(),
+            roll=roll,
+        )
+        heapq.heappush(self.heap, item)
+        self.not_empty.set()
+
+    async def put(self, roll: MudaeRollResult, fast: bool = False) -> None:
+        self.put_nowait(roll, fast)
+
+    async def get(self) -> MudaeRollResult:
+        while not self.heap:
+            self.not_empty.clear()
+            await self.not_empty.wait()
+
+        item = heapq.heappop(self.heap)
+        wait = time.perf_counter() - item.enqueued_at
+        self.wait_count += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        return item.roll
+
+    def drop(self, roll: MudaeRollResult) -> None:
+        self.dropped += 1
+        logger.info(
+            "ROLL DROPPED: Expired in queue (%.1fs > %ss timeout)",
+            time.time() - roll.created_at.timestamp(),
+            self.expiry,
+        )
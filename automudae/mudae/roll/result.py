@@ -1,20 +1,37 @@
-# pylint: disable=R0903
+# pylint: disable=R0903,R0914
 import logging
 import re
+import time
 from asyncio import Queue
+from dataclasses import dataclass, field
 from datetime import datetime
 
 import discord
 
-from automudae.config import Criteria
+from automudae.mudae.helper.click import Click
 from automudae.mudae.helper.common import get_buttons
-from automudae.mudae.roll import MUDAE_TIMEOUT_SEC, MudaeRoll, MudaeRollOwner
+from automudae.mudae.helper.member import MemberCache
+from automudae.mudae.helper.trace import RollTrace
+from automudae.mudae.roll import (
+    MUDAE_TIMEOUT_SEC,
+    MudaeRoll,
+    MudaeRollOwner,
+    get_roll_fields,
+)
 from automudae.mudae.roll.command import MudaeRollCommand
-from automudae.mudae.roll.helper import get_roll_command_from_roll_message
+from automudae.mudae.roll.criteria import ClaimCriteriaEngine, ClaimVerdict
+from automudae.mudae.roll.helper import MudaeRollCommandIndex, get_roll_owner
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+CLAIMABLE_ROLL_MARKER = "React with any emoji to claim!"
+WISHED_ROLL_MARKER = "Wished by"
+
+SERIES_KAKERA_PATTERN = re.compile(r"([\s\S]+)\n([\d,]+)[\s]*<:kakera:[\d]+>")
+WISHED_BY_PATTERN = re.compile(r"Wished by <@([\d]+)>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 
 async def get_roll_command(
     queue: Queue[MudaeRollCommand], message_time: datetime
@@ -23,13 +40,47 @@ async def get_roll_command(
         roll_command = await queue.get()
         try:
             if (
-                message_time - roll_command.message.created_at
+                message_time - roll_command.created_at
             ).total_seconds() <= MUDAE_TIMEOUT_SEC:
                 return roll_command
         finally:
             queue.task_done()
 
 
+def parse_series_and_kakera(description: str) -> tuple[str, int] | None:
+    clean_desc = discord.utils.remove_markdown(description)
+
+    series_kakera_match = SERIES_KAKERA_PATTERN.search(clean_desc)
+    if not series_kakera_match:
+        return None
+
+    series_name = (
+        str(series_kakera_match.group(1))
+        .replace("\r\n", " ")
+        .replace("\n", " ")
+        .replace("\r", " ")
+        .strip()
+    )
+    series_name = WHITESPACE_PATTERN.sub(" ", series_name)
+
+    kakera_value_str = str(series_kakera_match.group(2)).replace(",", "")
+    return series_name, int(kakera_value_str)
+
+
+async def get_wished_by(
+    message: discord.Message, member_cache: MemberCache | None = None
+) -> MudaeRollOwner | None:
+    msg_is_wished_by = WISHED_BY_PATTERN.search(message.content)
+    if not msg_is_wished_by or not message.guild:
+        return None
+
+    wished_by_id = int(msg_is_wished_by.group(1))
+    if member_cache is not None:
+        return await member_cache.resolve(message, wished_by_id)
+    return await message.guild.fetch_member(wished_by_id)
+
+
+@dataclass(slots=True, kw_only=True, eq=False)
 class MudaeClaimableRollResult(MudaeRoll):
 
     character: str
@@ -37,6 +88,10 @@ class MudaeClaimableRollResult(MudaeRoll):
     kakera_value: int
     wished_by: MudaeRollOwner | None = None
 
+    verdict: tuple[ClaimCriteriaEngine, int, ClaimVerdict] | None = field(
+        default=None, repr=False
+    )
+
     def __repr__(self) -> str:
         wished_by = self.wished_by.name if self.wished_by else None
         return (
@@ -51,28 +106,58 @@ class MudaeClaimableRollResult(MudaeRoll):
     def __str__(self) -> str:
         return self.__repr__()
 
-    async def claim(self) -> None:
+    def clicks(self) -> list[tuple[str, Click]]:
+        """A reaction claims the roll, a wished roll is claimed with its buttons"""
         if self.wished_by is None:
-            await self.message.add_reaction("❤️")
-            return
-        if not self.message.components:
-            return
-        for button in get_buttons(self.message):
-            await button.click()
-
-    def is_qualified(self, criteria: Criteria, user: MudaeRollOwner) -> bool:
-        character_qualify = self.character in criteria.character
-        series_qualify = self.series in criteria.series
-        kakera_qualify = self.kakera_value >= criteria.minKakera
-        wish_qualify = (
-            criteria.wish
-            and self.wished_by is not None
-            and self.wished_by.id == user.id
+            return [("❤️", self.handle.react("❤️"))]
+        return self.handle.button_clicks()
+
+    def evaluate(
+        self, engine: ClaimCriteriaEngine, user: MudaeRollOwner
+    ) -> ClaimVerdict:
+        if self.verdict is not None:
+            cached_engine, cached_user_id, verdict = self.verdict
+            if cached_engine is engine and cached_user_id == user.id:
+                return verdict
+
+        verdict = engine.evaluate(
+            self.character,
+            self.series,
+            self.kakera_value,
+            self.wished_by is not None and self.wished_by.id == user.id,
+        )
+        self.verdict = (engine, user.id, verdict)
+        return verdict
+
+    async def with_wished_by(
+        self, message: discord.Message, member_cache: MemberCache | None = None
+    ) -> "MudaeClaimableRollResult | None":
+        """The roll as edited to ping a wish, None if the wish did not change"""
+        wished_by = await get_wished_by(message, member_cache)
+        if wished_by is None or (
+            self.wished_by is not None and self.wished_by.id == wished_by.id
+        ):
+            return None
+        return MudaeClaimableRollResult(
+            **get_roll_fields(message, get_buttons(message)),
+            owner=self.owner,
+            character=self.character,
+            series=self.series,
+            kakera_value=self.kakera_value,
+            wished_by=wished_by,
+            trace=RollTrace(message, "claim"),
+            update=True,
         )
-        return character_qualify or series_qualify or kakera_qualify or wish_qualify
 
     @classmethod
-    async def create(cls, message: discord.Message):
+    async def create(
+        cls,
+        message: discord.Message,
+        roll_command_index: MudaeRollCommandIndex | None = None,
+        member_cache: MemberCache | None = None,
+        owner: MudaeRollOwner | None = None,
+    ):
+        start = time.perf_counter()
         if not message.embeds:
             logger.debug("Not Mudae Roll: No Embeds")
             return None
@@ -82,8 +167,8 @@ class MudaeClaimableRollResult(MudaeRoll):
             logger.debug("Not Mudae Roll: No Embed Description")
             return None
 
-        reactable = "React with any emoji to claim!" in embed.description
-        wished = "Wished by" in message.content
+        reactable = CLAIMABLE_ROLL_MARKER in embed.description
+        wished = WISHED_ROLL_MARKER in message.content
         if not (reactable or wished):
             logger.debug("Not a Mudae Roll: Not Claimable nor Wished")
             return None
@@ -92,51 +177,33 @@ class MudaeClaimableRollResult(MudaeRoll):
             logger.debug("Not a Mudae Roll: No Character Name")
             return None
 
-        clean_desc = discord.utils.remove_markdown(embed.description)
-
-        series_kakera_match = re.search(
-            r"([\s\S]+)\n([\d,]+)[\s]*<:kakera:[\d]+>", clean_desc
-        )
-        if not series_kakera_match:
+        trace = RollTrace(message, "claim")
+        if (series_kakera := parse_series_and_kakera(embed.description)) is None:
             logger.error(
                 "Not a Mudae Roll: No Series Name or No Kakera Value. "
                 "Maybe use $togglekakerarolls?"
             )
             return None
+        series_name, kakera_value = series_kakera
 
-        series_name = (
-            str(series_kakera_match.group(1))
-            .replace("\r\n", " ")
-            .replace("\n", " ")
-            .replace("\r", " ")
-            .strip()
-        )
-        series_name = re.sub(r"\s+", " ", series_name)
+        wished_by = await get_wished_by(message, member_cache)
 
-        kakera_value_str = str(series_kakera_match.group(2)).replace(",", "")
+        if owner is None:
+            with trace.span("owner"):
+                owner = await get_roll_owner(message, roll_command_index)
 
-        msg_is_wished_by = re.search(r"Wished by <@([\d]+)>", message.content)
-        wished_by: MudaeRollOwner | None
-        if msg_is_wished_by and message.guild:
-            wished_by = await message.guild.fetch_member(int(msg_is_wished_by.group(1)))
-        else:
-            wished_by = None
-
-        owner: MudaeRollOwner
-        if message.interaction:
-            owner = message.interaction.user
-        else:
-            roll_command = await get_roll_command_from_roll_message(message)
-            owner = roll_command.owner
-
-        return MudaeClaimableRollResult(
+        buttons = get_buttons(message) if wished_by is not None else []
+        roll = MudaeClaimableRollResult(
+            **get_roll_fields(message, buttons),
             owner=owner,
-            message=message,
             character=embed.author.name,
             series=series_name,
-            kakera_value=int(kakera_value_str),
+            kakera_value=kakera_value,
             wished_by=wished_by,
+            trace=trace,
         )
+        trace.since("parse", start)
+        return roll
 
 
 KAKERA_TYPES = {
@@ -152,57 +219,75 @@ KAKERA_TYPES = {
 }
 
 
+@dataclass(slots=True, kw_only=True, eq=False)
 class MudaeKakeraRollResult(MudaeRoll):
 
-    buttons: list[discord.Button]
     kakera_value: int
+    # Kept for the roll store, kakera rolls are not matched against criteria
+    character: str | None = None
+    series: str | None = None
 
     def __repr__(self) -> str:
-        button_names = [button.emoji.name for button in self.buttons if button.emoji]
         return (
             f"{self.__class__.__name__}("
             f"owner={self.owner.name!r}, "
-            f"buttons={button_names}, "
+            f"buttons={list(self.button_names)}, "
             f"kakera_value={self.kakera_value})"
         )
 
     def __str__(self) -> str:
         return self.__repr__()
 
-    async def kakera_react(self) -> None:
-        for button in self.buttons:
-            await button.click()
+    def clicks(self) -> list[tuple[str, Click]]:
+        return self.handle.button_clicks()
 
     @classmethod
-    async def create(cls, message: discord.Message):
+    async def create(
+        cls,
+        message: discord.Message,
+        roll_command_index: MudaeRollCommandIndex | None = None,
+        owner: MudaeRollOwner | None = None,
+        exclude: frozenset[str] = frozenset(),
+    ):
+        """Kakera roll of the buttons on ``message``, except the ``exclude`` types"""
+        start = time.perf_counter()
         if not message.components:
             return None
 
         buttons = [
             button
             for button in get_buttons(message)
-            if button.emoji and button.emoji.name in KAKERA_TYPES
+            if button.emoji
+            and button.emoji.name in KAKERA_TYPES
+            and button.emoji.name not in exclude
         ]
         if len(buttons) == 0:
             return None
 
-        owner: MudaeRollOwner
-        if message.interaction:
-            owner = message.interaction.user
-        else:
-            roll_command = await get_roll_command_from_roll_message(message)
-            owner = roll_command.owner
+        trace = RollTrace(message, "kakera")
+
+        if owner is None:
+            with trace.span("owner"):
+                owner = await get_roll_owner(message, roll_command_index)
+
+        character, series = None, None
+        if message.embeds:
+            embed = message.embeds[0]
+            character = embed.author.name
+            if (parsed := parse_series_and_kakera(embed.description or "")) is not None:
+                series, _ = parsed
 
-        return MudaeKakeraRollResult(
+        fields = get_roll_fields(message, buttons)
+        roll = MudaeKakeraRollResult(
+            **fields,
             owner=owner,
-            message=message,
-            buttons=buttons,
-            kakera_value=sum(
-                KAKERA_TYPES[button.emoji.name]
-                for button in buttons
-                if button.emoji is not None
-            ),
+            kakera_value=sum(KAKERA_TYPES[name] for name in fields["button_names"]),
+            character=character,
+            series=series,
+            trace=trace,
         )
+        trace.since("parse", start)
+        return roll
 
 
 MudaeRollResult = MudaeClaimableRollResult | MudaeKakeraRollResult
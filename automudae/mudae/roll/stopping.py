@@ -0,0 +1,89 @@
+import bisect
+import itertools
+import logging
+import sqlite3
+import time
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ClaimThresholdTable:
+    """Optimal stopping thresholds for the one claim until the next claim reset.
+
+    ``V(h, r)`` is the expected kakera of the best claim still to come, with ``r``
+    rolls left this hour and ``h`` more roll resets before the claim reset. A roll
+    is worth claiming when its value beats ``V(h, r)``, the value of continuing.
+    Expectations are taken over the historical kakera values, sorted once with
+    prefix sums, so ``E[max(X, c)]`` costs one bisect.
+    """
+
+    def __init__(self, samples: Iterable[int]) -> None:
+        self.samples = sorted(samples)
+        self.prefix = list(itertools.accumulate(self.samples, initial=0))
+        self.tables: dict[tuple[int, int], list[list[float]]] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(samples={len(self.samples)})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def expected_max(self, value: float) -> float:
+        """E[max(X, value)] over the samples"""
+        count = len(self.samples)
+        index = bisect.bisect_right(self.samples, value)
+        return (value * index + self.prefix[count] - self.prefix[index]) / count
+
+    def table(self, rolls_per_hour: int, hours: int) -> list[list[float]]:
+        if (table := self.tables.get((rolls_per_hour, hours))) is not None:
+            return table
+
+        table = []
+        for hour in range(hours + 1):
+            row = [table[hour - 1][rolls_per_hour] if hour > 0 else 0.0]
+            for _ in range(rolls_per_hour):
+                row.append(self.expected_max(row[-1]))
+            table.append(row)
+
+        self.tables[(rolls_per_hour, hours)] = table
+        return table
+
+    def threshold(self, rolls_left: int, hours_left: int, rolls_per_hour: int) -> float:
+        """Kakera value a roll needs to beat, with ``rolls_left`` rolls after it"""
+        rolls_per_hour = max(rolls_per_hour, rolls_left)
+        return self.table(rolls_per_hour, hours_left)[hours_left][rolls_left]
+
+    @classmethod
+    def from_store(cls, path: str, days: float, min_samples: int):
+        start = time.perf_counter()
+        connection = sqlite3.connect(path)
+        try:
+            samples = [
+                kakera
+                for (kakera,) in connection.execute(
+                    "SELECT kakera FROM rolls WHERE kind = 'claim' AND at >= ?",
+                    (time.time() - days * 86400,),
+                )
+            ]
+        except sqlite3.Error:
+            logger.exception("Failed to load roll history from %s", path)
+            return None
+        finally:
+            connection.close()
+
+        if len(samples) < min_samples:
+            logger.info(
+                "Claim thresholds disabled: %d rolls in history, need %d",
+                len(samples),
+                min_samples,
+            )
+            return None
+
+        table = ClaimThresholdTable(samples)
+        logger.info("Loaded %s in %.1fms", table, (time.perf_counter() - start) * 1e3)
+        return table
@@ -0,0 +1,257 @@
+import argparse
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from automudae.mudae.roll.result import (
+    KAKERA_TYPES,
+    MudaeClaimableRollResult,
+    MudaeRollResult,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+STORE_BATCH_SIZE = 256
+STORE_FLUSH_INTERVAL_SEC = 1.0
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rolls (
+    message_id INTEGER NOT NULL,
+    at REAL NOT NULL,
+    channel_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    character TEXT,
+    series TEXT,
+    kakera INTEGER NOT NULL,
+    owner_id INTEGER NOT NULL,
+    wished_by_id INTEGER,
+    buttons TEXT,
+    decision TEXT,
+    PRIMARY KEY (message_id, kind)
+);
+CREATE INDEX IF NOT EXISTS rolls_at ON rolls (at);
+CREATE INDEX IF NOT EXISTS rolls_series_at ON rolls (kind, series, at, kakera);
+CREATE INDEX IF NOT EXISTS rolls_character_at ON rolls (kind, character, at, kakera);
+"""
+# A message is stored once per kind. An edit of the same roll is merged into its
+# row: a wish ping adds wished_by, kakera buttons not in the row yet are added with
+# their value, and a decision other than "pass" is never overwritten by a later
+# "pass". Writing the same roll again leaves its row as it is.
+STORE_INSERT = """
+INSERT INTO rolls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (message_id, kind) DO UPDATE SET
+    kakera = CASE WHEN kind = 'kakera'
+        THEN kakera + added_kakera(buttons, excluded.buttons) ELSE excluded.kakera END,
+    wished_by_id = COALESCE(excluded.wished_by_id, wished_by_id),
+    buttons = CASE WHEN kind = 'kakera'
+        THEN merge_buttons(buttons, excluded.buttons) ELSE excluded.buttons END,
+    decision = CASE WHEN excluded.decision = 'pass' THEN decision
+        ELSE excluded.decision END
+"""
+
+RollRow = tuple[
+    int, float, int, str, str | None, str | None, int, int, int | None, str, str
+]
+
+
+def to_row(roll: MudaeRollResult) -> RollRow:
+    decision = roll.trace.action if roll.trace is not None else None
+    if isinstance(roll, MudaeClaimableRollResult):
+        return (
+            roll.message_id,
+            roll.created_at.timestamp(),
+            roll.channel_id,
+            "claim",
+            roll.character,
+            roll.series,
+            roll.kakera_value,
+            roll.owner.id,
+            roll.wished_by.id if roll.wished_by is not None else None,
+            "",
+            decision or "pass",
+        )
+
+    return (
+        roll.message_id,
+        roll.created_at.timestamp(),
+        roll.channel_id,
+        "kakera",
+        roll.character,
+        roll.series,
+        roll.kakera_value,
+        roll.owner.id,
+        None,
+        ",".join(roll.button_names),
+        decision or "pass",
+    )
+
+
+def split_buttons(buttons: str | None) -> list[str]:
+    return buttons.split(",") if buttons else []
+
+
+def merge_buttons(buttons: str | None, added: str | None) -> str:
+    """The buttons of a kakera row, with those of ``added`` it lacks appended"""
+    names = split_buttons(buttons)
+    return ",".join(
+        [*names, *(name for name in split_buttons(added) if name not in names)]
+    )
+
+
+def added_kakera(buttons: str | None, added: str | None) -> int:
+    """The value of the buttons of ``added`` that a kakera row lacks"""
+    names = set(split_buttons(buttons))
+    return sum(
+        KAKERA_TYPES.get(name, 0)
+        for name in dict.fromkeys(split_buttons(added))
+        if name not in names
+    )
+
+
+def connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.create_function("merge_buttons", 2, merge_buttons, deterministic=True)
+    connection.create_function("added_kakera", 2, added_kakera, deterministic=True)
+    connection.executescript(STORE_SCHEMA)
+    return connection
+
+
+class MudaeRollStore:
+    """SQLite store of every parsed roll, one row per message and kind.
+
+    A message rolled as both a claimable and a kakera roll has a row of each
+    kind; the rolls emitted from its edits are merged into those rows.
+
+    ``add`` only converts the roll to a row and hands it over; a writer thread
+    inserts rows in batches of up to ``STORE_BATCH_SIZE``, at least once a second.
+    """
+
+    def __init__(self, path: str | None) -> None:
+        self.path = path
+        self.rows: queue.SimpleQueue[RollRow | None] = queue.SimpleQueue()
+        self.thread: threading.Thread | None = None
+        self.written = 0
+        if path is not None:
+            self.thread = threading.Thread(
+                target=self.writer, args=(path,), name="roll-store", daemon=True
+            )
+            self.thread.start()
+            logger.info("Storing rolls in %s", path)
+
+    def add(self, roll: MudaeRollResult) -> None:
+        if self.thread is not None:
+            self.rows.put(to_row(roll))
+
+    def writer(self, path: str) -> None:
+        connection = connect(path)
+        closed = False
+        while not closed:
+            batch: list[RollRow] = []
+            deadline = time.monotonic() + STORE_FLUSH_INTERVAL_SEC
+            while len(batch) < STORE_BATCH_SIZE:
+                try:
+                    row = self.rows.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    closed = True
+                    break
+                batch.append(row)
+            if batch:
+                self.insert(connection, batch)
+        connection.close()
+
+    def insert(self, connection: sqlite3.Connection, batch: Iterable[RollRow]) -> None:
+        try:
+            with connection:
+                cursor = connection.executemany(STORE_INSERT, batch)
+                self.written += cursor.rowcount
+        except sqlite3.Error:
+            logger.exception("Failed to store rolls")
+
+    def close(self) -> None:
+        if self.thread is not None:
+            self.rows.put(None)
+            self.thread.join()
+            self.thread = None
+
+
+def percentiles(values: list[int], qs: Iterable[int]) -> list[int]:
+    return [values[min(len(values) - 1, q * len(values) // 100)] for q in qs]
+
+
+def kakera_distribution(
+    connection: sqlite3.Connection,
+    series: str | None = None,
+    character: str | None = None,
+    days: float = 30,
+) -> str:
+    # The claim value of the characters, kakera rows hold the buttons' value
+    query = "WHERE kind = 'claim' AND at >= ?"
+    args: list[float | str] = [time.time() - days * 86400]
+    if series is not None:
+        query, args = f"{query} AND series = ?", [*args, series]
+    elif character is not None:
+        query, args = f"{query} AND character = ?", [*args, character]
+
+    # Answered from the covering (series|character, at, kakera) indexes
+    values = sorted(
+        kakera
+        for (kakera,) in connection.execute(f"SELECT kakera FROM rolls {query}", args)
+    )
+    if not values:
+        return "no rolls"
+
+    qs = [0, 10, 25, 50, 75, 90, 99, 100]
+    return "\n".join(
+        [
+            f"{'rolls':>8} " + " ".join(f"{f'p{q}':>6}" for q in qs),
+            f"{len(values):>8} "
+            + " ".join(f"{value:>6}" for value in percentiles(values, qs)),
+        ]
+    )
+
+
+def top_series(
+    connection: sqlite3.Connection, days: float = 30, limit: int = 20
+) -> str:
+    rows = connection.execute(
+        "SELECT series, COUNT(*), AVG(kakera), MAX(kakera) FROM rolls "
+        "WHERE kind = 'claim' AND at >= ? AND series IS NOT NULL "
+        "GROUP BY series ORDER BY COUNT(*) DESC LIMIT ?",
+        (time.time() - days * 86400, limit),
+    )
+    lines = [f"{'series':<40} {'rolls':>8} {'avg':>8} {'max':>6}"]
+    for series, count, average, maximum in rows:
+        lines.append(f"{series[:40]:<40} {count:>8} {average:>8.1f} {maximum:>6}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the roll store")
+    parser.add_argument("path", nargs="?", default="config/rolls.sqlite3")
+    parser.add_argument("--days", type=float, default=30)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    kakera = subparsers.add_parser("kakera", help="kakera value distribution")
+    kakera.add_argument("--series")
+    kakera.add_argument("--character")
+    series = subparsers.add_parser("series", help="most rolled series")
+    series.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    connection = connect(args.path)
+    if args.command == "kakera":
+        print(kakera_distribution(connection, args.series, args.character, args.days))
+    else:
+        print(top_series(connection, args.days, args.limit))
+    print(f"({(time.perf_counter() - start) * 1e3:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
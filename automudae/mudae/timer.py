@@ -1,13 +1,16 @@
-# pylint: disable=R0903
+# pylint: disable=R0902,R0903,R0914
 import asyncio
 import logging
+import math
 import re
-from typing import Self
+from datetime import datetime, timedelta
+from typing import Any, Self
 
 import discord
 from pydantic import BaseModel, Field
 
 from automudae.mudae.helper.concurrency import EventDebugger, LockDebugger
+from automudae.mudae.helper.trace import RollTrace
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -16,14 +19,106 @@ MudaeTimerOwner = (
     discord.User | discord.ClientUser | discord.Member | discord.user.BaseUser
 )
 
+# Bold, underline and other markers Mudae wraps around the values of $tu
+MARKDOWN = r"[*_~|]*"
+DURATION = r"\s*{md}\s*(?:(?P<{name}_hours>\d+)h\s*)?(?P<{name}_minutes>\d+){md}\s*min"
+# Every line $tu prints, in one alternation scanned once over the raw content; the
+# outer group of each alternative names the line it matched
+TIMER_STATUS_PATTERN = re.compile(
+    "|".join(
+        [
+            rf"(?P<claim>you {MARKDOWN}(?P<claim_state>can|can't){MARKDOWN} claim)",
+            r"(?P<claim_reset>(?:claim reset is in|for another)"
+            + DURATION.format(md=MARKDOWN, name="claim_reset")
+            + ")",
+            rf"(?P<rolls>You have {MARKDOWN}(?P<rolls_left>\d+){MARKDOWN} rolls? left)",
+            r"(?P<rolls_reset>Next rolls? reset in"
+            + DURATION.format(md=MARKDOWN, name="rolls_reset")
+            + ")",
+            rf"(?P<kakera>You {MARKDOWN}(?P<kakera_state>can|can't){MARKDOWN} "
+            r"react to kakera)",
+            rf"(?P<power>Power: {MARKDOWN}(?P<power_percent>\d+)%)",
+            r"(?P<cost>consumes (?P<cost_percent>\d+)% of your reaction power)",
+            rf"(?P<daily>\$daily{MARKDOWN} is available|"
+            rf"Next {MARKDOWN}\$daily{MARKDOWN} reset in"
+            + DURATION.format(md=MARKDOWN, name="daily")
+            + ")",
+            rf"(?P<dk>\$dk{MARKDOWN} is (?:ready|available)|"
+            rf"Next {MARKDOWN}\$dk{MARKDOWN} in"
+            + DURATION.format(md=MARKDOWN, name="dk")
+            + ")",
+        ]
+    )
+)
+TIMER_STATUS_REQUIRED_LINES = {"claim", "claim_reset", "rolls", "kakera", "power"}
+ROLLS_LIMITED_PATTERN = re.compile(
+    r"the roulette is limited to (\d+) uses per hour\W+(\d+) min left"
+)
+
+MUDAE_ROLLS_RESET_INTERVAL = timedelta(hours=1)
+MUDAE_CLAIM_RESET_INTERVAL = timedelta(hours=3)
+MUDAE_TIMER_RESYNC_INTERVAL = timedelta(hours=6)
+MUDAE_TIMER_SLACK = timedelta(seconds=90)
+# A $tu this close after a roll reset reports the full count of rolls per reset
+MUDAE_ROLLS_FRESH_WINDOW = timedelta(minutes=5)
+# Without the cost $tu reports, a reaction is assumed to use all the power
+MUDAE_KAKERA_DEFAULT_COST = 100
+MUDAE_TIMER_SNAPSHOT_FIELDS = {
+    "can_claim",
+    "rolls_available",
+    "can_kakera_react",
+    "next_hour_is_reset",
+    "claim_reset_minutes",
+    "kakera_power",
+    "kakera_cost",
+    "rolls_reset_minutes",
+    "daily_available",
+    "daily_reset_minutes",
+    "dk_available",
+    "dk_reset_minutes",
+    "claim_reset_at",
+    "rolls_reset_at",
+    "rolls_per_reset",
+    "rolls_per_reset_known",
+    "synced_at",
+    "stale",
+}
+
 
 class MudaeTimerStatus(BaseModel):
+    """Claim, roll and kakera timers, seeded by $tu and advanced locally.
+
+    Between two $tu replies, the roll and claim resets are applied from the reset
+    times $tu reported. The model asks for a re-sync (``needs_sync``) when it has
+    never been synced, was last synced long ago, cannot predict kakera power, does
+    not know the rolls per reset yet, or Mudae contradicted it. The rolls per
+    reset are learned from a $tu taken right after a reset, or from Mudae refusing
+    a roll; a $tu taken mid-hour only reports the rolls left.
+    """
 
     can_claim: bool = False
     rolls_available: int = 0
     can_kakera_react: bool = False
     next_hour_is_reset: bool = False
+    claim_reset_minutes: int = 0
     kakera_power: int = 0
+    kakera_cost: int = 0
+    rolls_reset_minutes: int = 0
+    daily_available: bool = False
+    daily_reset_minutes: int = 0
+    dk_available: bool = False
+    dk_reset_minutes: int = 0
+
+    claim_reset_at: datetime | None = None
+    rolls_reset_at: datetime | None = None
+    rolls_per_reset: int = 0
+    rolls_per_reset_known: bool = False
+    synced_at: datetime | None = None
+    stale: bool = True
+
+    syncs: int = 0
+    local_resets: int = 0
+    drifts: int = 0
 
     lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
     roll_is_available: asyncio.Event = Field(default_factory=asyncio.Event)
@@ -38,14 +133,121 @@ class MudaeTimerStatus(BaseModel):
             f"rolls_available={self.rolls_available}, "
             f"can_kakera_react={self.can_kakera_react}, "
             f"next_hour_is_reset={self.next_hour_is_reset}, "
-            f"kakera_power={self.kakera_power})"
+            f"claim_reset_minutes={self.claim_reset_minutes}, "
+            f"kakera_power={self.kakera_power}, "
+            f"kakera_cost={self.kakera_cost}, "
+            f"rolls_reset_minutes={self.rolls_reset_minutes}, "
+            f"daily_available={self.daily_available}, "
+            f"dk_available={self.dk_available}, "
+            f"syncs={self.syncs}, "
+            f"local_resets={self.local_resets}, "
+            f"drifts={self.drifts})"
         )
 
     def __str__(self) -> str:
         return self.__repr__()
 
-    def debug_lock(self, name: str) -> LockDebugger:
-        return LockDebugger(self.lock, name)
+    @property
+    def hours_until_claim_reset(self) -> int:
+        """Roll resets still to come before the claim resets"""
+        return max(0, (self.claim_reset_minutes - 1) // 60)
+
+    @property
+    def kakera_react_cost(self) -> int:
+        return self.kakera_cost or MUDAE_KAKERA_DEFAULT_COST
+
+    def spend_kakera_power(self, cost: int) -> None:
+        self.kakera_power = max(0, self.kakera_power - cost)
+        self.can_kakera_react = self.kakera_power >= self.kakera_react_cost
+
+    def is_fresh_reset(self) -> bool:
+        """Synced right after a roll reset, before any roll of the new hour"""
+        if self.synced_at is None or self.rolls_reset_at is None:
+            return False
+        return (
+            self.rolls_reset_at - self.synced_at
+            >= MUDAE_ROLLS_RESET_INTERVAL - MUDAE_ROLLS_FRESH_WINDOW
+        )
+
+    def needs_sync(self, now: datetime) -> bool:
+        return (
+            self.stale
+            or self.synced_at is None
+            or self.rolls_reset_at is None
+            or self.claim_reset_at is None
+            or now - self.synced_at >= MUDAE_TIMER_RESYNC_INTERVAL
+        )
+
+    async def advance(self, now: datetime) -> bool:
+        """Apply the roll and claim resets due by ``now``, False if $tu is needed"""
+        async with self.debug_lock("advance"):
+            if self.needs_sync(now):
+                return False
+            assert self.rolls_reset_at and self.claim_reset_at
+
+            if not self.rolls_per_reset_known:
+                logger.info("Rolls per reset not known yet, re-syncing")
+                return False
+            if now + MUDAE_TIMER_SLACK < self.rolls_reset_at:
+                logger.info(
+                    "Roll reset not due until %s, re-syncing", self.rolls_reset_at
+                )
+                self.drifts += 1
+                return False
+            while self.rolls_reset_at <= now + MUDAE_TIMER_SLACK:
+                self.rolls_reset_at += MUDAE_ROLLS_RESET_INTERVAL
+            self.rolls_available = self.rolls_per_reset
+
+            if self.claim_reset_at <= now + MUDAE_TIMER_SLACK:
+                self.can_claim = True
+            while self.claim_reset_at <= now + MUDAE_TIMER_SLACK:
+                self.claim_reset_at += MUDAE_CLAIM_RESET_INTERVAL
+            self.claim_reset_minutes = math.ceil(
+                (self.claim_reset_at - now).total_seconds() / 60
+            )
+            self.next_hour_is_reset = self.claim_reset_minutes <= 60
+
+            # Kakera power regenerates at a rate $tu does not report
+            if not self.can_kakera_react:
+                return False
+
+            self.local_resets += 1
+            self.update_roll_is_available()
+            return True
+
+    def exhaust_rolls(self) -> None:
+        """All rolls of this reset are used, wait for the next reset"""
+        self.rolls_available = 0
+        self.update_roll_is_available()
+
+    async def limit_rolls(
+        self, rolls_per_reset: int, rolls_reset_minutes: int, now: datetime
+    ) -> None:
+        """Mudae refused a roll, there are none left until the next reset"""
+        async with self.debug_lock("limit_rolls"):
+            self.rolls_per_reset = rolls_per_reset
+            self.rolls_per_reset_known = True
+            self.rolls_reset_at = now + timedelta(minutes=rolls_reset_minutes)
+            self.exhaust_rolls()
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.model_dump(mode="json", include=MUDAE_TIMER_SNAPSHOT_FIELDS)
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        """Resume from a snapshot, before any loop uses the timers"""
+        restored = MudaeTimerStatus.model_validate(snapshot)
+        for name in MUDAE_TIMER_SNAPSHOT_FIELDS:
+            setattr(self, name, getattr(restored, name))
+        self.update_roll_is_available()
+
+    def update_roll_is_available(self) -> None:
+        if self.rolls_available > 0:
+            self.roll_is_available.set()
+        else:
+            self.roll_is_available.clear()
+
+    def debug_lock(self, name: str, trace: RollTrace | None = None) -> LockDebugger:
+        return LockDebugger(self.lock, name, trace)
 
     async def wait_for_rolls(self) -> None:
         event_debugger = EventDebugger(self.roll_is_available, "Roll is Available")
@@ -53,62 +255,117 @@ class MudaeTimerStatus(BaseModel):
 
     @classmethod
     async def create(cls, message: discord.Message, current_user: MudaeTimerOwner):
-        clean_msg = discord.utils.remove_markdown(message.content)
-
-        is_my_message = clean_msg.startswith(current_user.name)
-        if not is_my_message:
-            return None
-
-        claim_pattern = re.search(r"you (can|can\'t) claim", clean_msg)
-        if not claim_pattern:
-            return None
-
-        rolls_pattern = re.search(r"You have (\d+) rolls? left", clean_msg)
-        if not rolls_pattern:
-            return None
+        return cls.parse(message.content, current_user.name, message.created_at)
 
-        kakera_pattern = re.search(r"You (can|can\'t) react to kakera", clean_msg)
-        if not kakera_pattern:
+    @classmethod
+    def parse(cls, content: str, user_name: str, at: datetime) -> Self | None:
+        """The timers of ``user_name`` from a $tu reply sent at ``at``"""
+        # $tu replies open with the bold name, anything else is rejected from there
+        if not content[: len(user_name) + 4].lstrip("*_").startswith(user_name):
             return None
 
-        kakera_power = re.search(r"(\d+)%", clean_msg)
-        if not kakera_power:
+        lines: dict[str, re.Match[str]] = {}
+        for match in TIMER_STATUS_PATTERN.finditer(content):
+            assert match.lastgroup is not None
+            lines.setdefault(match.lastgroup, match)
+        if not TIMER_STATUS_REQUIRED_LINES <= lines.keys():
             return None
 
-        claim_reset_pattern = re.search(
-            r"(?:The next claim reset is in|you can't claim for another)\s+(?:(\d+)h\s*)?(\d+)\s*min",  # pylint: disable=C0301
-            clean_msg,
+        claim_reset_minutes = cls.parse_duration(lines["claim_reset"], "claim_reset")
+        rolls_reset_minutes = (
+            cls.parse_duration(lines["rolls_reset"], "rolls_reset")
+            if "rolls_reset" in lines
+            else None
         )
-        if not claim_reset_pattern:
-            return None
+        daily = lines.get("daily")
+        dk = lines.get("dk")
 
-        claim_reset_hours = (
-            int(claim_reset_pattern.group(1)) if claim_reset_pattern.group(1) else 0
-        )
-        claim_reset_minutes = (
-            int(claim_reset_pattern.group(2)) if claim_reset_pattern.group(2) else 0
-        )
-        next_claim_reset_in_minutes = claim_reset_hours * 60 + claim_reset_minutes
-
-        return MudaeTimerStatus(
-            can_claim=claim_pattern.group(1) == "can",
-            rolls_available=(
-                int(rolls_pattern.group(1)) if rolls_pattern.group(1) else 0
+        return cls(
+            can_claim=lines["claim"].group("claim_state") == "can",
+            rolls_available=int(lines["rolls"].group("rolls_left")),
+            can_kakera_react=lines["kakera"].group("kakera_state") == "can",
+            next_hour_is_reset=claim_reset_minutes <= 60,
+            claim_reset_minutes=claim_reset_minutes,
+            kakera_power=int(lines["power"].group("power_percent")),
+            kakera_cost=(
+                int(lines["cost"].group("cost_percent")) if "cost" in lines else 0
+            ),
+            rolls_reset_minutes=rolls_reset_minutes or 0,
+            daily_available=daily is not None and daily.group("daily_minutes") is None,
+            daily_reset_minutes=cls.parse_duration(daily, "daily") if daily else 0,
+            dk_available=dk is not None and dk.group("dk_minutes") is None,
+            dk_reset_minutes=cls.parse_duration(dk, "dk") if dk else 0,
+            claim_reset_at=at + timedelta(minutes=claim_reset_minutes),
+            rolls_reset_at=(
+                at + timedelta(minutes=rolls_reset_minutes)
+                if rolls_reset_minutes is not None
+                else None
             ),
-            can_kakera_react=kakera_pattern.group(1) == "can",
-            next_hour_is_reset=next_claim_reset_in_minutes <= 60,
-            kakera_power=int(kakera_power.group(1)) if kakera_power.group(1) else 0,
+            synced_at=at,
         )
 
+    @staticmethod
+    def parse_duration(match: re.Match[str], name: str) -> int:
+        """Minutes of a ``[<hours>h ]<minutes> min`` duration, 0 when absent"""
+        hours = match.group(f"{name}_hours")
+        minutes = match.group(f"{name}_minutes")
+        return (int(hours) if hours else 0) * 60 + (int(minutes) if minutes else 0)
+
+    @classmethod
+    def parse_rolls_limited(
+        cls, message: discord.Message, current_user: MudaeTimerOwner
+    ) -> tuple[int, int] | None:
+        """Rolls per reset and minutes until the next reset, from a refused roll"""
+        clean_msg = discord.utils.remove_markdown(message.content)
+        if not clean_msg.startswith(current_user.name):
+            return None
+        if not (rolls_limited := ROLLS_LIMITED_PATTERN.search(clean_msg)):
+            return None
+        return int(rolls_limited.group(1)), int(rolls_limited.group(2))
+
     async def update(self, new_timer_status: Self) -> None:
         async with self.debug_lock("update"):
             self.can_claim = new_timer_status.can_claim
             self.rolls_available = new_timer_status.rolls_available
             self.can_kakera_react = new_timer_status.can_kakera_react
             self.next_hour_is_reset = new_timer_status.next_hour_is_reset
+            self.claim_reset_minutes = new_timer_status.claim_reset_minutes
             self.kakera_power = new_timer_status.kakera_power
+            self.kakera_cost = new_timer_status.kakera_cost or self.kakera_cost
+            self.rolls_reset_minutes = new_timer_status.rolls_reset_minutes
+            self.daily_available = new_timer_status.daily_available
+            self.daily_reset_minutes = new_timer_status.daily_reset_minutes
+            self.dk_available = new_timer_status.dk_available
+            self.dk_reset_minutes = new_timer_status.dk_reset_minutes
 
-            if self.rolls_available > 0:
-                self.roll_is_available.set()
+            for predicted, synced in [
+                (self.claim_reset_at, new_timer_status.claim_reset_at),
+                (self.rolls_reset_at, new_timer_status.rolls_reset_at),
+            ]:
+                if self.stale or predicted is None or synced is None:
+                    continue
+                if abs(predicted - synced) > MUDAE_TIMER_SLACK:
+                    logger.info(
+                        "Timer drifted: predicted %s, was %s", predicted, synced
+                    )
+                    self.drifts += 1
+
+            self.claim_reset_at = new_timer_status.claim_reset_at
+            self.rolls_reset_at = new_timer_status.rolls_reset_at
+            if new_timer_status.is_fresh_reset():
+                self.rolls_per_reset = (
+                    max(self.rolls_per_reset, new_timer_status.rolls_available)
+                    if self.rolls_per_reset_known
+                    else new_timer_status.rolls_available
+                )
+                self.rolls_per_reset_known = True
             else:
-                self.roll_is_available.clear()
+                # Rolls may have been used since the reset, only a lower bound
+                self.rolls_per_reset = max(
+                    self.rolls_per_reset, new_timer_status.rolls_available
+                )
+            self.synced_at = new_timer_status.synced_at
+            self.stale = False
+            self.syncs += 1
+
+            self.update_roll_is_available()
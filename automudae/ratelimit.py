@@ -0,0 +1,234 @@
+# pylint: disable=R0902
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+
+import discord
+from discord.http import HTTPClient, Route
+
+from automudae.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_COMMAND_PERIOD_SEC = 1.0
+DEFAULT_REACT_PERIOD_SEC = 0.25
+GLOBAL_LIMIT_PER_SEC = 50
+
+
+class RateLimitPriority(IntEnum):
+    CLAIM = 0
+    ROUTINE = 1
+
+
+class RateLimitBucket:
+    """Token bucket whose size and window are learned from Discord's headers.
+
+    Until a response is observed, the bucket allows ``limit`` requests per
+    ``period``. Waiters are woken in priority order, so a claim queued behind
+    routine commands still goes out first.
+    """
+
+    def __init__(self, name: str, limit: int, period: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.remaining = limit
+        self.reset_at = 0.0
+        self.learned = False
+
+        self.waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self.sequence = itertools.count()
+        self.timer: asyncio.TimerHandle | None = None
+
+        self.acquired = 0
+        self.waited = 0
+        self.wait_total = 0.0
+        self.rate_limited = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"name={self.name!r}, "
+            f"limit={self.limit}, "
+            f"remaining={self.remaining}, "
+            f"period={self.period:.2f}, "
+            f"learned={self.learned}, "
+            f"waiting={len(self.waiters)}, "
+            f"rate_limited={self.rate_limited})"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.period
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        self.acquired += 1
+        return True
+
+    async def acquire(
+        self, priority: RateLimitPriority = RateLimitPriority.ROUTINE
+    ) -> None:
+        if not self.waiters and self.try_acquire():
+            return
+
+        start = time.perf_counter()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+        self.schedule_wake()
+        try:
+            await future
+        finally:
+            self.waited += 1
+            self.wait_total += time.perf_counter() - start
+
+    def schedule_wake(self) -> None:
+        if self.timer is not None or not self.waiters:
+            return
+        delay = max(0.0, self.reset_at - time.monotonic())
+        self.timer = asyncio.get_running_loop().call_later(delay, self.wake)
+
+    def wake(self) -> None:
+        self.timer = None
+        while self.waiters:
+            _, _, future = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+            if not self.try_acquire():
+                break
+            heapq.heappop(self.waiters)
+            future.set_result(None)
+        self.schedule_wake()
+
+    def learn(self, limit: int, remaining: int, reset_after: float) -> None:
+        if not self.learned or limit != self.limit:
+            logger.debug(
+                "Learned rate limit %s: %d per %.2fs", self.name, limit, reset_after
+            )
+        self.learned = True
+        self.limit = max(1, limit)
+        self.remaining = remaining
+        self.reset_at = time.monotonic() + reset_after
+        if remaining == self.limit - 1:
+            # First request of a window, so this is the full window length
+            self.period = max(reset_after, 1e-3)
+
+    def back_off(self, retry_after: float) -> None:
+        self.rate_limited += 1
+        self.remaining = 0
+        self.reset_at = time.monotonic() + retry_after
+        logger.info("Rate limited on %s, backing off %.2fs", self.name, retry_after)
+
+
+class RateLimitSlot:
+    """Holds a bucket slot for one request and learns from its response"""
+
+    def __init__(
+        self,
+        limiter: "AdaptiveRateLimiter",
+        bucket: RateLimitBucket,
+        route: Route,
+        priority: RateLimitPriority,
+    ) -> None:
+        self.limiter = limiter
+        self.bucket = bucket
+        self.route = route
+        self.priority = priority
+
+    async def __aenter__(self) -> None:
+        start = time.perf_counter()
+        await self.limiter.global_bucket.acquire(self.priority)
+        await self.bucket.acquire(self.priority)
+        METRICS.limiter_wait.observe(time.perf_counter() - start, self.route.key)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
+        if isinstance(exc_val, discord.RateLimited):
+            self.bucket.back_off(exc_val.retry_after)
+        elif isinstance(exc_val, discord.HTTPException) and exc_val.status == 429:
+            self.bucket.back_off(self.bucket.period)
+        self.limiter.observe(self.bucket, self.route)
+
+
+class AdaptiveRateLimiter:
+    """One ``RateLimitBucket`` per Discord rate limit scope.
+
+    Message sends and reactions are scoped per channel, interactions (button
+    clicks) per user, mirroring Discord's buckets. Every request also passes the
+    global bucket, where claims jump ahead of routine commands. After every
+    request, the state the HTTP client parsed from the ``X-RateLimit-*`` headers
+    is copied into the matching bucket.
+    """
+
+    def __init__(
+        self,
+        http: HTTPClient | None = None,
+        command_period: float = DEFAULT_COMMAND_PERIOD_SEC,
+        react_period: float = DEFAULT_REACT_PERIOD_SEC,
+    ) -> None:
+        self.http = http
+        self.command_period = command_period
+        self.react_period = react_period
+        self.buckets: dict[str, RateLimitBucket] = {}
+        self.global_bucket = RateLimitBucket("global", GLOBAL_LIMIT_PER_SEC, 1.0)
+
+    def bucket(self, route: Route, period: float) -> RateLimitBucket:
+        key = f"{route.key}:{route.major_parameters}"
+        if (bucket := self.buckets.get(key)) is None:
+            bucket = self.buckets[key] = RateLimitBucket(key, 1, period)
+        return bucket
+
+    def slot(
+        self, route: Route, period: float, priority: RateLimitPriority
+    ) -> RateLimitSlot:
+        return RateLimitSlot(self, self.bucket(route, period), route, priority)
+
+    def command(
+        self,
+        channel: discord.abc.Snowflake,
+        priority: RateLimitPriority = RateLimitPriority.ROUTINE,
+    ) -> RateLimitSlot:
+        route = Route("POST", "/channels/{channel_id}/messages", channel_id=channel.id)
+        return self.slot(route, self.command_period, priority)
+
+    def reaction(
+        self,
+        message: discord.Message | discord.PartialMessage,
+        priority: RateLimitPriority = RateLimitPriority.CLAIM,
+    ) -> RateLimitSlot:
+        route = Route(
+            "PUT",
+            "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me",
+            channel_id=message.channel.id,
+            message_id=message.id,
+            emoji="",
+        )
+        return self.slot(route, self.react_period, priority)
+
+    def interaction(
+        self, priority: RateLimitPriority = RateLimitPriority.CLAIM
+    ) -> RateLimitSlot:
+        return self.slot(Route("POST", "/interactions"), self.react_period, priority)
+
+    def observe(self, bucket: RateLimitBucket, route: Route) -> None:
+        if self.http is None:
+            return
+
+        # pylint: disable=W0212
+        bucket_hash = self.http._bucket_hashes.get(route.key, route.key)
+        ratelimit = self.http._buckets.get(f"{bucket_hash}:{route.major_parameters}")
+        if ratelimit is None or ratelimit.expires is None:
+            return
+
+        reset_after = ratelimit.expires - asyncio.get_running_loop().time()
+        if reset_after > 0:
+            bucket.learn(ratelimit.limit, ratelimit.remaining, reset_after)
@@ -0,0 +1,148 @@
+# pylint: disable=R0902
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import yaml
+from pydantic import ValidationError
+
+from automudae.config import Config
+from automudae.mudae.roll.criteria import ClaimCriteriaEngine
+from automudae.mudae.roll.kakera import KakeraReactionPlanner
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CONFIG_RELOAD_INTERVAL_SEC = 2.0
+# Sections read once at startup, changing them still needs a restart
+CONFIG_RESTART_SECTIONS = [
+    "name",
+    "version",
+    "discord",
+    "trace",
+    "store",
+    "snapshot",
+    "metrics",
+    "log",
+]
+
+
+@dataclass(frozen=True)
+class CompiledConfig:
+    """A config with the lookup structures derived from it"""
+
+    config: Config
+    claim_criteria: ClaimCriteriaEngine
+    kakera_planner: KakeraReactionPlanner
+
+    @classmethod
+    def compile(cls, config: Config) -> "CompiledConfig":
+        return cls(
+            config,
+            ClaimCriteriaEngine(config.mudae.claim),
+            KakeraReactionPlanner(config.mudae.kakeraReact),
+        )
+
+
+class ConfigWatcher:
+    """Reloads the ``mudae`` section of the config file when the file changes.
+
+    The file is polled for a new modification time or size, and reloaded once it
+    kept them for a whole interval. The YAML is validated and compiled in a worker
+    thread, then ``apply`` swaps the result in with a single synchronous call. A
+    claim evaluation holds on to the criteria it started with, so it never mixes
+    the old and the new criteria. An invalid file keeps the current config.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        config: Config,
+        apply: Callable[[CompiledConfig], None],
+        interval: float = CONFIG_RELOAD_INTERVAL_SEC,
+    ) -> None:
+        self.path = path
+        self.config = config
+        # The file as last applied, a section needing a restart is reported once
+        self.loaded = config
+        self.apply = apply
+        self.interval = interval
+        self.signature = self.stat()
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_latency = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"path={self.path}, "
+            f"reloads={self.reloads}, "
+            f"failures={self.failures}, "
+            f"last_latency={self.last_latency * 1e3:.1f}ms)"
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def stat(self) -> tuple[int, int] | None:
+        if self.path is None:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def run(self) -> None:
+        pending: tuple[int, int] | None = None
+        while True:
+            await asyncio.sleep(self.interval)
+            if (signature := self.stat()) is None or signature == self.signature:
+                pending = None
+                continue
+            # Reload once the file stopped changing, it may still be written to
+            if signature != pending:
+                pending = signature
+                continue
+            self.signature = signature
+            await self.reload()
+
+    async def reload(self) -> bool:
+        """Load, compile and apply the config file, False if it is invalid"""
+        assert self.path is not None
+        start = time.perf_counter()
+        try:
+            loaded, compiled = await asyncio.to_thread(self.load, self.path)
+        except (
+            OSError,
+            TypeError,
+            re.error,
+            yaml.YAMLError,
+            ValidationError,
+        ) as error:
+            self.failures += 1
+            logger.error("Config reload failed, keeping the current config: %s", error)
+            return False
+
+        for section in CONFIG_RESTART_SECTIONS:
+            if getattr(loaded, section) != getattr(self.loaded, section):
+                logger.warning("Config %s changed, restart to apply it", section)
+        self.apply(compiled)
+        self.config = compiled.config
+        self.loaded = loaded
+        self.reloads += 1
+        self.last_latency = time.perf_counter() - start
+        logger.info("Config reloaded: %s", self)
+        return True
+
+    def load(self, path: str) -> tuple[Config, CompiledConfig]:
+        """The config file, and the running config with its mudae section"""
+        loaded = Config.from_file(path)
+        return loaded, CompiledConfig.compile(
+            self.config.model_copy(update={"mudae": loaded.mudae})
+        )
@@ -0,0 +1,75 @@
+import logging
+import os
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+SNAPSHOT_INTERVAL_SEC = 1.0
+
+
+class MudaeChannelSnapshot(BaseModel):
+    """Timer model, counters and held best picks of a single Mudae channel"""
+
+    timer_status: dict[str, Any] = Field(default_factory=dict)
+    rolls_executed: int = 0
+    rolls_handled: int = 0
+    best_claim_roll_id: int | None = None
+    kakera_pick_ids: list[int] = Field(default_factory=list[int])
+
+
+class AgentSnapshot(BaseModel):
+
+    version: Literal[1] = 1
+    channels: dict[int, MudaeChannelSnapshot] = Field(default_factory=dict)
+
+
+class AgentSnapshotFile:
+    """The agent state on disk, to resume from after a restart.
+
+    ``save`` only writes when the snapshot changed, to a temporary file that then
+    replaces the snapshot, so a crash mid-write leaves the previous one intact.
+    """
+
+    def __init__(self, path: str | None) -> None:
+        self.path = path
+        self.last_written: str | None = None
+        self.writes = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path}, writes={self.writes})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def load(self) -> AgentSnapshot | None:
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            snapshot = AgentSnapshot.model_validate_json(content)
+        except ValidationError:
+            logger.exception("Ignoring unreadable snapshot %s", self.path)
+            return None
+        self.last_written = content
+        logger.info("Loaded snapshot of %d channels", len(snapshot.channels))
+        return snapshot
+
+    def save(self, snapshot: AgentSnapshot) -> None:
+        if self.path is None:
+            return
+        content = snapshot.model_dump_json()
+        if content == self.last_written:
+            return
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temporary_path, self.path)
+        self.last_written = content
+        self.writes += 1
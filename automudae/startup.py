@@ -0,0 +1,37 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+STARTUP_REPORT_MILESTONES = ("ready", "first_roll")
+
+
+class StartupProfile:
+    """Time from the entry point to each startup milestone, up to the first roll.
+
+    Milestones are recorded once, in milliseconds since the profile was created;
+    the profile is logged when the agent is ready and after the first roll.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.marks: dict[str, float] = {}
+
+    def __repr__(self) -> str:
+        marks = ", ".join(
+            f"{milestone}={elapsed * 1e3:.0f}ms"
+            for milestone, elapsed in self.marks.items()
+        )
+        return f"{self.__class__.__name__}({marks})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def mark(self, milestone: str) -> None:
+        if not self.enabled or milestone in self.marks:
+            return
+        self.marks[milestone] = time.perf_counter() - self.started_at
+        if milestone in STARTUP_REPORT_MILESTONES:
+            logger.info("Startup: %s", self)
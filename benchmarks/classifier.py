@@ -0,0 +1,81 @@
+import asyncio
+import time
+from collections import Counter
+
+import discord
+
+from automudae.mudae.classifier import MudaeMessageClassifier, MudaeMessageKind
+from automudae.mudae.roll.command import MudaeRollCommand
+from automudae.mudae.roll.helper import MudaeRollCommandIndex
+from automudae.mudae.roll.result import MudaeClaimableRollResult, MudaeKakeraRollResult
+from automudae.mudae.timer import MudaeTimerStatus
+from benchmarks.fakes import FakeMessage, FakeWorld, build_messages, load_corpus
+
+REPEAT = 20
+
+
+async def parse_sequentially(
+    message: discord.Message, user: discord.ClientUser, index: MudaeRollCommandIndex
+) -> object:
+    if (roll_command := MudaeRollCommand.create(message)) is not None:
+        index.add(roll_command)
+        return roll_command
+    if (claimable := await MudaeClaimableRollResult.create(message, index)) is not None:
+        return claimable
+    if (kakera := await MudaeKakeraRollResult.create(message, index)) is not None:
+        return kakera
+    return await MudaeTimerStatus.create(message, user)
+
+
+async def parse_classified(
+    message: discord.Message,
+    user: discord.ClientUser,
+    index: MudaeRollCommandIndex,
+    classifier: MudaeMessageClassifier,
+) -> object:
+    kind = classifier.classify(message, user)
+    if kind is MudaeMessageKind.NOISE:
+        return None
+    if kind is MudaeMessageKind.ROLL_COMMAND:
+        if (roll_command := MudaeRollCommand.create(message)) is not None:
+            index.add(roll_command)
+        return roll_command
+    if kind is MudaeMessageKind.CLAIMABLE_ROLL:
+        if (
+            claimable := await MudaeClaimableRollResult.create(message, index)
+        ) is not None:
+            return claimable
+    if kind in (MudaeMessageKind.CLAIMABLE_ROLL, MudaeMessageKind.KAKERA_ROLL):
+        return await MudaeKakeraRollResult.create(message, index)
+    return await MudaeTimerStatus.create(message, user)
+
+
+async def run(messages: list[FakeMessage], world: FakeWorld) -> None:
+    classifier = MudaeMessageClassifier(world.mudae.id)
+    kinds = Counter(classifier.classify(message, world.me).name for message in messages)
+    print(f"corpus: {len(messages)} messages, {dict(kinds)}")
+
+    for name in ("sequential", "classified"):
+        index = MudaeRollCommandIndex()
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            index.reset()
+            for message in messages:
+                index.observe(message)
+                if name == "sequential":
+                    await parse_sequentially(message, world.me, index)
+                else:
+                    await parse_classified(message, world.me, index, classifier)
+        elapsed = time.perf_counter() - start
+        per_message = elapsed / (REPEAT * len(messages))
+        print(f"{name:>12}: {per_message * 1e6:8.2f} us/message")
+
+
+def main() -> None:
+    world = FakeWorld()
+    messages = build_messages(world, load_corpus("busy_channel"))
+    asyncio.run(run(messages, world))
+
+
+if __name__ == "__main__":
+    main()
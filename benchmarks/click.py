@@ -0,0 +1,139 @@
+import asyncio
+import random
+import time
+from functools import partial
+
+import aiohttp
+from aiohttp.client_reqrep import ConnectionKey
+from discord.http import Route
+
+from automudae.mudae.helper.click import Click, ClickExecutor
+from automudae.mudae.helper.trace import percentile
+from automudae.mudae.roll.deadline import ClickLatencyEstimator
+from automudae.ratelimit import AdaptiveRateLimiter, RateLimitPriority
+
+ROLLS = 100
+BUTTONS = [1, 3]
+INTERACTIONS_PER_SEC = 10
+CLICK_MEDIAN_SEC = 0.08
+CLICK_SLOW_CHANCE = 0.05
+CLICK_SLOW_SEC = 1.5
+# The connection is refused and the click never reaches Discord
+CLICK_REFUSED_CHANCE = 0.1
+# The click goes through but its response is lost
+CLICK_DROPPED_CHANCE = 0.02
+ROLL_EXPIRY_SEC = 30.0
+
+
+def refused() -> aiohttp.ClientConnectorError:
+    return aiohttp.ClientConnectorError(
+        ConnectionKey("discord.com", 443, True, True, None, None, None, "discord.com"),
+        ConnectionRefusedError(),
+    )
+
+
+class FlakyButton:
+    """A button whose interaction is sometimes slow and sometimes fails"""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.presses = 0
+
+    @property
+    def clicked(self) -> bool:
+        return self.presses > 0
+
+    async def click(self) -> None:
+        if self.rng.random() < CLICK_REFUSED_CHANCE:
+            raise refused()
+        if self.rng.random() < CLICK_SLOW_CHANCE:
+            await asyncio.sleep(CLICK_SLOW_SEC)
+        else:
+            await asyncio.sleep(self.rng.lognormvariate(0, 0.3) * CLICK_MEDIAN_SEC)
+        self.presses += 1
+        if self.rng.random() < CLICK_DROPPED_CHANCE:
+            raise aiohttp.ServerDisconnectedError()
+
+
+def make_limiter() -> AdaptiveRateLimiter:
+    limiter = AdaptiveRateLimiter(react_period=1.0)
+    limiter.bucket(Route("POST", "/interactions"), 1.0).learn(
+        INTERACTIONS_PER_SEC, INTERACTIONS_PER_SEC, 1.0
+    )
+    return limiter
+
+
+async def serial(limiter: AdaptiveRateLimiter, buttons: list[FlakyButton]) -> None:
+    """The former click loop: one slot, one button after the other, no retry"""
+    try:
+        async with limiter.interaction(RateLimitPriority.CLAIM):
+            for button in buttons:
+                await button.click()
+    except aiohttp.ClientError:
+        pass
+
+
+async def executed(
+    limiter: AdaptiveRateLimiter,
+    executor: ClickExecutor,
+    latency: ClickLatencyEstimator,
+    buttons: list[FlakyButton],
+    hedge: bool,
+) -> None:
+    """The agent's executor; only reactions are hedged, buttons are not"""
+    clicks: list[tuple[str, Click]] = [
+        (f"button {index}", button.click) for index, button in enumerate(buttons)
+    ]
+    results = await executor.run(
+        clicks,
+        partial(limiter.interaction, RateLimitPriority.CLAIM),
+        time.time() + ROLL_EXPIRY_SEC,
+        latency.hedge_after if hedge else None,
+    )
+    for result in results:
+        if result.error is None:
+            latency.observe(result.latency)
+
+
+async def run() -> None:
+    print(
+        f"{'policy':>10} {'buttons':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'clicked':>8} {'twice':>6}"
+    )
+    for button_count in BUTTONS:
+        for name in ["serial", "buttons", "reactions"]:
+            rng = random.Random(button_count)
+            executor = ClickExecutor()
+            latency = ClickLatencyEstimator()
+            durations = []
+            clicked = 0
+            twice = 0
+            for _ in range(ROLLS):
+                # Rolls are clicked seconds apart, each finds the limiter idle
+                limiter = make_limiter()
+                buttons = [FlakyButton(rng) for _ in range(button_count)]
+                start = time.perf_counter()
+                if name == "serial":
+                    await serial(limiter, buttons)
+                else:
+                    await executed(
+                        limiter, executor, latency, buttons, name == "reactions"
+                    )
+                durations.append(time.perf_counter() - start)
+                clicked += all(button.clicked for button in buttons)
+                # Harmless for a hedged reaction, a button press would spend twice
+                twice += sum(button.presses > 1 for button in buttons)
+            print(
+                f"{name:>10} {button_count:>8} "
+                f"{percentile(durations, 50) * 1e3:>8.1f} "
+                f"{percentile(durations, 99) * 1e3:>8.1f} "
+                f"{clicked / ROLLS:>8.1%} {twice:>6}"
+            )
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
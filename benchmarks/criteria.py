@@ -0,0 +1,213 @@
+import random
+import re
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import cast
+
+import discord
+
+from automudae.config import ClaimConfig, ClaimCriteria, Criteria
+from automudae.mudae.helper.click import ClickHandle
+from automudae.mudae.roll import MudaeRollOwner
+from automudae.mudae.roll.criteria import ClaimCriteriaEngine, get_claim_rules
+from automudae.mudae.roll.pattern import (
+    NamePatternKind,
+    compile_name_regex,
+    normalize_name,
+    parse_name_pattern,
+)
+from automudae.mudae.roll.result import MudaeClaimableRollResult
+
+LIST_SIZES = [10, 100, 1_000, 10_000, 50_000]
+ROLLS = 1_000
+PATTERN_SIZES = [10, 1_000, 50_000]
+NAIVE_ROLLS = 50
+REGEXES = 10
+
+
+def make_claim_config(size: int) -> ClaimConfig:
+    characters = [f"Character {i}" for i in range(size)]
+    series = [f"Series {i}" for i in range(size)]
+    criteria = ClaimCriteria(
+        wish=True,
+        character=characters,
+        series=series,
+        minKakera=500,
+        exception=Criteria(character=characters[::2], series=series[::2]),
+    )
+    return ClaimConfig(snipe=criteria, earlyClaim=criteria, lateClaim=criteria)
+
+
+def make_rolls(size: int) -> list[MudaeClaimableRollResult]:
+    rng = random.Random(size)
+    user = cast(MudaeRollOwner, discord.Object(id=1))
+    created_at = datetime.now(tz=timezone.utc)
+    return [
+        MudaeClaimableRollResult(
+            owner=user,
+            message_id=index,
+            channel_id=1,
+            created_at=created_at,
+            handle=cast(ClickHandle, None),
+            character=f"Character {rng.randrange(size * 2)}",
+            series=f"Series {rng.randrange(size * 2)}",
+            kakera_value=rng.randrange(30, 1000),
+            wished_by=None,
+        )
+        for index in range(ROLLS)
+    ]
+
+
+def is_qualified(
+    roll: MudaeClaimableRollResult, criteria: Criteria, user: MudaeRollOwner
+) -> bool:
+    """The former check of a roll against one rule, a scan of the name lists"""
+    character_qualify = roll.character in criteria.character
+    series_qualify = roll.series in criteria.series
+    kakera_qualify = roll.kakera_value >= criteria.minKakera
+    wish_qualify = (
+        criteria.wish and roll.wished_by is not None and roll.wished_by.id == user.id
+    )
+    return character_qualify or series_qualify or kakera_qualify or wish_qualify
+
+
+def bench_is_qualified(
+    claim_config: ClaimConfig, rolls: list[MudaeClaimableRollResult]
+) -> float:
+    user = cast(MudaeRollOwner, discord.Object(id=1))
+    rules = get_claim_rules(claim_config)
+
+    def run() -> None:
+        for roll in rolls:
+            for rule in rules:
+                is_qualified(roll, rule, user)
+
+    return min(timeit.repeat(run, number=1, repeat=3)) / len(rolls)
+
+
+def bench_engine(
+    engine: ClaimCriteriaEngine, rolls: list[MudaeClaimableRollResult]
+) -> float:
+    def run() -> None:
+        for roll in rolls:
+            engine.evaluate(roll.character, roll.series, roll.kakera_value, False)
+
+    return min(timeit.repeat(run, number=1, repeat=5)) / len(rolls)
+
+
+def make_patterns(size: int) -> list[str]:
+    """Exact names, prefixes, suffixes and substrings, plus a few regexes"""
+    shapes = ["Series {}", "Series {} *", "* Saga {}", "*Chronicle {} *"]
+    patterns = [shapes[i % len(shapes)].format(i) for i in range(size)]
+    patterns += [f"re:^Tale {i}[a-z]+$" for i in range(REGEXES)]
+    return patterns
+
+
+def make_series(size: int, count: int) -> list[str]:
+    rng = random.Random(size)
+    shapes = ["Series {}", "Series {} Zero", "Grand Saga {}", "The Chronicle {} II"]
+    return [rng.choice(shapes).format(rng.randrange(size * 2)) for _ in range(count)]
+
+
+def naive_match(
+    patterns: list[tuple[NamePatternKind, str | re.Pattern[str]]], series: str
+) -> bool:
+    """One check per pattern, as a list of patterns would be scanned"""
+    name = normalize_name(series)
+    for kind, value in patterns:
+        if isinstance(value, re.Pattern):
+            matched = value.search(name) is not None
+        elif kind is NamePatternKind.PREFIX:
+            matched = name.startswith(value)
+        elif kind is NamePatternKind.SUFFIX:
+            matched = name.endswith(value)
+        elif kind is NamePatternKind.SUBSTRING:
+            matched = value in name
+        else:
+            matched = name == value
+        if matched:
+            return True
+    return False
+
+
+def parse_patterns(
+    patterns: list[str],
+) -> list[tuple[NamePatternKind, str | re.Pattern[str]]]:
+    parsed: list[tuple[NamePatternKind, str | re.Pattern[str]]] = []
+    for pattern in patterns:
+        kind, value = parse_name_pattern(pattern)
+        if kind is NamePatternKind.REGEX:
+            parsed.append((kind, compile_name_regex(value)))
+        else:
+            parsed.append((kind, value))
+    return parsed
+
+
+def bench_naive(
+    patterns: list[tuple[NamePatternKind, str | re.Pattern[str]]], series: list[str]
+) -> float:
+    def run() -> None:
+        for name in series:
+            naive_match(patterns, name)
+
+    return min(timeit.repeat(run, number=1, repeat=3)) / len(series)
+
+
+def bench_series(engine: ClaimCriteriaEngine, series: list[str]) -> float:
+    def run() -> None:
+        for name in series:
+            engine.evaluate("", name, 0, False)
+
+    return min(timeit.repeat(run, number=1, repeat=5)) / len(series)
+
+
+def bench_patterns() -> None:
+    print(f"{'patterns':>8} {'naive':>12} {'engine':>10} {'build':>10}")
+    for size in PATTERN_SIZES:
+        patterns = make_patterns(size)
+        start = time.perf_counter()
+        engine = ClaimCriteriaEngine(ClaimConfig(snipe=ClaimCriteria(series=patterns)))
+        build = time.perf_counter() - start
+
+        parsed = parse_patterns(patterns)
+        series = make_series(size, ROLLS)
+        for name in series[:NAIVE_ROLLS]:
+            assert (
+                naive_match(parsed, name) == engine.evaluate("", name, 0, False).snipe
+            )
+
+        naive = bench_naive(parsed, series[:NAIVE_ROLLS])
+        compiled = bench_series(engine, series)
+        print(
+            f"{size:>8} {naive * 1e6:>9.2f} us {compiled * 1e6:>7.2f} us "
+            f"{build * 1e3:>7.1f} ms"
+        )
+
+
+def main() -> None:
+    print(f"{'names':>8} {'is_qualified x6':>16} {'engine':>10} {'build':>10}")
+    for size in LIST_SIZES:
+        claim_config = make_claim_config(size)
+        rolls = make_rolls(size)
+        build = min(
+            timeit.repeat(
+                "ClaimCriteriaEngine(claim_config)",
+                number=1,
+                repeat=3,
+                globals={**globals(), "claim_config": claim_config},
+            )
+        )
+        engine = ClaimCriteriaEngine(claim_config)
+        legacy = bench_is_qualified(claim_config, rolls)
+        compiled = bench_engine(engine, rolls)
+        print(
+            f"{size:>8} {legacy * 1e6:>13.2f} us {compiled * 1e6:>7.2f} us {build * 1e3:>7.1f} ms"
+        )
+
+    print()
+    bench_patterns()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# pylint: disable=W0231,W0212,W0223,E0237,R0902,R0913,R0917
+import itertools
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, cast
+
+import discord
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+SNOWFLAKE_INCREMENT = itertools.cycle(range(4096))
+
+
+class FakeUser(discord.user.BaseUser):
+    __slots__ = ()
+
+    def __init__(self, user_id: int, name: str) -> None:
+        self.id = user_id
+        self.name = name
+        self.global_name = None
+        self.discriminator = "0"
+        self.bot = False
+
+
+class FakeClientUser(discord.ClientUser):
+    __slots__ = ()
+
+    def __init__(self, user_id: int, name: str) -> None:
+        self.id = user_id
+        self.name = name
+        self.global_name = None
+        self.discriminator = "0"
+        self.bot = False
+
+
+class FakeGuild:
+    def __init__(self, members: dict[int, FakeUser]) -> None:
+        self.id = 1
+        self.member_map = members
+        self.fetch_member_calls = 0
+
+    @property
+    def members(self) -> list[FakeUser]:
+        return list(self.member_map.values())
+
+    def get_member(self, member_id: int) -> FakeUser | None:
+        return self.member_map.get(member_id)
+
+    async def fetch_member(self, member_id: int) -> FakeUser:
+        self.fetch_member_calls += 1
+        return self.member_map[member_id]
+
+
+@dataclass
+class FakeAction:
+    """A claim or kakera react interaction performed against a fake message"""
+
+    kind: str
+    message: "FakeMessage"
+    at: datetime
+
+    @property
+    def latency(self) -> float:
+        return (self.at - self.message.created_at).total_seconds()
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild: FakeGuild, name: str = "mudae") -> None:
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.messages: list[discord.Message] = []
+        self.actions: list[FakeAction] = []
+        self.author: discord.user.BaseUser | None = None
+        self.on_send: Callable[["FakeMessage"], None] | None = None
+        self.history_calls = 0
+
+    async def send(self, content: str) -> "FakeMessage":
+        assert self.author
+        message = FakeMessage(
+            created_at=datetime.now(tz=timezone.utc),
+            channel=self,
+            author=self.author,
+            content=content,
+        )
+        self.messages.append(message)
+        if self.on_send is not None:
+            self.on_send(message)
+        return message
+
+    async def history(self, *, before: datetime, after: datetime, **_: Any):
+        self.history_calls += 1
+        for message in self.messages:
+            if after < message.created_at < before:
+                yield message
+
+    def get_partial_message(self, message_id: int) -> "FakePartialMessage":
+        return FakePartialMessage(self, message_id)
+
+
+class FakePartialMessage:
+    """A message known only by its channel and id, like ``discord.PartialMessage``"""
+
+    def __init__(self, channel: FakeChannel, message_id: int) -> None:
+        self.channel = channel
+        self.id = message_id
+
+    async def add_reaction(self, emoji: Any, /, *, boost: bool = False) -> None:
+        message = next(
+            message for message in self.channel.messages if message.id == self.id
+        )
+        assert isinstance(message, FakeMessage)
+        await message.add_reaction(emoji, boost=boost)
+
+
+@dataclass
+class FakeInteraction:
+    user: FakeUser
+
+
+class FakeMessage(discord.Message):
+    __slots__ = ("_created_at", "fake_channel")
+
+    def __init__(
+        self,
+        created_at: datetime,
+        channel: FakeChannel,
+        author: discord.user.BaseUser,
+        content: str = "",
+        embeds: list[discord.Embed] | None = None,
+        interaction: FakeInteraction | None = None,
+    ) -> None:
+        # Like Discord, the low bits keep ids of the same millisecond apart
+        self.id = discord.utils.time_snowflake(created_at) + next(SNOWFLAKE_INCREMENT)
+        self._created_at = created_at
+        self.fake_channel = channel
+        self.channel = channel  # type: ignore[assignment]
+        self.guild = channel.guild  # type: ignore[assignment]
+        self.author = author  # type: ignore[assignment]
+        self.content = content
+        self.embeds = embeds or []
+        self.components = []
+        self.interaction = interaction  # type: ignore[assignment]
+        self.mentions = []
+
+    @property
+    def created_at(self) -> datetime:
+        # Snowflakes only carry milliseconds, keep the exact delivery time
+        return self._created_at
+
+    async def add_reaction(self, emoji: Any, /, *, boost: bool = False) -> None:
+        self.fake_channel.actions.append(
+            FakeAction("react", self, datetime.now(tz=timezone.utc))
+        )
+        del emoji, boost
+
+
+class FakeButton(discord.Button):
+    __slots__ = ()
+
+    async def click(self) -> str:  # type: ignore[override]
+        message = cast(FakeMessage, self.message)
+        message.fake_channel.actions.append(
+            FakeAction("click", message, datetime.now(tz=timezone.utc))
+        )
+        return self.custom_id or ""
+
+
+def make_buttons(message: FakeMessage, emoji_names: list[str]) -> None:
+    children = [
+        FakeButton._raw_construct(
+            message=message,
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"{message.id}-{index}",
+            url=None,
+            disabled=False,
+            label=None,
+            emoji=discord.PartialEmoji(name=emoji_name),
+        )
+        for index, emoji_name in enumerate(emoji_names)
+    ]
+    message.components = [
+        discord.ActionRow._raw_construct(message=message, children=children)
+    ]
+
+
+@dataclass
+class FakeWorld:
+    """Users, guild and channel shared by every message of a replayed corpus"""
+
+    me: FakeClientUser = field(default_factory=lambda: FakeClientUser(10, "agent"))
+    mudae: FakeUser = field(default_factory=lambda: FakeUser(20, "Mudae"))
+    users: dict[str, FakeUser] = field(default_factory=dict)
+    guild: FakeGuild = field(default_factory=lambda: FakeGuild({}))
+    channel: FakeChannel | None = None
+
+    def __post_init__(self) -> None:
+        self.channel = FakeChannel(100, self.guild)
+        self.channel.author = self.me
+        self.users = {"agent": self.me, "Mudae": self.mudae}  # type: ignore[dict-item]
+
+    def user(self, name: str) -> FakeUser:
+        if name not in self.users:
+            self.users[name] = FakeUser(1000 + len(self.users), name)
+            self.guild.member_map[self.users[name].id] = self.users[name]
+        return self.users[name]
+
+    def message(
+        self, record: dict[str, Any], start: datetime | None = None
+    ) -> FakeMessage:
+        assert self.channel
+        content: str = record.get("content", "")
+        for name in record.get("wished_by", []):
+            content = content.replace(f"<@{name}>", f"<@{self.user(name).id}>")
+            self.guild.member_map[self.user(name).id] = self.user(name)
+
+        embeds: list[discord.Embed] = []
+        if (embed_record := record.get("embed")) is not None:
+            embed = discord.Embed(description=embed_record.get("description"))
+            embed.set_author(name=embed_record.get("author"))
+            embeds.append(embed)
+
+        interaction = None
+        if (interaction_user := record.get("interaction_user")) is not None:
+            interaction = FakeInteraction(self.user(interaction_user))
+
+        if start is None:
+            created_at = datetime.now(tz=timezone.utc)
+        else:
+            created_at = start + timedelta(seconds=record.get("offset", 0.0))
+
+        message = FakeMessage(
+            created_at=created_at,
+            channel=self.channel,
+            author=self.user(record["author"]),
+            content=content,
+            embeds=embeds,
+            interaction=interaction,
+        )
+        if buttons := record.get("buttons"):
+            make_buttons(message, buttons)
+        self.channel.messages.append(message)
+        return message
+
+    def edit(self, message: FakeMessage, record: dict[str, Any]) -> FakeMessage:
+        """``message`` as edited to ``record``, with the same id and creation time"""
+        assert self.channel
+        edited = self.message(record)
+        self.channel.messages.remove(edited)
+        edited.id = message.id
+        edited._created_at = message.created_at
+        return edited
+
+
+@dataclass
+class FakeRawMessageUpdate:
+    """The parts of ``discord.RawMessageUpdateEvent`` the agent reads"""
+
+    channel_id: int
+    message: FakeMessage
+
+
+def load_corpus(name: str) -> list[dict[str, Any]]:
+    with open(CORPUS_DIR / f"{name}.jsonl", "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_messages(
+    world: FakeWorld, records: list[dict[str, Any]], start: datetime | None = None
+) -> list[FakeMessage]:
+    start = start or datetime.now(tz=timezone.utc)
+    return [world.message(record, start) for record in records]
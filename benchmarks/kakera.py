@@ -0,0 +1,118 @@
+import random
+import statistics
+import time
+from typing import cast
+
+from automudae.config import KakeraReactConfig
+from automudae.mudae.roll.kakera import KakeraCandidate, KakeraReactionPlanner
+from automudae.mudae.roll.result import KAKERA_TYPES, MudaeKakeraRollResult
+
+BURSTS = 5_000
+ROLLS_PER_BURST = 10
+KAKERA_ROLL_CHANCE = 0.3
+KAKERA_COST = 36
+# Rough spawn weights, rarer buttons are worth more
+KAKERA_WEIGHTS = {
+    "kakeraP": 4,
+    "kakera": 30,
+    "kakeraT": 25,
+    "kakeraG": 18,
+    "kakeraY": 12,
+    "kakeraO": 6,
+    "kakeraR": 3,
+    "kakeraW": 1,
+    "kakeraL": 1,
+}
+CONFIG = KakeraReactConfig(
+    doNotReactToKakeraTypes=["kakera"],
+    doNotReactToKakeraTypeIfKakeraPowerLessThan={"kakeraT": 100},
+)
+
+
+def burst(rng: random.Random) -> list[str]:
+    names, weights = zip(*KAKERA_WEIGHTS.items())
+    return [
+        rng.choices(names, weights)[0]
+        for _ in range(ROLLS_PER_BURST)
+        if rng.random() < KAKERA_ROLL_CHANCE
+    ]
+
+
+def greedy(buttons: list[str], power: int) -> int:
+    """The former rule: kakeraP right away, then one react to the best pick"""
+    value = 0
+    best: str | None = None
+    for name in buttons:
+        if name == "kakeraP":
+            value += KAKERA_TYPES[name]
+            continue
+        minimum_power = CONFIG.doNotReactToKakeraTypeIfKakeraPowerLessThan.get(name, 0)
+        if power < minimum_power:
+            continue
+        if best is None or KAKERA_TYPES[best] <= KAKERA_TYPES[name]:
+            best = name
+    if (
+        best is not None
+        and best not in CONFIG.doNotReactToKakeraTypes
+        and power >= KAKERA_COST
+    ):
+        value += KAKERA_TYPES[best]
+    return value
+
+
+class IndexRoll:
+    """Stands in for a roll, ordered by its position in the burst"""
+
+    def __init__(self, index: int) -> None:
+        self.created_at = index
+
+
+def planned(
+    planner: KakeraReactionPlanner, buttons: list[str], power: int
+) -> tuple[int, float]:
+    """kakeraP right away, then the knapsack plan; returns the value and plan time"""
+    value = 0
+    candidates = []
+    for index, name in enumerate(buttons):
+        candidate = KakeraCandidate(
+            roll=cast(MudaeKakeraRollResult, IndexRoll(index)),
+            value=KAKERA_TYPES[name],
+            cost=CONFIG.kakeraPowerCost.get(name, KAKERA_COST),
+        )
+        minimum_power = CONFIG.doNotReactToKakeraTypeIfKakeraPowerLessThan.get(name, 0)
+        if name in CONFIG.doNotReactToKakeraTypes or power < minimum_power:
+            continue
+        if candidate.cost == 0:
+            value += candidate.value
+            continue
+        candidates.append(candidate)
+
+    start = time.perf_counter()
+    plan = planner.plan(candidates, power) if power >= KAKERA_COST else []
+    elapsed = time.perf_counter() - start
+    return value + sum(candidate.value for candidate in plan), elapsed
+
+
+def main() -> None:
+    rng = random.Random(0)
+    bursts = [(burst(rng), rng.choice([40, 72, 100, 110, 150])) for _ in range(BURSTS)]
+    planner = KakeraReactionPlanner(CONFIG)
+
+    greedy_values = [greedy(buttons, power) for buttons, power in bursts]
+    planned_values = []
+    plan_times = []
+    for buttons, power in bursts:
+        value, elapsed = planned(planner, buttons, power)
+        planned_values.append(value)
+        plan_times.append(elapsed)
+
+    print(f"{'policy':>8} {'kakera/burst':>13} {'plan us':>8}")
+    print(f"{'greedy':>8} {statistics.mean(greedy_values):>13.1f} {'':>8}")
+    print(
+        f"{'planned':>8} {statistics.mean(planned_values):>13.1f} "
+        f"{statistics.median(plan_times) * 1e6:>8.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
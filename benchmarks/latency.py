@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any
+
+from automudae.config import KakeraReactConfig
+from benchmarks.fakes import load_corpus
+from benchmarks.replay import (
+    ReplayHarness,
+    Scenario,
+    default_claim_config,
+    format_percentiles,
+)
+
+ITERATIONS = 10
+KAKERA_EDIT_DELAY_SEC = 0.2
+KAKERA = "<:kakera:469835869059153940>"
+CLAIMABLE_ROLLS = [
+    ("Nilou", "Genshin Impact", 45),
+    ("Jinhsi", "Wuthering Waves", 120),
+    ("Monkey D. Luffy", "One Piece", 80),
+    ("Rem", "Re:Zero kara Hajimeru Isekai Seikatsu", 310),
+    ("Saber", "Fate/stay night", 60),
+    ("Kobeni Higashiyama", "Chainsaw Man", 95),
+    ("Anya Forger", "SPY×FAMILY", 150),
+    ("Makima", "Chainsaw Man", 70),
+    ("Zero Two", "Darling in the FranXX", 40),
+    ("Frieren", "Sousou no Frieren", 200),
+]
+KAKERA_BUTTONS = [
+    "kakeraP",
+    "kakeraY",
+    "kakeraT",
+    "kakeraP",
+    "kakeraO",
+    "kakera",
+    "kakeraP",
+    "kakeraG",
+]
+
+
+def claimable_roll(character: str, series: str, kakera: int) -> dict[str, Any]:
+    return {
+        "author": "Mudae",
+        "embed": {
+            "author": character,
+            "description": f"{series}\n**{kakera}**{KAKERA}\nReact with any emoji to claim!",
+        },
+    }
+
+
+def kakera_roll(character: str, series: str, button: str) -> dict[str, Any]:
+    return {
+        "author": "Mudae",
+        "embed": {
+            "author": character,
+            "description": f"{series}\n**100**{KAKERA}\nBelongs to dave",
+        },
+        "buttons": [button],
+    }
+
+
+def late_kakera_roll(character: str, series: str, button: str) -> dict[str, Any]:
+    """A roll whose kakera button is attached by an edit, then edited again"""
+    roll = kakera_roll(character, series, button)
+    del roll["buttons"]
+    roll["edits"] = [
+        {"after": KAKERA_EDIT_DELAY_SEC, "buttons": [button]},
+        {"after": 2 * KAKERA_EDIT_DELAY_SEC, "buttons": [button]},
+    ]
+    return roll
+
+
+def others_only(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop the agent's own traffic from a recorded corpus, the live agent makes its own"""
+    result = []
+    last_command_author = None
+    for record in records:
+        if record["author"] != "Mudae":
+            last_command_author = record["author"]
+        if record["author"] == "agent" or (
+            record["author"] == "Mudae" and last_command_author == "agent"
+        ):
+            continue
+        result.append(record)
+    return result
+
+
+def wished_snipes() -> list[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    for index, (character, series, kakera) in enumerate(CLAIMABLE_ROLLS[:4]):
+        records.append({"author": "bob", "content": "$wa", "offset": index * 2.0})
+        records.append(
+            {
+                "author": "Mudae",
+                "content": "Wished by <@agent>",
+                "wished_by": ["agent"],
+                "embed": {
+                    "author": character,
+                    "description": f"{series}\n**{kakera}**{KAKERA}",
+                },
+                "buttons": ["\U0001f496"],
+                "offset": index * 2.0 + 0.3,
+            }
+        )
+    return records
+
+
+def scenarios() -> list[Scenario]:
+    deck = [claimable_roll(*roll) for roll in CLAIMABLE_ROLLS]
+    return [
+        Scenario("solo_rolls", deck=deck, claim_config=default_claim_config()),
+        Scenario(
+            "busy_channel",
+            deck=deck,
+            background=others_only(load_corpus("busy_channel")),
+            claim_config=default_claim_config(),
+            speed=50.0,
+        ),
+        Scenario(
+            "wished_snipes",
+            background=wished_snipes(),
+            claim_config=default_claim_config(),
+        ),
+        Scenario(
+            "lost_tail",
+            deck=deck,
+            claim_config=default_claim_config(),
+            lost_replies=3,
+            roll_expiry=3.0,
+        ),
+        Scenario(
+            "kakera_bursts",
+            deck=[
+                kakera_roll(character, series, button)
+                for (character, series, _), button in zip(
+                    CLAIMABLE_ROLLS, KAKERA_BUTTONS
+                )
+            ],
+            kakera_react_config=KakeraReactConfig(doNotReactToKakeraTypes=["kakera"]),
+        ),
+        Scenario(
+            "late_kakera",
+            deck=[
+                late_kakera_roll(character, series, button)
+                for (character, series, _), button in zip(
+                    CLAIMABLE_ROLLS, KAKERA_BUTTONS
+                )
+            ],
+            kakera_react_config=KakeraReactConfig(doNotReactToKakeraTypes=["kakera"]),
+        ),
+    ]
+
+
+async def run() -> None:
+    print(f"{'scenario':>14} {'samples':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for scenario in scenarios():
+        latencies: list[float] = []
+        for _ in range(ITERATIONS):
+            actions = await ReplayHarness(scenario).run()
+            latencies.extend(action.latency for action in actions)
+        print(
+            f"{scenario.name:>14} {len(latencies):>8} {format_percentiles(latencies)}"
+        )
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import asyncio
+import io
+import logging
+import time
+
+from automudae.log import JsonFormatter, log_context, setup_logging
+from automudae.mudae.helper.trace import percentile
+
+ROLLS = 200
+RECORDS_PER_ROLL = 8
+SINK_DELAY_SEC = 0.002
+
+logger = logging.getLogger("benchmarks.decision")
+
+
+class SlowSink(logging.Handler):
+    """A log sink that blocks like stdout piped into a busy container runtime"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stream = io.StringIO()
+        self.written = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(SINK_DELAY_SEC)
+        self.stream.write(self.format(record) + "\n")
+        self.written += 1
+
+
+async def decide(roll: int) -> None:
+    log_context.set({"message_id": roll, "character": f"Character {roll}"})
+    logger.info("SNIPE EVALUATION: Meets criteria: %s", False)
+    logger.info("PROCESSING: Roll is mine, evaluating for best claim selection")
+    # Formatted right away, the list could change before the listener formats it
+    logger.info("KAKERA BUTTONS FOUND: %s", ["kakeraP", "kakeraY"])
+    for _ in range(RECORDS_PER_ROLL - 4):
+        logger.info("BEST ROLL UNCHANGED: %r doesn't beat %r", roll, roll - 1)
+    logger.info("CLAIM DEFERRED: Waiting for %s more rolls", ROLLS - roll)
+
+
+async def measure() -> list[float]:
+    durations = []
+    for roll in range(ROLLS):
+        start = time.perf_counter()
+        await decide(roll)
+        durations.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+    return durations
+
+
+def report(name: str, durations: list[float], sink: SlowSink) -> None:
+    print(
+        f"{name:>12} {percentile(durations, 50) * 1e3:>8.3f} "
+        f"{percentile(durations, 99) * 1e3:>8.3f} {max(durations) * 1e3:>8.3f} "
+        f"{sink.written:>8}"
+    )
+
+
+def main() -> None:
+    print(f"{'pipeline':>12} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'written':>8}")
+    root = logging.getLogger()
+
+    sink = SlowSink()
+    sink.setFormatter(JsonFormatter())
+    root.addHandler(sink)
+    root.setLevel(logging.INFO)
+    durations = asyncio.run(measure())
+    root.removeHandler(sink)
+    report("direct", durations, sink)
+
+    sink = SlowSink()
+    listener = setup_logging("json", handler=sink)
+    durations = asyncio.run(measure())
+    listener.stop()
+    report("queue", durations, sink)
+
+
+if __name__ == "__main__":
+    main()
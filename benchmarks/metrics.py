@@ -0,0 +1,73 @@
+import asyncio
+import time
+import timeit
+
+from automudae.metrics import METRICS, MetricsServer
+from automudae.mudae.helper.trace import percentile
+from benchmarks.latency import scenarios
+from benchmarks.replay import ReplayHarness
+
+OPERATIONS = 100_000
+SCRAPES = 200
+
+
+async def scrape(port: int) -> tuple[str, float]:
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    response = await reader.read()
+    writer.close()
+    elapsed = time.perf_counter() - start
+    head, body = response.decode().split("\r\n\r\n", 1)
+    assert head.startswith("HTTP/1.0 200"), head
+    return body, elapsed
+
+
+async def run() -> None:
+    # Fill the registry the way the agent does, through the replayed scenarios
+    for scenario in scenarios():
+        await ReplayHarness(scenario).run()
+
+    server = MetricsServer("127.0.0.1", 0)
+    server_task = asyncio.create_task(server.run())
+    while server.server is None:
+        await asyncio.sleep(0)
+    port = server.server.sockets[0].getsockname()[1]
+
+    timings = []
+    body = ""
+    for _ in range(SCRAPES):
+        body, elapsed = await scrape(port)
+        timings.append(elapsed)
+    server_task.cancel()
+
+    samples = [line for line in body.splitlines() if not line.startswith("#")]
+    print(f"scrape: {len(samples)} samples, {len(body) / 1024:.1f} KiB")
+    for line in samples:
+        if line.startswith(("automudae_claims_total", "automudae_kakera_reacts")):
+            print(f"  {line}")
+    print(f"  scrape p50 {percentile(timings, 50) * 1e3:.2f} ms")
+
+
+def main() -> None:
+    asyncio.run(run())
+
+    inc = min(
+        timeit.repeat(
+            lambda: METRICS.rolls_handled.inc("1"), number=OPERATIONS, repeat=3
+        )
+    )
+    observe = min(
+        timeit.repeat(
+            lambda: METRICS.lock_hold.observe(0.003, "handle_rolls_loop"),
+            number=OPERATIONS,
+            repeat=3,
+        )
+    )
+    print(f"{'operation':>10} {'ns':>8}")
+    print(f"{'inc':>10} {inc / OPERATIONS * 1e9:>8.0f}")
+    print(f"{'observe':>10} {observe / OPERATIONS * 1e9:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import aiohttp
+import discord
+from aiohttp import web
+from aiolimiter import AsyncLimiter
+from discord.http import Ratelimit, Route
+
+from automudae.ratelimit import (
+    AdaptiveRateLimiter,
+    RateLimitBucket,
+    RateLimitPriority,
+)
+
+REQUESTS = 20
+BUCKET_LIMIT = 5
+BUCKET_PERIOD_SEC = 0.25
+FIXED_PERIOD_SEC = BUCKET_PERIOD_SEC
+STUB_BUCKET_HASH = "stub"
+
+
+class StubDiscord:
+    """Serves a single Discord style bucket of ``limit`` requests per ``period``"""
+
+    def __init__(self, limit: int, period: float) -> None:
+        self.limit = limit
+        self.period = period
+        self.remaining = limit
+        self.reset_at = 0.0
+        self.served = 0
+        self.rejected = 0
+
+    async def handle(self, _: web.Request) -> web.Response:
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.period
+        reset_after = f"{self.reset_at - now:.3f}"
+
+        if self.remaining <= 0:
+            self.rejected += 1
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": reset_after},
+                status=429,
+                headers={"Retry-After": reset_after},
+            )
+
+        self.remaining -= 1
+        self.served += 1
+        return web.json_response(
+            {},
+            headers={
+                "X-RateLimit-Bucket": STUB_BUCKET_HASH,
+                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Remaining": str(self.remaining),
+                "X-RateLimit-Reset-After": reset_after,
+            },
+        )
+
+
+class StubHTTPClient:
+    """The rate limit state of ``discord.http.HTTPClient``, kept the same way.
+
+    ``record`` does what ``HTTPClient.request`` does with a response: it maps the
+    route to Discord's bucket hash and updates a ``discord.http.Ratelimit`` from
+    the headers, which ``AdaptiveRateLimiter.observe`` then reads.
+    """
+
+    def __init__(self) -> None:
+        self._bucket_hashes: dict[str, str] = {}
+        self._buckets: dict[str, Ratelimit] = {}
+
+    def record(self, route: Route, response: aiohttp.ClientResponse) -> None:
+        if (bucket_hash := response.headers.get("X-RateLimit-Bucket")) is None:
+            return
+        self._bucket_hashes[route.key] = bucket_hash
+        key = f"{bucket_hash}:{route.major_parameters}"
+        if (ratelimit := self._buckets.get(key)) is None:
+            ratelimit = self._buckets[key] = Ratelimit(None, 1)
+        ratelimit.update(response)  # type: ignore[arg-type]
+
+
+async def send(session: aiohttp.ClientSession, url: str) -> aiohttp.ClientResponse:
+    async with session.post(url) as response:
+        await response.read()
+        return response
+
+
+async def fixed(session: aiohttp.ClientSession, url: str) -> None:
+    limiter = AsyncLimiter(1, FIXED_PERIOD_SEC)
+    for _ in range(REQUESTS):
+        async with limiter:
+            await send(session, url)
+
+
+async def unthrottled(session: aiohttp.ClientSession, url: str) -> None:
+    for _ in range(REQUESTS):
+        while (response := await send(session, url)).status == 429:
+            await asyncio.sleep(float(response.headers["Retry-After"]))
+
+
+async def adaptive(session: aiohttp.ClientSession, url: str) -> None:
+    """The agent's path: a limiter slot that learns from the HTTP client's state"""
+    http = StubHTTPClient()
+    limiter = AdaptiveRateLimiter(
+        http,  # type: ignore[arg-type]
+        command_period=FIXED_PERIOD_SEC,
+    )
+    channel = discord.Object(id=1)
+    route = Route("POST", "/channels/{channel_id}/messages", channel_id=channel.id)
+    for _ in range(REQUESTS):
+        while True:
+            try:
+                async with limiter.command(channel):
+                    response = await send(session, url)
+                    http.record(route, response)
+                    if response.status == 429:
+                        raise discord.RateLimited(
+                            float(response.headers["Retry-After"])
+                        )
+                break
+            except discord.RateLimited:
+                continue
+
+
+async def claim_position(routine: int = 10) -> int:
+    """Position at which a claim queued behind ``routine`` commands gets its slot"""
+    bucket = RateLimitBucket("stub", 1, 0.01)
+    await bucket.acquire()
+    order: list[RateLimitPriority] = []
+
+    async def waiter(priority: RateLimitPriority) -> None:
+        await bucket.acquire(priority)
+        order.append(priority)
+
+    tasks = [
+        asyncio.create_task(waiter(RateLimitPriority.ROUTINE)) for _ in range(routine)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(waiter(RateLimitPriority.CLAIM)))
+    await asyncio.gather(*tasks)
+    return order.index(RateLimitPriority.CLAIM)
+
+
+async def run() -> None:
+    print(f"{'strategy':>12} {'requests':>9} {'429s':>6} {'elapsed s':>10}")
+    for name, strategy in [
+        ("fixed", fixed),
+        ("unthrottled", unthrottled),
+        ("adaptive", adaptive),
+    ]:
+        stub = StubDiscord(BUCKET_LIMIT, BUCKET_PERIOD_SEC)
+        app = web.Application()
+        app.router.add_post("/api/v9/channels/1/messages", stub.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        async with aiohttp.ClientSession() as session:
+            start = time.perf_counter()
+            await strategy(
+                session, f"http://127.0.0.1:{port}/api/v9/channels/1/messages"
+            )
+            elapsed = time.perf_counter() - start
+        await runner.cleanup()
+
+        print(f"{name:>12} {stub.served:>9} {stub.rejected:>6} {elapsed:>10.2f}")
+
+    print(f"claim served at position {await claim_position()} behind 10 routine")
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from automudae.agent import AutoMudaeAgent
+from automudae.mudae.classifier import ROLL_COMMANDS
+from automudae.ratelimit import AdaptiveRateLimiter
+from benchmarks.fakes import FakeWorld
+from benchmarks.latency import CLAIMABLE_ROLLS, claimable_roll
+from benchmarks.replay import (
+    COMMAND_INTERVAL_SEC,
+    FakeMudae,
+    Scenario,
+    default_claim_config,
+    make_config,
+)
+
+RECONNECTS = 5
+RECONNECT_INTERVAL_SEC = 0.1
+
+
+def make_agent(
+    world: FakeWorld, scenario: Scenario, snapshot_file: str
+) -> tuple[AutoMudaeAgent, FakeMudae]:
+    assert world.channel
+    config = make_config(scenario, world)
+    config.snapshot.file = snapshot_file
+
+    agent = AutoMudaeAgent(config)
+    agent.loop = asyncio.get_running_loop()
+    agent._connection.user = world.me  # pylint: disable=W0212
+    agent.rate_limiter = AdaptiveRateLimiter(command_period=COMMAND_INTERVAL_SEC)
+    agent.resolve_channel = lambda _: world.channel  # type: ignore
+
+    mudae = FakeMudae(world, agent, scenario)
+    world.channel.on_send = mudae.on_send
+    return agent, mudae
+
+
+async def stop(agent: AutoMudaeAgent) -> None:
+    agent.snapshot_file.save(agent.snapshot())
+    for state in agent.states.values():
+        if state.hourly_roll_loop is not None:
+            state.hourly_roll_loop.cancel()
+    for task in agent.tasks.values():
+        task.cancel()
+    await asyncio.gather(*agent.tasks.values(), return_exceptions=True)
+
+
+async def resume(
+    world: FakeWorld, scenario: Scenario, snapshot_file: str
+) -> tuple[float, int]:
+    """Time from on_ready until the channel timers are usable"""
+    agent, mudae = make_agent(world, scenario, snapshot_file)
+    start = time.perf_counter()
+    await agent.on_ready()
+    state = next(iter(agent.states.values()))
+    while state.timer_status.stale:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    timer_requests = sum(content == "$tu" for _, content in mudae.commands)
+    await stop(agent)
+    return elapsed, timer_requests
+
+
+async def run() -> None:
+    scenario = Scenario(
+        name="reconnect",
+        deck=[claimable_roll(*roll) for roll in CLAIMABLE_ROLLS],
+        claim_config=default_claim_config(),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_file = str(Path(directory) / "snapshot.json")
+
+        world = FakeWorld()
+        agent, mudae = make_agent(world, scenario, snapshot_file)
+        start = time.perf_counter()
+        await agent.on_ready()
+        for _ in range(RECONNECTS):
+            await asyncio.sleep(RECONNECT_INTERVAL_SEC)
+            await agent.on_ready()
+        while mudae.deck or mudae.pending:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(RECONNECT_INTERVAL_SEC)
+
+        loops = sum(not task.done() for task in agent.tasks.values())
+        rolls = sum(content in ROLL_COMMANDS for _, content in mudae.commands)
+        timer_requests = sum(content == "$tu" for _, content in mudae.commands)
+        await stop(agent)
+        print(
+            f"{RECONNECTS} reconnects in {(time.perf_counter() - start) * 1e3:.0f}ms: "
+            f"{loops} loops running, {rolls} roll commands for "
+            f"{len(scenario.deck)} rolls, {timer_requests} $tu"
+        )
+
+        print(f"{'start':>10} {'ms':>10} {'$tu':>6}")
+        for name, path in [
+            ("cold", str(Path(directory) / "missing.json")),
+            ("snapshot", snapshot_file),
+        ]:
+            elapsed, timer_requests = await resume(FakeWorld(), scenario, path)
+            print(f"{name:>10} {elapsed * 1e3:>10.1f} {timer_requests:>6}")
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
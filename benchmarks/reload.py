@@ -0,0 +1,111 @@
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from automudae.config import Config
+from automudae.reload import CompiledConfig, ConfigWatcher
+
+WISHLIST_SIZES = [10, 1_000, 10_000]
+RELOADS = 5
+POLL_INTERVAL_SEC = 0.05
+TICK_SEC = 0.001
+
+
+def config_data(wishlist_size: int, revision: int) -> dict[str, Any]:
+    return {
+        "name": "reload",
+        "version": 1,
+        "discord": {"token": "", "channelIds": [1], "mudaeBotId": 2},
+        "mudae": {
+            "roll": {
+                "command": "$wa",
+                "doNotRollWhenCannotClaim": False,
+                "doNotRollWhenCannotKakeraReact": False,
+                "rollResetMinuteOffset": 0,
+            },
+            "claim": {
+                "snipe": {
+                    "wish": True,
+                    "character": [f"Character {i}" for i in range(wishlist_size)],
+                    "series": [f"Series {i}" for i in range(wishlist_size // 10)],
+                },
+                "lateClaim": {"minKakera": 40 + revision},
+            },
+        },
+    }
+
+
+def write(path: Path, data: dict[str, Any]) -> None:
+    path.write_text(yaml.dump(data, Dumper=yaml.CSafeDumper), encoding="utf-8")
+
+
+async def stall(stop: asyncio.Event) -> float:
+    """The longest the event loop was late to wake up, a stand in for a roll"""
+    longest = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SEC)
+        longest = max(longest, time.perf_counter() - start - TICK_SEC)
+    return longest
+
+
+async def measure(path: Path, wishlist_size: int) -> None:
+    write(path, config_data(wishlist_size, 0))
+    applied = asyncio.Event()
+    watcher = ConfigWatcher(
+        str(path),
+        Config.from_file(str(path)),
+        lambda _: applied.set(),
+        interval=POLL_INTERVAL_SEC,
+    )
+    watch_task = asyncio.create_task(watcher.run())
+    stop = asyncio.Event()
+    stall_task = asyncio.create_task(stall(stop))
+
+    detections = []
+    latencies = []
+    for revision in range(1, RELOADS + 1):
+        applied.clear()
+        # Written from a thread, like an editor would, to only time the reload
+        await asyncio.to_thread(write, path, config_data(wishlist_size, revision))
+        written = time.perf_counter()
+        await applied.wait()
+        detections.append(time.perf_counter() - written)
+        latencies.append(watcher.last_latency)
+    stop.set()
+    longest_stall = await stall_task
+    watch_task.cancel()
+
+    # The same reload done on the event loop stalls it for the whole compile
+    start = time.perf_counter()
+    CompiledConfig.compile(Config.from_file(str(path)))
+    inline = time.perf_counter() - start
+
+    print(
+        f"{wishlist_size:>9} {path.stat().st_size / 1024:>9.1f} "
+        f"{max(detections) * 1e3:>10.1f} {max(latencies) * 1e3:>10.1f} "
+        f"{longest_stall * 1e3:>9.1f} {inline * 1e3:>10.1f}"
+    )
+    assert watcher.reloads == RELOADS and watcher.failures == 0
+
+
+async def run() -> None:
+    print(
+        f"{'wishlist':>9} {'yaml KiB':>9} {'detect ms':>10} {'reload ms':>10} "
+        f"{'stall ms':>9} {'inline ms':>10}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for wishlist_size in WISHLIST_SIZES:
+            await measure(Path(directory) / "config.yaml", wishlist_size)
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# pylint: disable=R0902
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from automudae.agent import AutoMudaeAgent, AutoMudaeAgentState
+from automudae.config import (
+    ClaimConfig,
+    ClaimCriteria,
+    Config,
+    DiscordConfig,
+    KakeraReactConfig,
+    MudaeConfig,
+    RollConfig,
+)
+from automudae.mudae.classifier import ROLL_COMMANDS
+from automudae.mudae.helper.trace import percentile
+from automudae.mudae.roll.queue import MUDAE_ROLL_EXPIRY_SEC
+from automudae.ratelimit import AdaptiveRateLimiter
+from benchmarks.fakes import (
+    FakeAction,
+    FakeMessage,
+    FakeRawMessageUpdate,
+    FakeWorld,
+)
+
+MUDAE_REPLY_DELAY_SEC = 0.02
+COMMAND_INTERVAL_SEC = 0.05
+SETTLE_SEC = 0.3
+
+TIMER_STATUS_TEMPLATE = (
+    "**{name}**, you __{claim}__ claim right now! "
+    "The next claim reset is in **{reset_hours}h {reset_minutes}** min.\n"
+    "You have **{rolls}** rolls left. Next rolls reset in **{roll_reset}** min.\n"
+    "You __{react}__ react to kakera right now!\n"
+    "Power: **{power}%**\n"
+    "Each kakera button consumes 36% of your reaction power.\n"
+    "Stock: **2,345**<:kakera:469835869059153940>"
+)
+
+
+@dataclass
+class Scenario:
+    """A replayable situation for the agent.
+
+    ``deck`` holds the rolls Mudae answers the agent's own roll commands with, in
+    order. ``background`` is a corpus replayed into the channel at the same time,
+    with offsets compressed by ``speed``. After that, ``resets`` hourly roll resets
+    are replayed with a fresh deck; ``sync_on_reset`` forces a $tu on each of them.
+    The last ``lost_replies`` roll commands go unanswered, and rolls expire after
+    ``roll_expiry`` seconds. A deck roll with ``edits`` is edited by Mudae ``after``
+    seconds from its delivery, with the edit's fields replacing the roll's.
+    """
+
+    name: str
+    deck: list[dict[str, Any]] = field(default_factory=list)
+    background: list[dict[str, Any]] = field(default_factory=list)
+    claim_config: ClaimConfig = field(default_factory=ClaimConfig)
+    kakera_react_config: KakeraReactConfig = field(default_factory=KakeraReactConfig)
+    can_claim: bool = True
+    can_kakera_react: bool = True
+    claim_reset_minutes: int = 150
+    kakera_power: int = 100
+    speed: float = 10.0
+    rolls_reset_minutes: int = 42
+    resets: int = 0
+    sync_on_reset: bool = False
+    lost_replies: int = 0
+    roll_expiry: float = MUDAE_ROLL_EXPIRY_SEC
+
+
+def make_config(scenario: Scenario, world: FakeWorld) -> Config:
+    assert world.channel
+    return Config(
+        name=f"replay-{scenario.name}",
+        version=1,
+        discord=DiscordConfig(
+            token="", channelIds=[world.channel.id], mudaeBotId=world.mudae.id
+        ),
+        mudae=MudaeConfig(
+            roll=RollConfig(
+                command="$wa",
+                doNotRollWhenCannotClaim=False,
+                doNotRollWhenCannotKakeraReact=False,
+                rollResetMinuteOffset=0,
+            ),
+            claim=scenario.claim_config,
+            kakeraReact=scenario.kakera_react_config,
+        ),
+    )
+
+
+def default_claim_config() -> ClaimConfig:
+    return ClaimConfig(
+        snipe=ClaimCriteria(wish=True),
+        earlyClaim=ClaimCriteria(minKakera=300),
+        lateClaim=ClaimCriteria(minKakera=40),
+    )
+
+
+class FakeMudae:
+    """Answers the commands the agent sends like the Mudae bot would"""
+
+    def __init__(
+        self, world: FakeWorld, agent: AutoMudaeAgent, scenario: Scenario
+    ) -> None:
+        self.world = world
+        self.agent = agent
+        self.scenario = scenario
+        self.deck = list(scenario.deck)
+        self.pending: set[asyncio.Task[None]] = set()
+        self.commands: list[tuple[float, str]] = []
+
+    def on_send(self, message: FakeMessage) -> None:
+        self.commands.append((time.perf_counter(), message.content))
+        self.agent.dispatch("message", message)
+
+        if message.content == "$tu":
+            self.reply(self.timer_status())
+        elif message.content in ROLL_COMMANDS and self.deck:
+            record = self.deck.pop(0)
+            if len(self.deck) >= self.scenario.lost_replies:
+                self.reply(record)
+
+    def timer_status(self) -> dict[str, Any]:
+        reset_hours, reset_minutes = divmod(self.scenario.claim_reset_minutes, 60)
+        content = TIMER_STATUS_TEMPLATE.format(
+            name=self.world.me.name,
+            claim="can" if self.scenario.can_claim else "can't",
+            reset_hours=reset_hours,
+            reset_minutes=reset_minutes,
+            rolls=len(self.deck),
+            roll_reset=self.scenario.rolls_reset_minutes,
+            react="can" if self.scenario.can_kakera_react else "can't",
+            power=self.scenario.kakera_power,
+        )
+        return {"author": self.world.mudae.name, "content": content}
+
+    def reply(self, record: dict[str, Any]) -> None:
+        task = asyncio.create_task(self.deliver(record, MUDAE_REPLY_DELAY_SEC))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def deliver(self, record: dict[str, Any], delay: float) -> None:
+        await asyncio.sleep(delay)
+        message = self.world.message(record)
+        self.agent.dispatch("message", message)
+
+        elapsed = 0.0
+        for edit in record.get("edits", []):
+            await asyncio.sleep(edit["after"] - elapsed)
+            elapsed = edit["after"]
+            edited = self.world.edit(message, {**record, **edit})
+            self.agent.dispatch(
+                "raw_message_edit", FakeRawMessageUpdate(message.channel.id, edited)
+            )
+
+
+class ReplayHarness:
+    """Drives ``AutoMudaeAgent`` against fake Discord objects, without a gateway.
+
+    ``on_message``, ``execute_rolls_loop`` and ``handle_rolls_loop`` run unchanged;
+    only the channel, messages, buttons and guild are fakes. Every claim or kakera
+    react ends up as a ``FakeAction`` on the channel.
+    """
+
+    def __init__(self, scenario: Scenario) -> None:
+        self.scenario = scenario
+        self.world = FakeWorld()
+        self.reset_latencies: list[float] = []
+        self.timer_requests = 0
+
+    async def run(self, timeout: float = 10.0) -> list[FakeAction]:
+        assert self.world.channel
+
+        agent = AutoMudaeAgent(make_config(self.scenario, self.world))
+        agent.loop = asyncio.get_running_loop()
+        agent._connection.user = self.world.me  # pylint: disable=W0212
+        state = AutoMudaeAgentState(self.world.channel)  # type: ignore[arg-type]
+        state.roll_queue.expiry = self.scenario.roll_expiry
+        agent.states[self.world.channel.id] = state
+        agent.rate_limiter = AdaptiveRateLimiter(command_period=COMMAND_INTERVAL_SEC)
+
+        mudae = FakeMudae(self.world, agent, self.scenario)
+        self.world.channel.on_send = mudae.on_send
+
+        loops = [
+            asyncio.create_task(agent.execute_rolls_loop(state)),
+            asyncio.create_task(agent.handle_rolls_loop(state)),
+        ]
+        try:
+            await agent.send_timer_status_message(state)
+            await asyncio.wait_for(self.replay_background(mudae), timeout)
+            await asyncio.wait_for(self.drain(state, mudae), timeout)
+            for _ in range(self.scenario.resets):
+                await asyncio.wait_for(self.reset(agent, state, mudae), timeout)
+        finally:
+            agent.deadlines.cancel()
+            for task in [*loops, *mudae.pending]:
+                task.cancel()
+            await asyncio.gather(*loops, *mudae.pending, return_exceptions=True)
+
+        return self.world.channel.actions
+
+    async def replay_background(self, mudae: FakeMudae) -> None:
+        elapsed = 0.0
+        for record in self.scenario.background:
+            offset = record.get("offset", elapsed) / self.scenario.speed
+            await asyncio.sleep(max(0.0, offset - elapsed))
+            elapsed = max(elapsed, offset)
+            mudae.agent.dispatch("message", self.world.message(record))
+
+    async def reset(
+        self, agent: AutoMudaeAgent, state: AutoMudaeAgentState, mudae: FakeMudae
+    ) -> None:
+        """Replay an hourly roll reset, timed until the first roll command"""
+        mudae.deck = list(self.scenario.deck)
+        if self.scenario.sync_on_reset:
+            state.timer_status.stale = True
+        else:
+            # The steady state, the rolls per reset were learned at an earlier reset
+            state.timer_status.rolls_per_reset_known = True
+        start = time.perf_counter()
+        await agent.reset_rolls(state)
+        while not any(
+            at > start and content in ROLL_COMMANDS for at, content in mudae.commands
+        ):
+            await asyncio.sleep(0.001)
+        self.reset_latencies.append(
+            min(
+                at
+                for at, content in mudae.commands
+                if at > start and content in ROLL_COMMANDS
+            )
+            - start
+        )
+        await self.drain(state, mudae)
+        self.timer_requests += sum(
+            at > start and content == "$tu" for at, content in mudae.commands
+        )
+
+    async def drain(self, state: AutoMudaeAgentState, mudae: FakeMudae) -> None:
+        while (
+            mudae.deck
+            or mudae.pending
+            or not state.roll_queue.empty()
+            or state.best_claim_roll is not None
+            or state.kakera_picks
+        ):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(SETTLE_SEC)
+
+
+def format_percentiles(latencies: list[float]) -> str:
+    """The p50 and p99 columns of a latency report, in milliseconds"""
+    return (
+        f"{percentile(latencies, 50) * 1e3:>8.1f} "
+        f"{percentile(latencies, 99) * 1e3:>8.1f}"
+    )
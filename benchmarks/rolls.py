@@ -0,0 +1,127 @@
+import gc
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+import discord
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+from automudae.mudae.helper.common import get_buttons
+from automudae.mudae.helper.trace import RollTrace
+from automudae.mudae.roll import MudaeRollOwner, get_roll_fields
+from automudae.mudae.roll.result import MudaeClaimableRollResult
+from benchmarks.fakes import FakeMessage, FakeWorld, load_corpus
+
+ROLLS = 10_000
+REPEAT = 5
+
+
+class LegacyClaimableRoll(BaseModel):
+    """The roll as it was before, a pydantic model holding on to its message"""
+
+    owner: MudaeRollOwner
+    message: discord.Message
+    trace: RollTrace | None = None
+    update: bool = False
+    character: str
+    series: str
+    kakera_value: int
+    wished_by: MudaeRollOwner | None = None
+
+    _verdict: tuple[Any, int, Any] | None = PrivateAttr(default=None)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+def build_legacy(message: FakeMessage, owner: MudaeRollOwner) -> object:
+    return LegacyClaimableRoll(
+        owner=owner,
+        message=message,
+        character="Nilou",
+        series="Genshin Impact",
+        kakera_value=512,
+        wished_by=owner,
+    )
+
+
+def build_record(message: FakeMessage, owner: MudaeRollOwner) -> object:
+    return MudaeClaimableRollResult(
+        **get_roll_fields(message, get_buttons(message)),
+        owner=owner,
+        character="Nilou",
+        series="Genshin Impact",
+        kakera_value=512,
+        wished_by=owner,
+    )
+
+
+def release(roll: object) -> None:
+    if isinstance(roll, MudaeClaimableRollResult):
+        roll.handle.release()
+
+
+def wished_record() -> dict[str, Any]:
+    return next(
+        record
+        for record in load_corpus("busy_channel")
+        if record.get("wished_by") and record.get("buttons")
+    )
+
+
+def construction(
+    build: Callable[[FakeMessage, MudaeRollOwner], object],
+    message: FakeMessage,
+    owner: MudaeRollOwner,
+) -> float:
+    """Best time to build a roll out of an already parsed message"""
+    timer = timeit.Timer(lambda: build(message, owner))
+    return min(timer.repeat(REPEAT, ROLLS)) / ROLLS
+
+
+def allocations(
+    build: Callable[[FakeMessage, MudaeRollOwner], object],
+    messages: list[FakeMessage],
+    owner: MudaeRollOwner,
+) -> tuple[float, float]:
+    """Bytes live per roll while its message is, then once the messages are gone"""
+    gc.collect()
+    tracemalloc.start()
+    rolls = [build(message, owner) for message in messages]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Retained: build from fresh messages, then let go of everything but the rolls
+    world = FakeWorld()
+    record = wished_record()
+    gc.collect()
+    tracemalloc.start()
+    rolls = []
+    for _ in range(len(messages)):
+        message = world.message(record)
+        rolls.append(build(message, owner))
+    assert world.channel is not None
+    world.channel.messages.clear()
+    del message
+    for roll in rolls:
+        release(roll)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated / len(messages), retained / len(rolls)
+
+
+def main() -> None:
+    world = FakeWorld()
+    record = wished_record()
+    messages = [world.message(record) for _ in range(ROLLS)]
+    owner = world.me
+
+    print(f"{'roll':>8} {'build us':>9} {'live B':>9} {'retained B':>11}")
+    for name, build in (("legacy", build_legacy), ("record", build_record)):
+        elapsed = construction(build, messages[0], owner)
+        allocated, retained = allocations(build, messages, owner)
+        print(f"{name:>8} {elapsed * 1e6:>9.2f} {allocated:>9.0f} {retained:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
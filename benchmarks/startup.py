@@ -0,0 +1,44 @@
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from automudae.config import Config
+
+RUNS = 5
+IMPORTS = {
+    "interpreter": "pass",
+    "automudae.config": "import automudae.config",
+    "automudae.agent": "import automudae.agent",
+}
+
+
+def cold_start(statement: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", statement], check=True)
+    return time.perf_counter() - start
+
+
+def write_schema(path: str, force: bool) -> float:
+    start = time.perf_counter()
+    Config.write_schema(path, force=force)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'step':>24} {'median ms':>10}")
+    for name, statement in IMPORTS.items():
+        timings = [cold_start(statement) for _ in range(RUNS)]
+        print(f"{f'import {name}':>24} {statistics.median(timings) * 1e3:>10.1f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "schema.yaml")
+        for name, force in [("schema (regenerated)", True), ("schema (cached)", False)]:
+            timings = [write_schema(path, force) for _ in range(RUNS)]
+            print(f"{name:>24} {statistics.median(timings) * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import random
+import statistics
+import time
+
+from automudae.mudae.roll.stopping import ClaimThresholdTable
+
+WINDOWS = 20_000
+HISTORY = 50_000
+ROLLS_PER_HOUR = 10
+HOURS_PER_CLAIM = 3
+EARLY_CLAIM_MIN_KAKERA = 150
+LATE_CLAIM_MIN_KAKERA = 40
+
+
+def kakera_value(rng: random.Random) -> int:
+    return int(rng.paretovariate(1.6) * 30)
+
+
+def fixed_thresholds(hours: list[list[int]]) -> tuple[int, int]:
+    """Claim the hour's best at the end of the hour, like earlyClaim / lateClaim"""
+    for hour, rolls in enumerate(hours):
+        best = max(rolls)
+        is_last_hour = hour == len(hours) - 1
+        if best >= EARLY_CLAIM_MIN_KAKERA or (
+            is_last_hour and best >= LATE_CLAIM_MIN_KAKERA
+        ):
+            return best, len(rolls) - 1 - rolls.index(best)
+    return 0, 0
+
+
+def optimal_stopping(
+    hours: list[list[int]], table: ClaimThresholdTable
+) -> tuple[int, int]:
+    """Claim a roll as soon as it beats the expected value of continuing"""
+    for hour, rolls in enumerate(hours):
+        hours_left = len(hours) - 1 - hour
+        for index, value in enumerate(rolls):
+            rolls_left = len(rolls) - 1 - index
+            if value >= table.threshold(rolls_left, hours_left, len(rolls)):
+                return value, 0
+    return 0, 0
+
+
+def main() -> None:
+    rng = random.Random(0)
+    start = time.perf_counter()
+    table = ClaimThresholdTable(kakera_value(rng) for _ in range(HISTORY))
+    table.table(ROLLS_PER_HOUR, HOURS_PER_CLAIM - 1)
+    print(
+        f"table of {HISTORY} samples built in {(time.perf_counter() - start) * 1e3:.1f}ms"
+    )
+
+    windows = [
+        [
+            [kakera_value(rng) for _ in range(ROLLS_PER_HOUR)]
+            for _ in range(HOURS_PER_CLAIM)
+        ]
+        for _ in range(WINDOWS)
+    ]
+
+    print(f"{'policy':>18} {'kakera/claim':>13} {'claimed':>8} {'held rolls':>11}")
+    for name, policy in [
+        ("fixed thresholds", fixed_thresholds),
+        ("optimal stopping", lambda hours: optimal_stopping(hours, table)),
+    ]:
+        results = [policy(hours) for hours in windows]
+        claimed = [(value, held) for value, held in results if value > 0]
+        print(
+            f"{name:>18} "
+            f"{statistics.mean(value for value, _ in claimed):>13.1f} "
+            f"{len(claimed) / WINDOWS:>8.1%} "
+            f"{statistics.mean(held for _, held in claimed):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
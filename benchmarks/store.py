@@ -0,0 +1,87 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from automudae.mudae.roll.store import (
+    STORE_INSERT,
+    MudaeRollStore,
+    RollRow,
+    connect,
+    kakera_distribution,
+    top_series,
+)
+
+ROWS = 1_000_000
+STORED_ROWS = 20_000
+SERIES = 5_000
+CHARACTERS_PER_SERIES = 20
+DAYS = 90
+
+
+def make_rows(count: int) -> list[RollRow]:
+    rng = random.Random(0)
+    now = time.time()
+    rows: list[RollRow] = []
+    for message_id in range(count):
+        series = rng.randrange(SERIES)
+        rows.append(
+            (
+                message_id,
+                now - rng.random() * DAYS * 86400,
+                100,
+                "claim",
+                f"Character {series}-{rng.randrange(CHARACTERS_PER_SERIES)}",
+                f"Series {series}",
+                int(rng.paretovariate(1.5) * 30),
+                1000 + rng.randrange(50),
+                None,
+                "",
+                "pass",
+            )
+        )
+    return rows
+
+
+def timed(name: str, fn, repeat: int = 5) -> None:  # type: ignore[no-untyped-def]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"{name:>32} {(time.perf_counter() - start) / repeat * 1e3:>10.1f}ms")
+
+
+def main() -> None:
+    rows = make_rows(ROWS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "rolls.sqlite3")
+        store = MudaeRollStore(path)
+        start = time.perf_counter()
+        for row in rows[:STORED_ROWS]:
+            store.rows.put(row)
+        enqueued = time.perf_counter() - start
+        store.close()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'store':>32} {STORED_ROWS} rows, {enqueued / STORED_ROWS * 1e6:.2f}us/row "
+            f"on the loop, {STORED_ROWS / elapsed:,.0f} rows/s written"
+        )
+
+        connection = connect(path)
+        with connection:
+            connection.executemany(STORE_INSERT, rows[STORED_ROWS:])
+        print(f"{'bulk load':>32} {ROWS} rows")
+
+        timed(
+            "kakera --series (30 days)",
+            lambda: kakera_distribution(connection, series="Series 7", days=30),
+        )
+        timed(
+            "kakera --character (30 days)",
+            lambda: kakera_distribution(connection, character="Character 7-3"),
+        )
+        timed("series --limit 20 (30 days)", lambda: top_series(connection), 1)
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import asyncio
+
+from benchmarks.latency import CLAIMABLE_ROLLS, claimable_roll
+from benchmarks.replay import ReplayHarness, Scenario, format_percentiles
+
+ITERATIONS = 10
+
+
+async def run() -> None:
+    deck = [claimable_roll(*roll) for roll in CLAIMABLE_ROLLS[:3]]
+    print(f"{'roll reset':>12} {'$tu sent':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, sync_on_reset in [("$tu", True), ("local", False)]:
+        latencies: list[float] = []
+        timer_requests = 0
+        for _ in range(ITERATIONS):
+            harness = ReplayHarness(
+                Scenario(
+                    name,
+                    deck=deck,
+                    rolls_reset_minutes=1,
+                    resets=1,
+                    sync_on_reset=sync_on_reset,
+                )
+            )
+            await harness.run()
+            latencies.extend(harness.reset_latencies)
+            timer_requests += harness.timer_requests
+        print(
+            f"{name:>12} {timer_requests / ITERATIONS:>9.1f} "
+            f"{format_percentiles(latencies)}"
+        )
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
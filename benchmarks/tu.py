@@ -0,0 +1,105 @@
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from automudae.mudae.timer import MudaeTimerStatus
+from benchmarks.fakes import load_corpus
+
+REPEAT = 2_000
+USER = "agent"
+
+
+def legacy_parse(content: str, user_name: str, at: datetime) -> object:
+    """The former parser: strip the markdown, then one search per line"""
+    clean_msg = discord.utils.remove_markdown(content)
+    if not clean_msg.startswith(user_name):
+        return None
+    claim = re.search(r"you (can|can\'t) claim", clean_msg)
+    rolls = re.search(r"You have (\d+) rolls? left", clean_msg)
+    kakera = re.search(r"You (can|can\'t) react to kakera", clean_msg)
+    power = re.search(r"(\d+)%", clean_msg)
+    claim_reset = re.search(
+        r"(?:The next claim reset is in|you can't claim for another)"
+        r"\s+(?:(\d+)h\s*)?(\d+)\s*min",
+        clean_msg,
+    )
+    if not (claim and rolls and kakera and power and claim_reset):
+        return None
+    cost = re.search(r"consumes (\d+)% of your reaction power", clean_msg)
+    rolls_reset = re.search(r"Next rolls? reset in (\d+) min", clean_msg)
+    minutes = int(claim_reset.group(1) or 0) * 60 + int(claim_reset.group(2))
+    return MudaeTimerStatus(
+        can_claim=claim.group(1) == "can",
+        rolls_available=int(rolls.group(1)),
+        can_kakera_react=kakera.group(1) == "can",
+        next_hour_is_reset=minutes <= 60,
+        claim_reset_minutes=minutes,
+        kakera_power=int(power.group(1)),
+        kakera_cost=int(cost.group(1)) if cost else 0,
+        claim_reset_at=at + timedelta(minutes=minutes),
+        rolls_reset_at=(
+            at + timedelta(minutes=int(rolls_reset.group(1))) if rolls_reset else None
+        ),
+        synced_at=at,
+    )
+
+
+def check_golden() -> bool:
+    """Every $tu of the golden corpus parses to its expected fields"""
+    at = datetime.now(tz=timezone.utc)
+    passed = True
+    for number, record in enumerate(load_corpus("timer_status"), start=1):
+        status = MudaeTimerStatus.parse(record["content"], record["user"], at)
+        expected = record["expected"]
+        if expected is None:
+            if status is not None:
+                print(f"golden {number}: expected no $tu, parsed {status!r}")
+                passed = False
+            continue
+        if status is None:
+            print(f"golden {number}: expected {expected}, parsed nothing")
+            passed = False
+            continue
+        for name, value in expected.items():
+            if getattr(status, name) != value:
+                print(
+                    f"golden {number}: {name}={getattr(status, name)!r}, not {value!r}"
+                )
+                passed = False
+    return passed
+
+
+def main() -> None:
+    if not check_golden():
+        sys.exit(1)
+    print("golden corpus: ok")
+
+    at = datetime.now(tz=timezone.utc)
+    timer_statuses = [
+        record["content"]
+        for record in load_corpus("timer_status")
+        if record["expected"] is not None and record["user"] == USER
+    ]
+    noise = [
+        record["content"]
+        for record in load_corpus("busy_channel")
+        if record.get("content") and not record["content"].startswith(f"**{USER}**")
+    ]
+
+    print(f"{'parser':>10} {'$tu us':>8} {'noise us':>9}")
+    for name, parse in [("legacy", legacy_parse), ("compiled", MudaeTimerStatus.parse)]:
+        timings = []
+        for contents in (timer_statuses, noise):
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                for content in contents:
+                    parse(content, USER, at)
+            timings.append((time.perf_counter() - start) / (REPEAT * len(contents)))
+        print(f"{name:>10} {timings[0] * 1e6:>8.2f} {timings[1] * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()